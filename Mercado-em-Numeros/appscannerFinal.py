@@ -3,19 +3,35 @@
 # CÓDIGO UNIFICADO: Combina leitura em tempo real e análise de upload de foto.
 
 # === IMPORTAÇÕES E DEPENDÊNCIAS ===
+# No topo só o Streamlit e a biblioteca padrão. pandas, OpenCV, PIL e
+# streamlit_webrtc são carregados pelas funções carregar_* (uma vez por
+# processo) quando a aba ou o recurso que os usa aparece pela primeira vez.
 import streamlit as st              # Framework web para criar a interface
-from PIL import Image               # Biblioteca para manipulação de imagens
-from pyzbar.pyzbar import decode   # Biblioteca para decodificação de QR Codes
-import pandas as pd                 # Manipulação de dados e CSV
 import os                          # Operações do sistema operacional
-import cv2                         # OpenCV para visão computacional
-import numpy as np                 # Operações matemáticas com arrays
+import sys                         # Caminho dos módulos compartilhados
 import re                          # Expressões regulares para extração de dados
 import time                        # Funções de tempo para auto-refresh
 import csv                         # Para manipulação de CSV (usado no app.py original)
+import tempfile                    # Arquivos temporários para migração atômica do CSV
+import shutil                      # Preserva as permissões do CSV na migração
+import threading                   # Câmera e upload salvam chaves em threads diferentes
 
-# Importação para acesso à câmera/webcam via WebRTC
-from streamlit_webrtc import webrtc_streamer, VideoTransformerBase
+# Módulos compartilhados com a versão Android (pasta v2-android)
+PASTA_COMPARTILHADA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'v2-android')
+if PASTA_COMPARTILHADA not in sys.path:
+    sys.path.append(PASTA_COMPARTILHADA)
+
+try:
+    from qr_payload import extract_key  # Parser único para as URLs das 27 SEFAZ
+    PARSER_PAYLOAD_DISPONIVEL = True
+except ImportError:
+    PARSER_PAYLOAD_DISPONIVEL = False
+
+try:
+    from pipeline_metrics import metrics_from_env  # Histogramas por etapa + /metrics
+    METRICAS = metrics_from_env()  # Endpoint HTTP com NFCE_METRICS_PORT
+except ImportError:
+    METRICAS = None
 
 # === CONFIGURAÇÕES GLOBAIS ===
 
@@ -25,39 +41,164 @@ CSV_DTYPE = {'Chave': str}
 # Nome do arquivo onde as chaves são armazenadas
 ARQUIVO_CHAVES = "chaves.csv"
 
+# Arquivo central com o histórico de todas as estações (consulta de duplicatas)
+ARQUIVO_CENTRAL = os.environ.get('ARQUIVO_CENTRAL_CHAVES', 'chaves_central.nfka')
+
+# Intervalo (s) em que o fragmento da lista confere a versão do CSV
+INTERVALO_ATUALIZACAO = 2
+
+# === CARREGAMENTO SOB DEMANDA (uma vez por processo) ===
+
+@st.cache_resource(show_spinner=False)
+def carregar_pandas():
+    """pandas, usado pela lista de chaves salvas e pelo salvar_dados"""
+    import pandas as pd
+    return pd
+
+@st.cache_resource(show_spinner=False)
+def carregar_leitura_upload():
+    """PIL, OpenCV e a leitura de força bruta (aba de upload)"""
+    from PIL import Image
+    from deteccao import ler_qr_code
+    return Image, ler_qr_code
+
+@st.cache_resource(show_spinner=False)
+def carregar_camera():
+    """streamlit_webrtc, OpenCV e o QRReader (aba da câmera)"""
+    from streamlit_webrtc import webrtc_streamer
+    from leitor_camera import QRReader
+    return webrtc_streamer, QRReader
+
+@st.cache_resource(show_spinner=False)
+def carregar_perfilador():
+    """Perfilamento sob demanda (PERFILAMENTO_LEITURA=1 ou armado pela interface)"""
+    from perfilamento import perfilador_padrao
+    return perfilador_padrao()
+
+def carregar_arquivo_central(caminho):
+    """Arquivo central (mmap) com os runs e mesclagens mais recentes; None se indisponível"""
+    try:
+        from key_archive import open_archive
+        return open_archive(caminho)
+    except Exception:
+        return None  # Módulo ausente ou arquivo corrompido: segue só com o CSV
+
+def versao_arquivo(caminho):
+    """(mtime, tamanho) do arquivo, ou None se não existir (chave dos caches)"""
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+    return info.st_mtime_ns, info.st_size
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def ler_chaves_csv(versao):
+    """CSV de chaves lido uma vez por versão (não a cada rerun do script)"""
+    pd = carregar_pandas()
+    return pd.read_csv(ARQUIVO_CHAVES, dtype=str, encoding='utf-8-sig')
+
+@st.cache_resource(show_spinner=False)
+def tabela_em_memoria():
+    """Estado do processo: TabelaChaves, versão do CSV que ela reflete e a trava de escrita"""
+    return {'tabela': None, 'versao': None, 'trava': threading.RLock()}
+
+def carregar_tabela_chaves(versao):
+    """
+    Chaves decodificadas para filtro/ordenação/paginação no servidor
+
+    O salvar_dados estende a tabela e atualiza a versão; o CSV só é relido
+    inteiro quando muda por fora (máscara, limpeza, edição manual).
+    """
+    estado = tabela_em_memoria()
+    with estado['trava']:
+        if estado['versao'] != versao:
+            from tabela_chaves import TabelaChaves
+            df = ler_chaves_csv(versao)
+            estado['tabela'] = TabelaChaves(df['Chave'].to_numpy() if 'Chave' in df.columns else [])
+            estado['versao'] = versao
+        return estado['tabela']
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def csv_para_download(versao):
+    """Bytes do botão de download (o próprio arquivo), lidos uma vez por versão"""
+    with open(ARQUIVO_CHAVES, 'rb') as f:
+        return f.read()
+
 # === FUNÇÃO PARA CONVERTER CHAVES EXISTENTES ===
 
-def aplicar_mascara_chaves_existentes():
-    """Aplica máscara de aspas simples em chaves que ainda não possuem"""
-    if os.path.exists(ARQUIVO_CHAVES):
-        try:
-            # Lê o CSV garantindo que todas as chaves sejam STRING
-            df = pd.read_csv(ARQUIVO_CHAVES, dtype=str, encoding='utf-8-sig')
-            
-            if 'Chave' in df.columns and not df.empty:
-                # Verifica se existem chaves sem aspas simples
-                chaves_sem_aspas = df[~df['Chave'].str.startswith("'", na=False)]
-                
-                if not chaves_sem_aspas.empty:
-                    # Aplica máscara nas chaves que não têm aspas simples
-                    df.loc[~df['Chave'].str.startswith("'", na=False), 'Chave'] = "'" + df.loc[~df['Chave'].str.startswith("'", na=False), 'Chave'].astype(str)
-                    
-                    # Força TODAS as colunas como string antes de salvar
-                    df = df.astype(str)
-                    
-                    # Salva o CSV atualizado
-                    df.to_csv(ARQUIVO_CHAVES, index=False, encoding='utf-8-sig', quoting=csv.QUOTE_ALL)
-                    
-                    return len(chaves_sem_aspas)
-            return 0
-        except Exception:
+def _linhas_com_progresso(arquivo, total_bytes, progresso, intervalo):
+    """Itera as linhas do arquivo contando bytes lidos para reportar o progresso"""
+    bytes_lidos = 0
+    for numero, linha in enumerate(arquivo, 1):
+        bytes_lidos += len(linha.encode('utf-8'))
+        if progresso and numero % intervalo == 0:
+            progresso(numero, min(bytes_lidos / total_bytes, 1.0) if total_bytes else 1.0)
+        yield linha
+
+def aplicar_mascara_chaves_existentes(progresso=None, intervalo_progresso=100_000):
+    """
+    Aplica máscara de aspas simples em chaves que ainda não possuem.
+
+    Migração em streaming: o CSV é lido linha a linha e reescrito em um arquivo
+    temporário na mesma pasta, que substitui o original de forma atômica
+    (os.replace). O uso de memória é constante, independente do tamanho do arquivo.
+
+    progresso: callback opcional progresso(linhas_lidas, fracao_0_a_1), chamado a
+    cada `intervalo_progresso` linhas e ao final.
+    """
+    if not os.path.exists(ARQUIVO_CHAVES):
+        return 0
+
+    pasta = os.path.dirname(os.path.abspath(ARQUIVO_CHAVES))
+    total_bytes = os.path.getsize(ARQUIVO_CHAVES)
+    caminho_tmp = None
+
+    try:
+        with open(ARQUIVO_CHAVES, 'r', newline='', encoding='utf-8-sig') as origem:
+            leitor = csv.reader(_linhas_com_progresso(origem, total_bytes, progresso, intervalo_progresso))
+            cabecalho = next(leitor, None)
+            if not cabecalho or 'Chave' not in cabecalho:
+                return 0
+            indice_chave = cabecalho.index('Chave')
+
+            fd, caminho_tmp = tempfile.mkstemp(prefix='.chaves_', suffix='.tmp', dir=pasta)
+            convertidas = 0
+            linhas = 0
+            with os.fdopen(fd, 'w', newline='', encoding='utf-8-sig') as destino:
+                escritor = csv.writer(destino, quoting=csv.QUOTE_ALL)
+                escritor.writerow(cabecalho)
+                for linha in leitor:
+                    linhas += 1
+                    if len(linha) > indice_chave and linha[indice_chave] and not linha[indice_chave].startswith("'"):
+                        linha[indice_chave] = "'" + linha[indice_chave]
+                        convertidas += 1
+                    escritor.writerow(linha)
+
+        if progresso:
+            progresso(linhas, 1.0)
+
+        # Nada a converter: mantém o arquivo original intacto
+        if convertidas == 0:
+            os.remove(caminho_tmp)
             return 0
-    return 0
+
+        # mkstemp cria com modo 0600; o CSV migrado mantém as permissões do original
+        shutil.copymode(ARQUIVO_CHAVES, caminho_tmp)
+        os.replace(caminho_tmp, ARQUIVO_CHAVES)
+        return convertidas
+    except Exception:
+        if caminho_tmp and os.path.exists(caminho_tmp):
+            os.remove(caminho_tmp)
+        return 0
 
 # === FUNÇÕES DE PROCESSAMENTO E SALVAMENTO (Unificadas) ===
 
 def extrair_chave(texto):
     """Extrai chave de acesso (44 dígitos) do texto do QR Code, com múltiplos padrões."""
+    if PARSER_PAYLOAD_DISPONIVEL:
+        # Uma única busca compilada (p= v2/v3, chNFe= v1, %7C, chave direta)
+        return extract_key(texto)
+    
     try:
         # Padrões comuns de URL de cupom fiscal (preservado do appscanner.py)
         if 'p=' in texto:
@@ -77,308 +218,77 @@ def salvar_dados(chave):
     # Normaliza a chave para salvar como STRING com aspas simples (força texto no Excel)
     chave_str = "'" + str(chave).strip()
     
-    if os.path.exists(ARQUIVO_CHAVES):
-        # Lê o CSV forçando TODAS as colunas a serem string
-        df = pd.read_csv(ARQUIVO_CHAVES, dtype=str, encoding='utf-8-sig')
-        
-        # Verifica se a chave já existe (comparação como string)
-        if 'Chave' in df.columns and chave_str in df['Chave'].astype(str).values:
-            return False  # Já existe
-        
-        # Adiciona nova linha garantindo tipo STRING
-        nova_linha = pd.DataFrame({'Chave': [chave_str]})
-        df = pd.concat([df, nova_linha], ignore_index=True)
-    else:
-        # Cria DataFrame inicial com tipo STRING explícito
-        df = pd.DataFrame({'Chave': [chave_str]})
-    
-    # Força TODAS as colunas como string antes de salvar
-    df = df.astype(str)
-    
-    # Salva o CSV com aspas em TODOS os valores (força texto)
-    df.to_csv(ARQUIVO_CHAVES, index=False, encoding='utf-8-sig', quoting=csv.QUOTE_ALL)
+    # Consulta o arquivo central (busca binária no arquivo mapeado, sem carregá-lo)
+    arquivo_central = carregar_arquivo_central(ARQUIVO_CENTRAL)
+    if arquivo_central is not None and str(chave).strip() in arquivo_central:
+        return False  # Já existe no histórico central
     
-    # Força atualização da interface Streamlit (se estiver rodando)
-    try:
-        if 'contador_chaves' in st.session_state:
-            st.session_state['contador_chaves'] = len(df)
-        if 'lista_atualizada' in st.session_state:
-            st.session_state['lista_atualizada'] = False
-    except Exception:
-        pass
+    # Câmera (thread do WebRTC) e upload podem salvar ao mesmo tempo
+    estado = tabela_em_memoria()
+    with estado['trava']:
+        versao = versao_arquivo(ARQUIVO_CHAVES)
+        if versao is not None:
+            # Duplicata conferida na tabela em memória (busca binária), sem reler o CSV
+            tabela = carregar_tabela_chaves(versao)
+            if chave_str in tabela:
+                return False  # Já existe
+            if not acrescentar_linha_csv(chave_str):
+                return salvar_dados_reescrevendo(chave_str)
+            tabela.estender([chave_str])
+            estado['versao'] = versao_arquivo(ARQUIVO_CHAVES)
+        else:
+            acrescentar_linha_csv(chave_str)
     
+    # A interface não é avisada: o fragmento da lista percebe a nova versão do
+    # CSV (mtime, tamanho) no próximo ciclo, sem rerun do script inteiro
     return True
 
-# === FUNÇÕES DE VISÃO COMPUTACIONAL PARA IMAGENS ESTÁTICAS (Upload) - REVERTIDO PARA APP.PY ===
-
-def processar_imagem(img_pil):
-    """
-    [ORIGINAL APP.PY] Aplica técnicas (filtros, rotações e escalas) para maximizar detecção de QR Code
+def acrescentar_linha_csv(chave_str):
     """
-    img_array = np.array(img_pil)
-    if img_array.shape[2] == 4:
-        img_array = cv2.cvtColor(img_array, cv2.COLOR_RGBA2RGB)
-    
-    tecnicas = []
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-    
-    # Técnicas básicas
-    tecnicas.append(("Original", img_array))
-    tecnicas.append(("Cinza", gray))
-    
-    # Técnicas OpenCV (Filtros)
-    _, otsu = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    tecnicas.append(("Otsu", otsu))
-    
-    adaptivo = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-    tecnicas.append(("Adaptativo", adaptivo))
-    
-    equalizado = cv2.equalizeHist(gray)
-    tecnicas.append(("Equalizado", equalizado))
-    
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-    clahe_img = clahe.apply(gray)
-    tecnicas.append(("CLAHE", clahe_img))
-    
-    bilateral = cv2.bilateralFilter(gray, 9, 75, 75)
-    tecnicas.append(("Bilateral", bilateral))
-    
-    # Rotações e escalas
-    todas_tentativas = []
-    for nome, img in tecnicas:
-        # Testa rotações de 0°, 90°, 180°, 270°
-        for angulo in [0, 90, 180, 270]:
-            if angulo == 0:
-                img_rot = img
-            else:
-                img_rot = np.rot90(img, k=angulo//90)
-            
-            todas_tentativas.append((f"{nome}_{angulo}°", img_rot))
-            
-            # Testa escalas
-            for escala in [0.7, 1.5]:
-                try:
-                    h, w = img_rot.shape[:2]
-                    novo_w, novo_h = int(w * escala), int(h * escala)
-                    # Use INTER_CUBIC para ampliação, INTER_AREA para redução (mais adequado)
-                    interp = cv2.INTER_CUBIC if escala > 1 else cv2.INTER_AREA
-                    img_esc = cv2.resize(img_rot, (novo_w, novo_h), interpolation=interp)
-                    todas_tentativas.append((f"{nome}_{angulo}°_{escala}x", img_esc))
-                except Exception:
-                    continue # Ignora se a imagem for muito pequena
-    
-    return todas_tentativas
+    Acrescenta UMA linha ao CSV (aspas em todos os valores, força texto)
 
-def ler_qr_code(img_pil):
-    """
-    [ORIGINAL APP.PY] Tenta ler QR Code com PyZBar na imagem original 
-    e em todas as imagens processadas (filtros, rotações, escalas).
+    Cria o arquivo com o cabeçalho se não existir. Retorna False se o CSV
+    não tiver a coluna Chave (o chamador reescreve o arquivo com pandas).
     """
-    # Tentar original primeiro
-    resultado = decode(img_pil)
-    if resultado:
-        return resultado, "Original", 1
-    
-    # Aplicar todas as técnicas de pré-processamento
-    tentativas = processar_imagem(img_pil)
+    if not os.path.exists(ARQUIVO_CHAVES) or os.path.getsize(ARQUIVO_CHAVES) == 0:
+        with open(ARQUIVO_CHAVES, 'w', newline='', encoding='utf-8-sig') as f:
+            csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator=os.linesep).writerows([['Chave'], [chave_str]])
+        return True
     
-    for i, (nome, img) in enumerate(tentativas, 2):
-        try:
-            # Converte array numpy processado para imagem PIL (requisito PyZBar)
-            if len(img.shape) == 2: # Grayscale
-                img_proc = img.astype('uint8') if img.dtype != np.uint8 else img
-                img_pil_proc = Image.fromarray(img_proc, mode='L')
-            else: # Color (RGB)
-                img_proc = img.astype('uint8') if img.dtype != np.uint8 else img
-                img_pil_proc = Image.fromarray(img_proc)
-            
-            resultado = decode(img_pil_proc)
-            if resultado:
-                # Retorna apenas o resultado, nome do método e tentativas (não retorna points)
-                return resultado, nome, i
-        except:
-            continue
+    with open(ARQUIVO_CHAVES, 'r', newline='', encoding='utf-8-sig') as f:
+        cabecalho = next(csv.reader(f), [])
+    if 'Chave' not in cabecalho:
+        return False
+    linha = [''] * len(cabecalho)
+    linha[cabecalho.index('Chave')] = chave_str
     
-    return None, f"Falhou após {len(tentativas)+1} tentativas", len(tentativas)+1
+    with open(ARQUIVO_CHAVES, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        termina_com_quebra = f.read(1) == b'\n'
+    with open(ARQUIVO_CHAVES, 'a', newline='', encoding='utf-8') as f:
+        if not termina_com_quebra:
+            f.write(os.linesep)
+        csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator=os.linesep).writerow(linha)
+    return True
 
-# NOTA: draw_detection_frame_static FOI REMOVIDA POIS NÃO É USADA PELA LÓGICA DO APP.PY
+def salvar_dados_reescrevendo(chave_str):
+    """CSV sem a coluna Chave: cria a coluna e reescreve o arquivo inteiro (caso raro)"""
+    pd = carregar_pandas()
+    df = pd.read_csv(ARQUIVO_CHAVES, dtype=str, encoding='utf-8-sig')
+    df = pd.concat([df, pd.DataFrame({'Chave': [chave_str]})], ignore_index=True).astype(str)
+    df.to_csv(ARQUIVO_CHAVES, index=False, encoding='utf-8-sig', quoting=csv.QUOTE_ALL)
+    return True
 
-# === LEITURA EM TEMPO REAL (Classe VideoTransformer) - Preservada ===
+# === FUNÇÕES DE VISÃO COMPUTACIONAL ===
+# processar_imagem, ler_qr_code e o detector do tempo real ficam em deteccao.py
+# (sem Streamlit), para que os benchmarks possam importá-los.
 
-class QRReader(VideoTransformerBase):
-    """Processa frames de vídeo para detectar QR Codes em tempo real usando algoritmos de visão computacional"""
-    
-    def __init__(self):
-        self.detector_opencv = cv2.QRCodeDetector()
-        self.feedback_counter = 0
-        self.feedback_duration = 90  # frames para mostrar feedback (aprox. 3 segundos a 30fps)
-    
-    def apply_computer_vision_preprocessing(self, img):
-        """Aplica algoritmos de visão computacional para melhorar detecção de QR Code"""
-        if len(img.shape) == 3:
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = img.copy()
-        
-        processed_images = []
-        
-        # 1. Imagem original em cinza
-        processed_images.append(("original", gray))
-        
-        # 2. Threshold adaptativo
-        adaptive_thresh = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-        )
-        processed_images.append(("adaptive", adaptive_thresh))
-        
-        # 3. Filtro Gaussiano + Threshold
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        _, gaussian_thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        processed_images.append(("gaussian", gaussian_thresh))
-        
-        # 4. Operações morfológicas
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-        morphology = cv2.morphologyEx(adaptive_thresh, cv2.MORPH_CLOSE, kernel)
-        processed_images.append(("morphology", morphology))
-        
-        # 5. CLAHE (Contraste adaptativo)
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(gray)
-        processed_images.append(("enhanced", enhanced))
-        
-        return processed_images
-    
-    def detect_qr_with_computer_vision(self, img):
-        """Usa múltiplos algoritmos de visão computacional para detectar QR Code"""
-        # Tenta detecção na imagem original primeiro
-        texto, points, _ = self.detector_opencv.detectAndDecode(img)
-        if texto:
-            return texto, points, "opencv_original"
-        
-        # Aplica pré-processamento com visão computacional
-        processed_images = self.apply_computer_vision_preprocessing(img)
-        
-        # Tenta detectar em cada imagem processada
-        for method_name, processed_img in processed_images:
-            try:
-                # OpenCV QR Detector
-                texto, points, _ = self.detector_opencv.detectAndDecode(processed_img)
-                if texto:
-                    return texto, points, f"opencv_{method_name}"
-                
-                # Fallback: usar pyzbar
-                try:
-                    # Converte imagem processada para formato PIL (pyzbar requirement)
-                    if len(processed_img.shape) == 2:
-                        pil_img = Image.fromarray(processed_img)
-                        resultado_pyzbar = decode(pil_img)
-                        if resultado_pyzbar:
-                            # Converte resultado pyzbar para formato OpenCV
-                            rect = resultado_pyzbar[0].rect
-                            points = np.array([[[rect.left, rect.top], 
-                                              [rect.left + rect.width, rect.top],
-                                              [rect.left + rect.width, rect.top + rect.height],
-                                              [rect.left, rect.top + rect.height]]], dtype=np.float32)
-                            texto = resultado_pyzbar[0].data.decode('utf-8')
-                            return texto, points, f"pyzbar_{method_name}"
-                except ImportError:
-                    pass
-                    
-            except Exception:
-                continue
-        
-        return None, None, "detection_failed"
-    
-    def draw_detection_frame(self, img, points, detection_method, status="detected"):
-        """Desenha quadro dinâmico de detecção (preservado do appscanner.py)"""
-        if points is None:
-            return img
-        
-        try:
-            pts = np.int32(points).reshape(-1, 1, 2)
-            (x, y, w, h) = cv2.boundingRect(pts)
-            
-            # Cores baseadas no status
-            if status == "success": primary_color, secondary_color = (0, 255, 0), (0, 200, 0)
-            elif status == "duplicate": primary_color, secondary_color = (0, 255, 255), (0, 200, 200)
-            elif status == "invalid": primary_color, secondary_color = (0, 165, 255), (0, 100, 200)
-            else: primary_color, secondary_color = (255, 255, 0), (200, 200, 0)
-            
-            # Desenha contorno e quadro principal (simplificado)
-            cv2.polylines(img, [pts], True, primary_color, 3)
-            margin = 20
-            cv2.rectangle(img, (x-margin, y-margin), (x+w+margin, y+h+margin), secondary_color, 2)
-            
-            # Informações da detecção
-            cv2.putText(img, "QR DETECTADO", (x-margin, y-margin-10), cv2.FONT_HERSHEY_DUPLEX, 0.7, primary_color, 2)
-            cv2.putText(img, f"Metodo: {detection_method}", (x-margin, y+h+margin+25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, primary_color, 1)
-            
-        except Exception:
-            pass
-        
-        return img
-    
-    def transform(self, frame):
-        img = frame.to_ndarray(format="bgr24")
-        height, width = img.shape[:2]
-        
-        # Lógica de Feedback e Trava
-        if st.session_state.get('qr_lock_success', False):
-            self.feedback_counter += 1
-            if self.feedback_counter >= self.feedback_duration:
-                st.session_state['qr_lock_success'] = False
-                st.session_state['last_detected_key'] = None
-                st.session_state['lista_atualizada'] = False
-                self.feedback_counter = 0
-            
-            # Desenha overlay de pausa
-            overlay = img.copy()
-            cv2.rectangle(overlay, (0, 0), (width, 120), (0, 150, 0), -1)
-            img = cv2.addWeighted(img, 0.7, overlay, 0.3, 0)
-            
-            remaining_time = max(0, self.feedback_duration - self.feedback_counter)
-            seconds_left = int(remaining_time / 30)
-            cv2.putText(img, "SUCESSO! PREPARANDO PARA PROXIMO...", (20, 35), cv2.FONT_HERSHEY_DUPLEX, 0.7, (255, 255, 255), 2)
-            cv2.putText(img, f"Proximo QR em: {seconds_left + 1}s", (20, 65), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-            
-        elif not st.session_state.get('qr_lock_success', False):
-            
-            cv2.putText(img, "BUSCANDO QR CODE COM IA...", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-            
-            texto, points, metodo_deteccao = self.detect_qr_with_computer_vision(img)
-            
-            if texto:
-                img = self.draw_detection_frame(img, points, metodo_deteccao, "detected")
-                
-                chave = extrair_chave(texto)
-                
-                if chave:
-                    if salvar_dados(chave):
-                        # CHAVE SALVA (Sucesso)
-                        img = self.draw_detection_frame(img, points, metodo_deteccao, "success")
-                        st.session_state['qr_lock_success'] = True
-                        st.session_state['last_detected_key'] = chave
-                        st.session_state['lista_atualizada'] = False
-                        self.feedback_counter = 0
-                        st.success("🔑 Chave de acesso detectada e SALVA com sucesso!")
-                    else:
-                        # CHAVE JÁ EXISTE (Aviso)
-                        img = self.draw_detection_frame(img, points, metodo_deteccao, "duplicate")
-                        st.session_state['qr_lock_success'] = True
-                        st.session_state['lista_atualizada'] = False
-                        self.feedback_counter = 0
-                        st.warning("⚠️ Chave detectada, mas JÁ EXISTE no registro!")
-                else:
-                    # QR CODE LIDO, MAS CHAVE INVÁLIDA
-                    img = self.draw_detection_frame(img, points, metodo_deteccao, "invalid")
-            else:
-                pass
-        
-        return img
+# NOTA: draw_detection_frame_static FOI REMOVIDA POIS NÃO É USADA PELA LÓGICA DO APP.PY
 
 # === INTERFACE STREAMLIT PRINCIPAL (Unificada) ===
 
 st.set_page_config(page_title="Leitor QR Code Unificado", layout="centered")
+PERFILADOR = carregar_perfilador()
 st.title("📱 Leitor de QR Code - Cupons Fiscais")
 st.write("Sistema eficaz para extrair chaves de acesso (44 dígitos)")
 
@@ -392,34 +302,111 @@ Se você ver erro "navigator.mediaDevices is undefined", use:
 
 # Inicializa estado
 if 'qr_lock_success' not in st.session_state: st.session_state['qr_lock_success'] = False
-if 'lista_atualizada' not in st.session_state: st.session_state['lista_atualizada'] = True
-if 'contador_chaves' not in st.session_state: st.session_state['contador_chaves'] = 0
 
-# Verifica mudanças no arquivo CSV para forçar atualização
-def verificar_mudancas_csv():
-    if os.path.exists(ARQUIVO_CHAVES):
-        try:
-            # Lê o CSV forçando TODAS as colunas a serem string
-            df = pd.read_csv(ARQUIVO_CHAVES, dtype=str, encoding='utf-8-sig')
-            novo_contador = len(df)
-        except Exception:
-            novo_contador = 0
-    else:
-        novo_contador = 0
-    
-    if novo_contador != st.session_state.get('contador_chaves', 0):
-        st.session_state['contador_chaves'] = novo_contador
-        return True
-    return False
+# === FRAGMENTOS (atualização parcial) ===
+# Lista, contadores e botões rodam como fragmentos: seus botões só reexecutam
+# o próprio fragmento. Só a lista confere a versão do CSV a cada
+# INTERVALO_ATUALIZACAO segundos; câmera e upload nunca são reexecutados
+# quando uma chave é salva.
 
-# Sistema de auto-refresh melhorado
-if not st.session_state.get('lista_atualizada', True):
-    st.session_state['lista_atualizada'] = True
-    st.rerun()
+@st.fragment
+def controles_camera():
+    """Botões e última chave lida, abaixo do vídeo"""
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        if st.button("🔄 Reiniciar Leitura", help="Força reinício imediato da leitura"):
+            st.session_state['qr_lock_success'] = False
+            st.session_state['last_detected_key'] = None
+    
+    with col2:
+        if st.session_state.get('last_detected_key'):
+            st.success(f"🔑 Última: `{st.session_state['last_detected_key'][-8:]}...`")
+    
+    with col3:
+        if st.button("🔬 Perfilar 30 frames", help=f"Grava as leituras mais lentas em {PERFILADOR.pasta}"):
+            PERFILADOR.armar(30, 'frame')
 
-# Detecta mudanças automáticas no CSV
-if verificar_mudancas_csv():
-    st.rerun()
+@st.fragment(run_every=INTERVALO_ATUALIZACAO)
+def painel_chaves():
+    """Contador, tabela e ações das chaves salvas (versão do CSV como gatilho)"""
+    versao_chaves = versao_arquivo(ARQUIVO_CHAVES)
+    if versao_chaves is None:
+        st.info("Nenhuma chave salva ainda.")
+        return
+    
+    # CSV lido e decodificado uma vez por versão; cada ciclo só fatia a página
+    tabela = carregar_tabela_chaves(versao_chaves)
+    if len(tabela) == 0:
+        st.info("Nenhuma chave salva ainda.")
+        return
+    
+    st.subheader(f"📊 Chaves Salvas ({len(tabela)})")
+    
+    # Verifica se existem chaves sem máscara
+    if tabela.sem_mascara:
+        st.warning(f"⚠️ {tabela.sem_mascara} chaves encontradas sem proteção para Excel!")
+        if st.button("🔧 Aplicar Máscara de Proteção (Aspas Simples)", help="Adiciona aspas simples nas chaves existentes para proteção no Excel"):
+            barra_progresso = st.progress(0.0, text="Convertendo chaves...")
+            chaves_convertidas = aplicar_mascara_chaves_existentes(
+                progresso=lambda linhas, fracao: barra_progresso.progress(fracao, text=f"Convertendo chaves... {linhas:,} linhas")
+            )
+            if chaves_convertidas > 0:
+                st.success(f"✅ {chaves_convertidas} chaves convertidas com sucesso!")
+                st.rerun(scope="fragment")
+            else:
+                st.info("ℹ️ Nenhuma chave precisava ser convertida.")
+    
+    # Busca, ordenação e página: só as linhas visíveis vão para o navegador
+    from tabela_chaves import ORDENACOES, TAMANHO_PAGINA
+    col_busca, col_ordem, col_sentido = st.columns([3, 2, 1])
+    with col_busca:
+        consulta = st.text_input("🔍 Filtrar", key='busca_chaves',
+                                 placeholder="dígitos, uf:SP, cnpj:12345678, mes:2401")
+    with col_ordem:
+        ordenacao = st.selectbox("Ordenar por", list(ORDENACOES), key='ordenacao_chaves')
+    with col_sentido:
+        decrescente = st.toggle("Decrescente", value=True, key='ordem_decrescente')
+    
+    paginas = max(1, -(-tabela.total(consulta) // TAMANHO_PAGINA))
+    if st.session_state.get('pagina_chaves', 1) > paginas:
+        st.session_state['pagina_chaves'] = paginas
+    numero = st.number_input("Página", min_value=1, max_value=paginas, step=1, key='pagina_chaves')
+    
+    # Ciclo sem mudança (mesma versão do CSV e mesmos controles): repete a página
+    # já montada sem filtrar nem formatar. Não dá para só retornar: o que o
+    # fragmento não redesenha some da tela.
+    pedido = (versao_chaves, consulta, ordenacao, decrescente, numero)
+    exibida = st.session_state.get('pagina_exibida')
+    if exibida is None or exibida[0] != pedido:
+        exibida = st.session_state['pagina_exibida'] = (pedido, tabela.pagina(consulta, ordenacao, decrescente, numero))
+    linhas, total, paginas = exibida[1]
+    
+    # Chaves aparecem como texto (valor do CSV, com a aspa simples)
+    st.dataframe(linhas, width='stretch', hide_index=True)
+    st.caption(f"Página {numero} de {paginas} • {total} de {len(tabela)} chaves")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        # CSV com formato de texto, gerado uma vez por versão do arquivo
+        st.download_button(
+            "📥 Baixar Chaves (CSV)", 
+            csv_para_download(versao_chaves), 
+            ARQUIVO_CHAVES, 
+            "text/csv"
+        )
+    
+    with col2:
+        # O clique já reexecuta o fragmento, que relê a versão do arquivo
+        st.button("🔄 Atualizar Lista", help="Recarrega a lista de chaves do arquivo")
+    
+    with col3:
+        if st.button("🗑️ Limpar Todas as Chaves", type="secondary"):
+            if os.path.exists(ARQUIVO_CHAVES):
+                os.remove(ARQUIVO_CHAVES)
+                st.success("✅ Todas as chaves foram removidas!")
+                st.rerun(scope="fragment")
 
 # 1. Abas para organizar as opções
 tab_camera, tab_upload = st.tabs(["📹 Câmera em Tempo Real", "📤 Upload de Imagem"])
@@ -439,26 +426,16 @@ with tab_camera:
     """, unsafe_allow_html=True)
     
     try:
+        webrtc_streamer, QRReader = carregar_camera()
         webrtc_ctx = webrtc_streamer(
             key="qr-code-scanner", 
-            video_processor_factory=QRReader,
+            video_processor_factory=lambda: QRReader(extrair_chave, salvar_dados, METRICAS, PERFILADOR),
             rtc_configuration={"iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]},
             media_stream_constraints={"video": True, "audio": False}
         )
         
         if webrtc_ctx and webrtc_ctx.state.playing:
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                if st.button("🔄 Reiniciar Leitura", help="Força reinício imediato da leitura"):
-                    st.session_state['qr_lock_success'] = False
-                    st.session_state['last_detected_key'] = None
-                    st.session_state['lista_atualizada'] = False
-                    st.rerun()
-            
-            with col2:
-                if st.session_state.get('last_detected_key'):
-                    st.success(f"🔑 Última: `{st.session_state['last_detected_key'][-8:]}...`")
+            controles_camera()
         
     except Exception as exc:
         st.error("❌ **Erro de Câmera Detectado**")
@@ -500,8 +477,11 @@ with tab_upload:
     st.info("🔄 Sistema de Força Bruta: Testa múltiplos filtros, rotações (0°, 90°, 180°, 270°) e escalas para garantir a leitura em fotos complexas.")
     
     arquivo_img = st.file_uploader("Selecione uma imagem (PNG, JPG, JPEG)", type=["png", "jpg", "jpeg"])
+    perfilar_upload = st.checkbox("🔬 Perfilar esta leitura (diagnóstico de lentidão)",
+                                  value=PERFILADOR.ativo, disabled=PERFILADOR.ativo)
 
     if arquivo_img:
+        Image, ler_qr_code = carregar_leitura_upload()
         img = Image.open(arquivo_img)
         
         col1, col2 = st.columns([1, 2])
@@ -513,8 +493,19 @@ with tab_upload:
             with st.spinner("🔍 Analisando imagem com algoritmos de força bruta..."):
                 
                 # --- CHAMA A FUNÇÃO DE FORÇA BRUTA DO APP.PY ---
-                resultado, metodo, tentativas = ler_qr_code(img)
+                if perfilar_upload:
+                    PERFILADOR.armar(1, 'upload')
+                ignorados = PERFILADOR.ignorados.get('upload', 0)
+                resultado, metodo, tentativas = PERFILADOR.perfilar('upload', ler_qr_code, img, imagem=img)
                 # -----------------------------------------------
+            
+            if perfilar_upload:
+                piores = PERFILADOR.piores()
+                if PERFILADOR.ignorados.get('upload', 0) > ignorados:
+                    st.caption("🔬 Perfil não gravado: outra leitura estava sendo perfilada")
+                elif piores:
+                    st.caption(f"🔬 {len(piores)} leituras lentas em `{PERFILADOR.pasta}` "
+                               f"(mais lenta: {piores[0][0]:.0f} ms)")
         
         st.markdown("---")
         
@@ -531,7 +522,6 @@ with tab_upload:
                 # Salva os dados usando a função unificada
                 if salvar_dados(chave):
                     st.success("💾 Chave salva!")
-                    st.session_state['lista_atualizada'] = False
                     st.balloons()
                 else:
                     st.warning("⚠️ Chave já existe")
@@ -549,57 +539,4 @@ with tab_upload:
 # --- Dados salvos (Rodapé) ---
 st.markdown("---")
 
-if os.path.exists(ARQUIVO_CHAVES):
-    # Lê o CSV garantindo que todas as chaves sejam STRING
-    df = pd.read_csv(ARQUIVO_CHAVES, dtype=str, encoding='utf-8-sig') 
-    if not df.empty:
-        st.subheader(f"📊 Chaves Salvas ({len(df)})")
-        
-        # Verifica se existem chaves sem máscara
-        chaves_sem_aspas = df[~df['Chave'].str.startswith("'", na=False)] if 'Chave' in df.columns else pd.DataFrame()
-        
-        if not chaves_sem_aspas.empty:
-            st.warning(f"⚠️ {len(chaves_sem_aspas)} chaves encontradas sem proteção para Excel!")
-            if st.button("🔧 Aplicar Máscara de Proteção (Aspas Simples)", help="Adiciona aspas simples nas chaves existentes para proteção no Excel"):
-                chaves_convertidas = aplicar_mascara_chaves_existentes()
-                if chaves_convertidas > 0:
-                    st.success(f"✅ {chaves_convertidas} chaves convertidas com sucesso!")
-                    st.rerun()
-                else:
-                    st.info("ℹ️ Nenhuma chave precisava ser convertida.")
-        
-        # Exibe DataFrame garantindo que chaves apareçam como texto
-        df_display = df.copy()
-        st.dataframe(df_display, width='stretch')
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            # Gera CSV garantindo formato de texto
-            csv_content = df.to_csv(index=False, encoding='utf-8-sig', quoting=csv.QUOTE_ALL).encode('utf-8-sig')
-            st.download_button(
-                "📥 Baixar Chaves (CSV)", 
-                csv_content, 
-                ARQUIVO_CHAVES, 
-                "text/csv"
-            )
-        
-        with col2:
-            if st.button("🔄 Atualizar Lista", help="Recarrega a lista de chaves do arquivo"):
-                st.session_state['lista_atualizada'] = False
-                st.session_state['contador_chaves'] = 0
-                st.success("✅ Lista atualizada!")
-                st.rerun()
-        
-        with col3:
-            if st.button("🗑️ Limpar Todas as Chaves", type="secondary"):
-                if os.path.exists(ARQUIVO_CHAVES):
-                    os.remove(ARQUIVO_CHAVES)
-                    st.session_state['lista_atualizada'] = False
-                    st.session_state['contador_chaves'] = 0
-                    st.success("✅ Todas as chaves foram removidas!")
-                    st.rerun()
-    else:
-        st.info("Nenhuma chave salva ainda.")
-else:
-    st.info("Nenhuma chave salva ainda.")
+painel_chaves()
@@ -0,0 +1,251 @@
+# Detecção de QR Code do Mercado em Números (sem dependência do Streamlit)
+# Funções de upload (processar_imagem / ler_qr_code) e o detector de visão
+# computacional usado na leitura em tempo real, importáveis pelos benchmarks.
+
+# === IMPORTAÇÕES E DEPENDÊNCIAS ===
+import time                         # Linha do tempo das tentativas (perfilamento)
+from contextlib import nullcontext  # Cronômetro vazio quando não há métricas
+from PIL import Image               # Biblioteca para manipulação de imagens
+import cv2                          # OpenCV para visão computacional
+import numpy as np                  # Operações matemáticas com arrays
+
+try:
+    from pyzbar.pyzbar import decode  # Decodificação de QR Codes (requer libzbar)
+    PYZBAR_DISPONIVEL = True
+except ImportError:
+    decode = None
+    PYZBAR_DISPONIVEL = False
+
+# === FUNÇÕES DE VISÃO COMPUTACIONAL PARA IMAGENS ESTÁTICAS (Upload) - REVERTIDO PARA APP.PY ===
+
+def processar_imagem(img_pil):
+    """
+    [ORIGINAL APP.PY] Aplica técnicas (filtros, rotações e escalas) para maximizar detecção de QR Code
+    """
+    img_array = np.array(img_pil)
+    if img_array.ndim == 2:
+        img_array = cv2.cvtColor(img_array, cv2.COLOR_GRAY2RGB)
+    elif img_array.shape[2] == 4:
+        img_array = cv2.cvtColor(img_array, cv2.COLOR_RGBA2RGB)
+
+    tecnicas = []
+    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+
+    # Técnicas básicas
+    tecnicas.append(("Original", img_array))
+    tecnicas.append(("Cinza", gray))
+
+    # Técnicas OpenCV (Filtros)
+    _, otsu = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    tecnicas.append(("Otsu", otsu))
+
+    adaptivo = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+    tecnicas.append(("Adaptativo", adaptivo))
+
+    equalizado = cv2.equalizeHist(gray)
+    tecnicas.append(("Equalizado", equalizado))
+
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+    clahe_img = clahe.apply(gray)
+    tecnicas.append(("CLAHE", clahe_img))
+
+    bilateral = cv2.bilateralFilter(gray, 9, 75, 75)
+    tecnicas.append(("Bilateral", bilateral))
+
+    # Rotações e escalas
+    todas_tentativas = []
+    for nome, img in tecnicas:
+        # Testa rotações de 0°, 90°, 180°, 270°
+        for angulo in [0, 90, 180, 270]:
+            if angulo == 0:
+                img_rot = img
+            else:
+                img_rot = np.rot90(img, k=angulo//90)
+
+            todas_tentativas.append((f"{nome}_{angulo}°", img_rot))
+
+            # Testa escalas
+            for escala in [0.7, 1.5]:
+                try:
+                    h, w = img_rot.shape[:2]
+                    novo_w, novo_h = int(w * escala), int(h * escala)
+                    # Use INTER_CUBIC para ampliação, INTER_AREA para redução (mais adequado)
+                    interp = cv2.INTER_CUBIC if escala > 1 else cv2.INTER_AREA
+                    img_esc = cv2.resize(img_rot, (novo_w, novo_h), interpolation=interp)
+                    todas_tentativas.append((f"{nome}_{angulo}°_{escala}x", img_esc))
+                except Exception:
+                    continue # Ignora se a imagem for muito pequena
+
+    return todas_tentativas
+
+def _tentar(decodificador, imagem, nome, linha_do_tempo):
+    """Chama o decodificador; com `linha_do_tempo` registra nome, tempo e sucesso"""
+    if linha_do_tempo is None:
+        return decodificador(imagem)
+    inicio = time.perf_counter()
+    resultado = decodificador(imagem)
+    linha_do_tempo.append({'etapa': nome, 'ms': (time.perf_counter() - inicio) * 1000, 'ok': bool(resultado)})
+    return resultado
+
+def ler_qr_code(img_pil, decodificador=None, linha_do_tempo=None):
+    """
+    [ORIGINAL APP.PY] Tenta ler QR Code com PyZBar na imagem original
+    e em todas as imagens processadas (filtros, rotações, escalas).
+
+    `decodificador` substitui o decode do PyZBar (ex.: benchmarks sem libzbar).
+    `linha_do_tempo` (lista) recebe cada tentativa com seu tempo (perfilamento).
+    """
+    decodificador = decodificador or decode
+
+    # Tentar original primeiro
+    resultado = _tentar(decodificador, img_pil, "Original", linha_do_tempo)
+    if resultado:
+        return resultado, "Original", 1
+
+    # Aplicar todas as técnicas de pré-processamento
+    inicio = time.perf_counter()
+    tentativas = processar_imagem(img_pil)
+    if linha_do_tempo is not None:
+        linha_do_tempo.append({'etapa': 'processar_imagem', 'ms': (time.perf_counter() - inicio) * 1000,
+                               'ok': None})
+
+    for i, (nome, img) in enumerate(tentativas, 2):
+        try:
+            # Converte array numpy processado para imagem PIL (requisito PyZBar)
+            if len(img.shape) == 2: # Grayscale
+                img_proc = img.astype('uint8') if img.dtype != np.uint8 else img
+                img_pil_proc = Image.fromarray(img_proc, mode='L')
+            else: # Color (RGB)
+                img_proc = img.astype('uint8') if img.dtype != np.uint8 else img
+                img_pil_proc = Image.fromarray(img_proc)
+
+            resultado = _tentar(decodificador, img_pil_proc, nome, linha_do_tempo)
+            if resultado:
+                # Retorna apenas o resultado, nome do método e tentativas (não retorna points)
+                return resultado, nome, i
+        except:
+            continue
+
+    return None, f"Falhou após {len(tentativas)+1} tentativas", len(tentativas)+1
+
+# === DETECÇÃO EM TEMPO REAL (usada pelo QRReader) ===
+
+class DetectorVisaoComputacional:
+    """
+    OpenCV + pré-processamento, com fallback para PyZBar em cada imagem processada
+
+    `metricas` (pipeline_metrics.PipelineMetrics da pasta v2-android) cronometra
+    a conversão de cor, cada técnica e cada chamada de decodificação.
+    """
+
+    def __init__(self, metricas=None):
+        self.detector_opencv = cv2.QRCodeDetector()
+        self.ultimas_tentativas = 0  # Decodificações tentadas na última chamada
+        self.metricas = metricas
+        self.linha_do_tempo = None   # Lista de tentativas durante o perfilamento
+
+    def _cronometro(self, etapa, **rotulos):
+        return self.metricas.timer(etapa, **rotulos) if self.metricas is not None else nullcontext()
+
+    def _decodificar_opencv(self, img, tecnica):
+        """detectAndDecode cronometrado, com contagem de acertos por técnica"""
+        self.ultimas_tentativas += 1
+        inicio = time.perf_counter()
+        with self._cronometro('decode', technique=tecnica):
+            texto, points, _ = self.detector_opencv.detectAndDecode(img)
+        if self.linha_do_tempo is not None:
+            self.linha_do_tempo.append({'etapa': tecnica, 'ms': (time.perf_counter() - inicio) * 1000,
+                                        'ok': bool(texto)})
+        if self.metricas is not None:
+            self.metricas.inc('decode_calls', technique=tecnica, result='hit' if texto else 'miss')
+            if texto:
+                self.metricas.inc('detections', technique=tecnica)
+        return texto, points
+
+    def apply_computer_vision_preprocessing(self, img):
+        """Aplica algoritmos de visão computacional para melhorar detecção de QR Code"""
+        with self._cronometro('color_conversion', conversion='bgr2gray'):
+            if len(img.shape) == 3:
+                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            else:
+                gray = img.copy()
+
+        processed_images = []
+
+        # 1. Imagem original em cinza
+        processed_images.append(("original", gray))
+
+        # 2. Threshold adaptativo
+        with self._cronometro('preprocess', technique='adaptive'):
+            adaptive_thresh = cv2.adaptiveThreshold(
+                gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+            )
+        processed_images.append(("adaptive", adaptive_thresh))
+
+        # 3. Filtro Gaussiano + Threshold
+        with self._cronometro('preprocess', technique='gaussian'):
+            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+            _, gaussian_thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        processed_images.append(("gaussian", gaussian_thresh))
+
+        # 4. Operações morfológicas
+        with self._cronometro('preprocess', technique='morphology'):
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+            morphology = cv2.morphologyEx(adaptive_thresh, cv2.MORPH_CLOSE, kernel)
+        processed_images.append(("morphology", morphology))
+
+        # 5. CLAHE (Contraste adaptativo)
+        with self._cronometro('preprocess', technique='enhanced'):
+            clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+            enhanced = clahe.apply(gray)
+        processed_images.append(("enhanced", enhanced))
+
+        return processed_images
+
+    def detect_qr_with_computer_vision(self, img, linha_do_tempo=None):
+        """Usa múltiplos algoritmos de visão computacional para detectar QR Code"""
+        self.linha_do_tempo = linha_do_tempo
+
+        # Tenta detecção na imagem original primeiro
+        self.ultimas_tentativas = 0
+        texto, points = self._decodificar_opencv(img, "opencv_original")
+        if texto:
+            return texto, points, "opencv_original"
+
+        # Aplica pré-processamento com visão computacional
+        processed_images = self.apply_computer_vision_preprocessing(img)
+
+        # Tenta detectar em cada imagem processada
+        for method_name, processed_img in processed_images:
+            try:
+                # OpenCV QR Detector
+                texto, points = self._decodificar_opencv(processed_img, f"opencv_{method_name}")
+                if texto:
+                    return texto, points, f"opencv_{method_name}"
+
+                # Fallback: usar pyzbar
+                if PYZBAR_DISPONIVEL and len(processed_img.shape) == 2:
+                    # Converte imagem processada para formato PIL (pyzbar requirement)
+                    self.ultimas_tentativas += 1
+                    pil_img = Image.fromarray(processed_img)
+                    with self._cronometro('decode', technique=f"pyzbar_{method_name}"):
+                        resultado_pyzbar = _tentar(decode, pil_img, f"pyzbar_{method_name}", self.linha_do_tempo)
+                    if self.metricas is not None:
+                        self.metricas.inc('decode_calls', technique=f"pyzbar_{method_name}",
+                                          result='hit' if resultado_pyzbar else 'miss')
+                    if resultado_pyzbar:
+                        if self.metricas is not None:
+                            self.metricas.inc('detections', technique=f"pyzbar_{method_name}")
+                        # Converte resultado pyzbar para formato OpenCV
+                        rect = resultado_pyzbar[0].rect
+                        points = np.array([[[rect.left, rect.top],
+                                          [rect.left + rect.width, rect.top],
+                                          [rect.left + rect.width, rect.top + rect.height],
+                                          [rect.left, rect.top + rect.height]]], dtype=np.float32)
+                        texto = resultado_pyzbar[0].data.decode('utf-8')
+                        return texto, points, f"pyzbar_{method_name}"
+
+            except Exception:
+                continue
+
+        return None, None, "detection_failed"
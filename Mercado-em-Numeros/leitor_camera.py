@@ -0,0 +1,125 @@
+# Leitura em tempo real do Mercado em Números (QRReader do streamlit-webrtc)
+# Módulo separado para que o appscannerFinal.py só importe streamlit_webrtc,
+# OpenCV e o detector quando a aba da câmera é carregada.
+
+# === IMPORTAÇÕES E DEPENDÊNCIAS ===
+import streamlit as st              # Estado da sessão (trava após sucesso)
+import cv2                          # OpenCV para desenho do quadro de detecção
+import numpy as np                  # Operações matemáticas com arrays
+
+# Importação para acesso à câmera/webcam via WebRTC
+from streamlit_webrtc import VideoTransformerBase
+
+from deteccao import DetectorVisaoComputacional
+
+# === LEITURA EM TEMPO REAL (Classe VideoTransformer) - Preservada ===
+
+class QRReader(DetectorVisaoComputacional, VideoTransformerBase):
+    """Processa frames de vídeo para detectar QR Codes em tempo real usando algoritmos de visão computacional"""
+    
+    def __init__(self, extrair_chave, salvar_dados, metricas=None, perfilador=None):
+        DetectorVisaoComputacional.__init__(self, metricas=metricas)
+        self.extrair_chave = extrair_chave   # Funções do app (CSV e arquivo central)
+        self.salvar_dados = salvar_dados
+        self.perfilador = perfilador
+        self.feedback_counter = 0
+        self.feedback_duration = 90  # frames para mostrar feedback (aprox. 3 segundos a 30fps)
+    
+    def draw_detection_frame(self, img, points, detection_method, status="detected"):
+        """Desenha quadro dinâmico de detecção (preservado do appscanner.py)"""
+        if points is None:
+            return img
+        
+        try:
+            pts = np.int32(points).reshape(-1, 1, 2)
+            (x, y, w, h) = cv2.boundingRect(pts)
+            
+            # Cores baseadas no status
+            if status == "success": primary_color, secondary_color = (0, 255, 0), (0, 200, 0)
+            elif status == "duplicate": primary_color, secondary_color = (0, 255, 255), (0, 200, 200)
+            elif status == "invalid": primary_color, secondary_color = (0, 165, 255), (0, 100, 200)
+            else: primary_color, secondary_color = (255, 255, 0), (200, 200, 0)
+            
+            # Desenha contorno e quadro principal (simplificado)
+            cv2.polylines(img, [pts], True, primary_color, 3)
+            margin = 20
+            cv2.rectangle(img, (x-margin, y-margin), (x+w+margin, y+h+margin), secondary_color, 2)
+            
+            # Informações da detecção
+            cv2.putText(img, "QR DETECTADO", (x-margin, y-margin-10), cv2.FONT_HERSHEY_DUPLEX, 0.7, primary_color, 2)
+            cv2.putText(img, f"Metodo: {detection_method}", (x-margin, y+h+margin+25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, primary_color, 1)
+            
+        except Exception:
+            pass
+        
+        return img
+    
+    def transform(self, frame):
+        with self._cronometro('acquisition'):
+            img = frame.to_ndarray(format="bgr24")
+        if self.metricas is not None:
+            self.metricas.inc('frames')
+        height, width = img.shape[:2]
+        
+        # Lógica de Feedback e Trava
+        if st.session_state.get('qr_lock_success', False):
+            self.feedback_counter += 1
+            if self.feedback_counter >= self.feedback_duration:
+                st.session_state['qr_lock_success'] = False
+                st.session_state['last_detected_key'] = None
+                self.feedback_counter = 0
+            
+            # Desenha overlay de pausa
+            overlay = img.copy()
+            cv2.rectangle(overlay, (0, 0), (width, 120), (0, 150, 0), -1)
+            img = cv2.addWeighted(img, 0.7, overlay, 0.3, 0)
+            
+            remaining_time = max(0, self.feedback_duration - self.feedback_counter)
+            seconds_left = int(remaining_time / 30)
+            cv2.putText(img, "SUCESSO! PREPARANDO PARA PROXIMO...", (20, 35), cv2.FONT_HERSHEY_DUPLEX, 0.7, (255, 255, 255), 2)
+            cv2.putText(img, f"Proximo QR em: {seconds_left + 1}s", (20, 65), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            
+        elif not st.session_state.get('qr_lock_success', False):
+            
+            cv2.putText(img, "BUSCANDO QR CODE COM IA...", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+            
+            if self.perfilador is not None:
+                texto, points, metodo_deteccao = self.perfilador.perfilar(
+                    'frame', self.detect_qr_with_computer_vision, img, imagem=img)
+            else:
+                texto, points, metodo_deteccao = self.detect_qr_with_computer_vision(img)
+            
+            if texto:
+                img = self.draw_detection_frame(img, points, metodo_deteccao, "detected")
+                
+                with self._cronometro('key_extraction'):
+                    chave = self.extrair_chave(texto)
+                
+                if chave:
+                    # Checagem de duplicatas e gravação no CSV (uma única etapa)
+                    with self._cronometro('persistence'):
+                        salva = self.salvar_dados(chave)
+                    if self.metricas is not None:
+                        self.metricas.inc('keys', result='saved' if salva else 'duplicate')
+                    if salva:
+                        # CHAVE SALVA (Sucesso)
+                        img = self.draw_detection_frame(img, points, metodo_deteccao, "success")
+                        st.session_state['qr_lock_success'] = True
+                        st.session_state['last_detected_key'] = chave
+                        self.feedback_counter = 0
+                        st.success("🔑 Chave de acesso detectada e SALVA com sucesso!")
+                    else:
+                        # CHAVE JÁ EXISTE (Aviso)
+                        img = self.draw_detection_frame(img, points, metodo_deteccao, "duplicate")
+                        st.session_state['qr_lock_success'] = True
+                        self.feedback_counter = 0
+                        st.warning("⚠️ Chave detectada, mas JÁ EXISTE no registro!")
+                else:
+                    # QR CODE LIDO, MAS CHAVE INVÁLIDA
+                    if self.metricas is not None:
+                        self.metricas.inc('keys', result='no_key')
+                    img = self.draw_detection_frame(img, points, metodo_deteccao, "invalid")
+            else:
+                pass
+        
+        return img
@@ -0,0 +1,235 @@
+# Perfilamento sob demanda das leituras lentas (upload e frames da câmera)
+# Desligado por padrão: cada chamada vira uma checagem de atributo. Ligado
+# (PERFILAMENTO_LEITURA=1, ou armado para N frames), envolve a leitura com
+# cProfile + tracemalloc e mantém em disco apenas as K leituras mais lentas,
+# com a imagem (pelo hash), a linha do tempo das estratégias e o perfil.
+
+# === IMPORTAÇÕES E DEPENDÊNCIAS ===
+import os                           # Variáveis de ambiente e arquivos
+import io                           # Texto do pstats em memória
+import json                         # Relatório de cada leitura lenta
+import time                         # Cronômetro de alta resolução
+import hashlib                      # Hash da imagem (reprodução offline)
+import platform                     # Versão do Python no relatório
+import threading                    # Frames chegam na thread do WebRTC
+import cProfile                     # Perfil de CPU por função
+import pstats                       # Resumo do perfil
+import tracemalloc                  # Pico e origem das alocações
+from pathlib import Path
+
+# OpenCV e NumPy só são importados quando uma leitura é perfilada
+
+# === CONFIGURAÇÕES ===
+
+VARIAVEL_ATIVACAO = 'PERFILAMENTO_LEITURA'       # "1" liga para todas as leituras
+VARIAVEL_PASTA = 'PERFILAMENTO_PASTA'
+PASTA_PADRAO = 'perfis_lentos'
+K_PADRAO = 10                                    # Leituras mais lentas mantidas
+ESPERA_PERFIL = 2.0                              # Segundos que uma leitura armada espera a perfilada atual
+
+# Uma leitura perfilada por vez no processo (tracemalloc/cProfile são globais)
+_PERFILANDO = threading.Lock()
+
+
+def hash_imagem(imagem):
+    """SHA-256 dos pixels (PIL ou array), independente do formato do arquivo"""
+    import numpy as np
+    arr = np.ascontiguousarray(np.asarray(imagem))
+    h = hashlib.sha256()
+    h.update(repr((arr.shape, str(arr.dtype))).encode('ascii'))
+    h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def _salvar_imagem(imagem, caminho):
+    import cv2
+    import numpy as np
+    arr = np.asarray(imagem)
+    if arr.ndim == 3 and getattr(imagem, 'mode', None) in ('RGB', 'RGBA'):
+        # Imagem PIL: canais em RGB; o OpenCV grava em BGR
+        arr = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGRA if arr.shape[2] == 4 else cv2.COLOR_RGB2BGR)
+    cv2.imwrite(str(caminho), arr)
+
+
+class PerfiladorLento:
+    """
+    Mantém em disco as K leituras mais lentas, com perfil e memória
+
+    Para cada leitura perfilada grava, em `pasta`:
+        <rotulo>_<ms>ms_<hash>.json   tempo, pico de memória, linha do tempo,
+                                      maiores alocações e resumo do pstats
+        <rotulo>_<ms>ms_<hash>.prof   perfil completo (snakeviz, pstats)
+        imagens/<hash>.png            imagem para reproduzir a leitura
+    """
+
+    def __init__(self, pasta=None, k=K_PADRAO, ativo=None, linhas_pstats=40):
+        self.pasta = Path(pasta or os.environ.get(VARIAVEL_PASTA, PASTA_PADRAO))
+        self.k = k
+        self.ativo = bool(os.environ.get(VARIAVEL_ATIVACAO)) if ativo is None else ativo
+        self.linhas_pstats = linhas_pstats
+        self.frames_armados = {}  # rótulo → leituras armadas ('frame', 'upload')
+        self.ignorados = {}       # rótulo → leituras pedidas que saíram sem perfil
+        self._lock = threading.Lock()
+        self._piores = None  # (ms, base do nome, hash), carregado do disco sob demanda
+
+    # === ATIVAÇÃO ===
+
+    def armar(self, frames, rotulo='frame'):
+        """Perfila as próximas `frames` leituras do rótulo (contagem soma, não sobrescreve)"""
+        with self._lock:
+            self.frames_armados[rotulo] = self.frames_armados.get(rotulo, 0) + frames
+
+    def deve_perfilar(self, rotulo='frame'):
+        if self.ativo:
+            return True
+        if not self.frames_armados.get(rotulo):
+            return False
+        with self._lock:
+            if self.frames_armados.get(rotulo, 0) <= 0:
+                return False
+            self.frames_armados[rotulo] -= 1
+            return True
+
+    # === PERFILAMENTO ===
+
+    def perfilar(self, rotulo, funcao, *args, imagem=None, **kwargs):
+        """
+        Chama funcao(*args, **kwargs); se o perfilamento estiver ligado, mede
+        com cProfile + tracemalloc e passa `linha_do_tempo` (lista) à função
+        """
+        if not self.ativo and not self.frames_armados.get(rotulo):
+            return funcao(*args, **kwargs)
+        # Consome o armamento antes da trava: é esta leitura (a pedida) que
+        # será perfilada, nunca a próxima
+        if not self.deve_perfilar(rotulo):
+            return funcao(*args, **kwargs)
+        # tracemalloc e o profiler são do processo inteiro: uma leitura perfilada
+        # por vez (câmera e upload rodam em threads diferentes). A armada espera
+        # um pouco pela atual; com PERFILAMENTO_LEITURA=1 não espera. Se não
+        # der, segue sem perfil e fica contada em `ignorados` para a interface
+        if not _PERFILANDO.acquire(timeout=0 if self.ativo else ESPERA_PERFIL):
+            with self._lock:
+                self.ignorados[rotulo] = self.ignorados.get(rotulo, 0) + 1
+            return funcao(*args, **kwargs)
+        try:
+            linha_do_tempo = []
+            ja_rastreando = tracemalloc.is_tracing()
+            if not ja_rastreando:
+                tracemalloc.start(10)
+            tracemalloc.reset_peak()
+            perfil = cProfile.Profile()
+
+            inicio = time.perf_counter()
+            try:
+                perfil.enable()
+            except ValueError:
+                # Python 3.12+: outro profiler (fora deste módulo) já está ativo
+                if not ja_rastreando:
+                    tracemalloc.stop()
+                return funcao(*args, **kwargs)
+            try:
+                resultado = funcao(*args, linha_do_tempo=linha_do_tempo, **kwargs)
+            finally:
+                perfil.disable()
+                decorrido_ms = (time.perf_counter() - inicio) * 1000
+                _, pico = tracemalloc.get_traced_memory()
+                alocacoes = tracemalloc.take_snapshot().statistics('lineno')[:10]
+                if not ja_rastreando:
+                    tracemalloc.stop()
+        finally:
+            _PERFILANDO.release()
+
+        try:
+            self._registrar(rotulo, decorrido_ms, pico, alocacoes, linha_do_tempo, perfil, imagem)
+        except OSError:
+            pass  # Diagnóstico nunca derruba a leitura
+        return resultado
+
+    def _carregar_indice(self):
+        self._piores = []
+        for caminho in self.pasta.glob('*.json'):
+            try:
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    relatorio = json.load(f)
+                self._piores.append((relatorio['tempo_ms'], caminho.stem, relatorio['hash_imagem']))
+            except (OSError, ValueError, KeyError):
+                continue
+        self._piores.sort()
+
+    def _registrar(self, rotulo, decorrido_ms, pico, alocacoes, linha_do_tempo, perfil, imagem):
+        import cv2
+        with self._lock:
+            if self._piores is None:
+                self._carregar_indice()
+            if len(self._piores) >= self.k and decorrido_ms <= self._piores[0][0]:
+                return  # Mais rápida que todas as K guardadas
+
+            hash_img = hash_imagem(imagem) if imagem is not None else None
+            base = f"{rotulo}_{decorrido_ms:08.0f}ms_{(hash_img or 'sem-imagem')[:12]}"
+            self.pasta.mkdir(parents=True, exist_ok=True)
+
+            texto_pstats = io.StringIO()
+            pstats.Stats(perfil, stream=texto_pstats).sort_stats('cumulative').print_stats(self.linhas_pstats)
+            perfil.dump_stats(str(self.pasta / f'{base}.prof'))
+
+            if hash_img is not None:
+                pasta_imagens = self.pasta / 'imagens'
+                pasta_imagens.mkdir(exist_ok=True)
+                caminho_img = pasta_imagens / f'{hash_img}.png'
+                if not caminho_img.exists():
+                    _salvar_imagem(imagem, caminho_img)
+
+            relatorio = {
+                'rotulo': rotulo,
+                'tempo_ms': decorrido_ms,
+                'pico_memoria_kb': pico / 1024,
+                'hash_imagem': hash_img,
+                'imagem': f'imagens/{hash_img}.png' if hash_img else None,
+                'linha_do_tempo': linha_do_tempo,
+                'maiores_alocacoes': [
+                    {'origem': str(stat.traceback[0]), 'kb': stat.size / 1024, 'blocos': stat.count}
+                    for stat in alocacoes
+                ],
+                'pstats': texto_pstats.getvalue(),
+                'data': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'python': platform.python_version(),
+                'opencv': cv2.__version__,
+            }
+            with open(self.pasta / f'{base}.json', 'w', encoding='utf-8') as f:
+                json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+            self._piores.append((decorrido_ms, base, hash_img))
+            self._piores.sort()
+            while len(self._piores) > self.k:
+                self._remover(*self._piores.pop(0))
+
+    def _remover(self, _, base, hash_img):
+        for sufixo in ('.json', '.prof'):
+            try:
+                (self.pasta / f'{base}{sufixo}').unlink()
+            except OSError:
+                pass
+        # Imagem só sai quando nenhuma leitura guardada a referencia
+        if hash_img and all(h != hash_img for _, _, h in self._piores):
+            try:
+                (self.pasta / 'imagens' / f'{hash_img}.png').unlink()
+            except OSError:
+                pass
+
+    def piores(self):
+        """(tempo_ms, nome base) das leituras guardadas, da mais lenta para a mais rápida"""
+        with self._lock:
+            if self._piores is None:
+                self._carregar_indice()
+            return [(ms, base) for ms, base, _ in reversed(self._piores)]
+
+
+_perfilador = None
+
+
+def perfilador_padrao():
+    """Perfilador do processo (sobrevive aos reruns do Streamlit)"""
+    global _perfilador
+    if _perfilador is None:
+        _perfilador = PerfiladorLento()
+    return _perfilador
@@ -0,0 +1,234 @@
+# Tabela paginada das chaves salvas (rodapé do appscannerFinal)
+# O CSV inteiro fica no servidor, já decodificado em colunas NumPy (UF, mês,
+# CNPJ, número); filtro e ordenação são vetorizados e só a página visível é
+# formatada e enviada ao navegador. Assim o peso da página e o tempo de
+# renderização não crescem com o número de chaves.
+# Sem Streamlit: o app guarda uma TabelaChaves por processo e a estende a
+# cada chave salva (sem reler o CSV); o benchmark
+# (benchmarks/bench_tabela_chaves.py) importa o módulo direto.
+
+# === IMPORTAÇÕES E DEPENDÊNCIAS ===
+import os                           # Caminho dos módulos compartilhados
+import sys
+import threading                    # Sessões do Streamlit consultam em paralelo
+from collections import OrderedDict
+
+import numpy as np
+
+# Campos da chave e sintaxe da busca compartilhados com a versão Android
+PASTA_COMPARTILHADA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'v2-android')
+if PASTA_COMPARTILHADA not in sys.path:
+    sys.path.append(PASTA_COMPARTILHADA)
+
+from access_key import KEY_FIELDS, KEY_LENGTH, decode_key_fields   # noqa: E402
+from key_search import UF_CODES, parse_query                        # noqa: E402
+
+# === CONFIGURAÇÕES ===
+
+TAMANHO_PAGINA = 50
+FILTROS_EM_CACHE = 8                # Últimos filtros por tabela (troca de página não refiltra)
+
+SIGLA_UF = {int(codigo): sigla for sigla, codigo in UF_CODES.items()}
+LARGURA_CAMPO = {nome: fim - inicio for nome, inicio, fim, _ in KEY_FIELDS}
+
+# Rótulo na interface → coluna usada na ordenação (None = ordem de leitura)
+ORDENACOES = {
+    'Ordem de leitura': None,
+    'UF': 'cUF',
+    'Mês (AAMM)': 'AAMM',
+    'CNPJ': 'CNPJ',
+    'Número da nota': 'nNF',
+}
+
+# Campo da busca (key_search.parse_query) → coluna decodificada
+CAMPOS_BUSCA = {'uf': 'cUF', 'mes': 'AAMM', 'cnpj': 'CNPJ'}
+
+
+def _faixa_prefixo(coluna, prefixo):
+    """Valores do campo que começam com `prefixo` como intervalo [menor, maior)"""
+    folga = LARGURA_CAMPO[coluna] - len(prefixo)
+    if folga < 0:
+        return None
+    if coluna == 'CNPJ':
+        # Texto de dígitos: ':' vem logo depois do '9' na tabela ASCII
+        inicio = prefixo.encode('ascii')
+        return inicio, inicio + b':'
+    inicio = int(prefixo) * 10 ** folga
+    return inicio, inicio + 10 ** folga
+
+
+class TabelaChaves:
+    """Chaves de uma versão do CSV com filtro, ordenação e paginação no servidor"""
+
+    def __init__(self, chaves=()):
+        # Colunas com folga no fim (como uma lista): acrescentar uma chave não
+        # copia a tabela. `chaves`, `validas`, `campos` e `texto` são as vistas
+        # das linhas ocupadas.
+        self._colunas = {
+            'chaves': np.empty(0, dtype=object),        # Valor como está no CSV (com a aspa do Excel)
+            'validas': np.empty(0, dtype=bool),
+            'campos': np.zeros(0, dtype=decode_key_fields([]).dtype),
+            'texto': np.empty(0, dtype='S1'),           # Chave limpa em bytes (busca por trecho)
+        }
+        self._n = 0
+        self._vistas()
+        self.sem_mascara = 0
+        self._ordenadas = None          # `texto` ordenado, para a checagem de duplicatas
+        self._ordens = {}
+        self._filtros = OrderedDict()
+        self._lock = threading.RLock()  # Sessões consultam enquanto o salvar_dados acrescenta
+        self.estender(chaves)
+
+    def __len__(self):
+        return self._n
+
+    def _vistas(self):
+        for nome, coluna in self._colunas.items():
+            setattr(self, nome, coluna[:self._n])
+
+    def _reservar(self, total, largura):
+        """Garante espaço para `total` linhas e chaves de até `largura` bytes"""
+        colunas = self._colunas
+        if largura > colunas['texto'].itemsize:
+            colunas['texto'] = colunas['texto'].astype(f'S{largura}')
+            if self._ordenadas is not None:
+                self._ordenadas = self._ordenadas.astype(f'S{largura}')
+        if total > len(colunas['chaves']):
+            capacidade = max(total, 2 * len(colunas['chaves']), 1024)
+            for nome, coluna in colunas.items():
+                nova = np.zeros(capacidade, dtype=coluna.dtype)
+                nova[:self._n] = coluna[:self._n]
+                colunas[nome] = nova
+
+    def estender(self, chaves):
+        """Acrescenta chaves no fim; caches de filtro e ordem são completados, não refeitos"""
+        chaves = list(chaves)
+        limpas = [str(chave).strip().lstrip("'") for chave in chaves]
+        validas = np.fromiter((len(c) == KEY_LENGTH and c.isascii() and c.isdigit() for c in limpas),
+                              dtype=bool, count=len(limpas))
+
+        # Campos decodificados; linhas inválidas ficam zeradas e fora dos filtros por campo
+        campos = np.zeros(len(limpas), dtype=self.campos.dtype)
+        campos[validas] = decode_key_fields([c for c, ok in zip(limpas, validas) if ok])
+        largura = max(map(len, limpas), default=1) or 1
+        texto = np.array([c.encode('ascii', errors='replace') for c in limpas], dtype=f'S{largura}')
+
+        with self._lock:
+            inicio, fim = self._n, self._n + len(chaves)
+            self._reservar(fim, largura)
+            novas = {'chaves': chaves, 'validas': validas, 'campos': campos, 'texto': texto}
+            for nome, coluna in self._colunas.items():
+                coluna[inicio:fim] = novas[nome]
+            self._n = fim
+            self._vistas()
+            self.sem_mascara += sum(not str(chave).startswith("'") for chave in chaves)
+
+            if self._ordenadas is not None:
+                texto = np.sort(self.texto[inicio:])
+                self._ordenadas = np.insert(self._ordenadas, np.searchsorted(self._ordenadas, texto), texto)
+            for coluna, ordem in self._ordens.items():
+                self._ordens[coluna] = self._inserir_na_ordem(ordem, coluna, inicio)
+            for consulta, mascara in self._filtros.items():
+                self._filtros[consulta] = np.concatenate([mascara, self._mascara(consulta, inicio)])
+
+    def __contains__(self, chave):
+        """Chave já salva (com ou sem a aspa do Excel), por busca binária"""
+        alvo = str(chave).strip().lstrip("'").encode('ascii', errors='replace')
+        with self._lock:
+            if len(alvo) > self.texto.itemsize:
+                return False
+            if self._ordenadas is None:
+                self._ordenadas = np.sort(self.texto)
+            posicao = np.searchsorted(self._ordenadas, alvo)
+            return bool(posicao < len(self._ordenadas) and self._ordenadas[posicao] == alvo)
+
+    # === FILTRO E ORDENAÇÃO ===
+
+    def filtrar(self, consulta):
+        """Máscara das linhas para a busca ('uf:SP mes:2401 cnpj:12345678 987')"""
+        consulta = parse_query(consulta or '')
+        if consulta.is_empty:
+            return None
+
+        with self._lock:
+            mascara = self._filtros.get(consulta)
+            if mascara is not None:
+                self._filtros.move_to_end(consulta)
+                return mascara
+
+            mascara = self._filtros[consulta] = self._mascara(consulta)
+            if len(self._filtros) > FILTROS_EM_CACHE:
+                self._filtros.popitem(last=False)
+            return mascara
+
+    def _mascara(self, consulta, inicio=0):
+        """Máscara das linhas a partir de `inicio` (as novas, ao estender)"""
+        mascara = self.validas[inicio:].copy() if consulta.fields else np.ones(len(self) - inicio, dtype=bool)
+        for campo, valor in consulta.fields:
+            coluna = CAMPOS_BUSCA[campo]
+            faixa = _faixa_prefixo(coluna, valor)
+            if faixa is None:
+                mascara[:] = False
+                break
+            valores = self.campos[coluna][inicio:]
+            mascara &= (valores >= faixa[0]) & (valores < faixa[1])
+        texto = self.texto[inicio:]
+        for trecho in consulta.terms:
+            # Só confere o trecho nas linhas que passaram pelos filtros anteriores
+            linhas = np.flatnonzero(mascara)
+            if len(linhas):
+                mascara[linhas] = np.char.find(texto[linhas], trecho.encode('ascii')) >= 0
+        return mascara
+
+    def ordem(self, coluna=None, decrescente=False):
+        """Índices das linhas na ordem pedida (calculado uma vez por coluna)"""
+        if coluna is None:
+            ordem = np.arange(len(self))
+        else:
+            with self._lock:
+                ordem = self._ordens.get(coluna)
+                if ordem is None:
+                    ordem = self._ordens[coluna] = np.argsort(self.campos[coluna], kind='stable')
+        return ordem[::-1] if decrescente else ordem
+
+    def _inserir_na_ordem(self, ordem, coluna, inicio):
+        """Encaixa as linhas novas na ordem já calculada (empates depois das antigas)"""
+        valores = self.campos[coluna]
+        novas = inicio + np.argsort(valores[inicio:], kind='stable')
+        return np.insert(ordem, np.searchsorted(valores[ordem], valores[novas], side='right'), novas)
+
+    def total(self, consulta=''):
+        """Linhas que atendem a busca, sem formatar nenhuma"""
+        with self._lock:
+            mascara = self.filtrar(consulta)
+            return len(self) if mascara is None else int(np.count_nonzero(mascara))
+
+    def pagina(self, consulta='', ordenacao='Ordem de leitura', decrescente=True,
+               numero=1, tamanho=TAMANHO_PAGINA):
+        """(linhas da página como dicts, total filtrado, número de páginas)"""
+        with self._lock:
+            ordem = self.ordem(ORDENACOES[ordenacao], decrescente)
+            mascara = self.filtrar(consulta)
+            if mascara is not None:
+                ordem = ordem[mascara[ordem]]
+
+            total = len(ordem)
+            paginas = max(1, -(-total // tamanho))
+            numero = min(max(1, numero), paginas)
+            inicio = (numero - 1) * tamanho
+            return [self._linha(i) for i in ordem[inicio:inicio + tamanho]], total, paginas
+
+    def _linha(self, i):
+        """Só as linhas da página visível são formatadas"""
+        linha = {'#': int(i) + 1, 'Chave': self.chaves[i]}
+        if self.validas[i]:
+            campos = self.campos[i]
+            aamm = int(campos['AAMM'])
+            cnpj = campos['CNPJ'].decode('ascii')
+            linha.update({
+                'UF': SIGLA_UF.get(int(campos['cUF']), f"{int(campos['cUF']):02d}"),
+                'Mês': f"{aamm % 100:02d}/20{aamm // 100:02d}",
+                'CNPJ': f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}",
+                'Número': int(campos['nNF']),
+            })
+        return linha
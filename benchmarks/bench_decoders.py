@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Estratégias de detecção de QR sobre o corpus rotulado
+
+Roda cada estratégia do projeto sobre as imagens do corpus_generator e
+relata, por estratégia e por classe de degradação: taxa de leitura,
+latência p50/p95/p99, tentativas até o sucesso e pico de memória.
+
+Estratégias:
+    v2.simples / v2.melhorado / v2.agressivo   qr_detection.QRDetector (apps Kivy)
+    web.ler_qr_code                            deteccao.ler_qr_code (upload)
+    web.visao_computacional                    deteccao.DetectorVisaoComputacional (tempo real)
+
+Uso:
+    python benchmarks/bench_decoders.py --corpus benchmarks/corpus/imagens --saida resultados.json
+    python benchmarks/bench_decoders.py --baseline baseline.json        # sai com 1 se houver regressão
+    python benchmarks/bench_decoders.py --salvar-baseline baseline.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+from pathlib import Path
+from collections import defaultdict
+
+import cv2
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(RAIZ, '..', 'v2-android'))
+sys.path.insert(0, os.path.join(RAIZ, '..', 'Mercado-em-Numeros'))
+
+from qr_detection import PYZBAR_AVAILABLE, QRDetector, opencv_decode  # noqa: E402
+from corpus_generator import generate_images, load_manifest  # noqa: E402
+
+try:
+    from PIL import Image
+    from deteccao import DetectorVisaoComputacional, ler_qr_code
+    WEB_DISPONIVEL = True
+except ImportError:
+    WEB_DISPONIVEL = False
+
+CORPUS_PADRAO = os.path.join(RAIZ, 'corpus', 'imagens')
+
+
+# === ESTRATÉGIAS ===
+
+def _texto(codes):
+    return codes[0].data.decode('utf-8', errors='replace') if codes else None
+
+
+def build_strategies(decoder):
+    """Nome → função(imagem BGR) que devolve (texto ou None, tentativas)"""
+    strategies = {}
+
+    for label, mode in (('simples', 'simple'), ('melhorado', 'enhanced'), ('agressivo', 'aggressive')):
+        def run(frame, mode=mode, detector=QRDetector(decoder)):
+            codes = detector.detect(frame, mode)
+            return _texto(codes), detector.last_attempts
+        strategies[f'v2.{label}'] = run
+
+    if WEB_DISPONIVEL:
+        def run_upload(frame):
+            pil = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            resultado, _, tentativas = ler_qr_code(pil, decodificador=decoder)
+            return _texto(resultado), tentativas
+        strategies['web.ler_qr_code'] = run_upload
+
+        detector_cv = DetectorVisaoComputacional()
+
+        def run_realtime(frame):
+            texto, _, _ = detector_cv.detect_qr_with_computer_vision(frame)
+            return texto, detector_cv.ultimas_tentativas
+        strategies['web.visao_computacional'] = run_realtime
+
+    return strategies
+
+
+# === MEDIÇÃO ===
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else None
+
+
+def summarize(samples):
+    """samples: lista de (acertou, errou_payload, latência_ms, tentativas)"""
+    hits = [s for s in samples if s[0]]
+    latencies = [s[2] for s in samples]
+    return {
+        'imagens': len(samples),
+        'taxa_leitura': len(hits) / len(samples) if samples else 0.0,
+        'leituras_erradas': sum(1 for s in samples if s[1]),
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'tentativas_ate_sucesso': float(np.mean([s[3] for s in hits])) if hits else None,
+    }
+
+
+def peak_memory_kb(strategy, images):
+    """Pico de memória em uma amostra (tracemalloc: buffers NumPy, não os internos do OpenCV)"""
+    peak = 0
+    for frame in images:
+        tracemalloc.start()
+        strategy(frame)
+        _, image_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak = max(peak, image_peak)
+    return peak / 1024
+
+
+def run_benchmark(corpus, manifest, strategies, memory_sample):
+    frames = [cv2.imread(str(Path(corpus) / item['arquivo']), cv2.IMREAD_COLOR) for item in manifest]
+    results = {}
+
+    for name, strategy in strategies.items():
+        per_class = defaultdict(list)
+        overall = []
+        for item, frame in zip(manifest, frames):
+            started = time.perf_counter()
+            text, attempts = strategy(frame)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            sample = (text == item['payload'], text is not None and text != item['payload'], elapsed_ms, attempts)
+            per_class[f"{item['degradacao']}/{item['intensidade']}"].append(sample)
+            overall.append(sample)
+
+        summary = summarize(overall)
+        summary['pico_memoria_kb'] = peak_memory_kb(strategy, frames[:memory_sample])
+        results[name] = {
+            'geral': summary,
+            'classes': {cls: summarize(samples) for cls, samples in sorted(per_class.items())},
+        }
+        print(f"  {name:<26} taxa {summary['taxa_leitura']:6.1%}  p95 {summary['p95_ms']:7.1f} ms")
+
+    return results
+
+
+# === RELATÓRIO E BASELINE ===
+
+def print_report(results):
+    header = f"{'estratégia':<26} | {'classe':<24} | {'taxa':>6} | {'p50':>7} | {'p95':>7} | {'p99':>7} | {'tent.':>5}"
+    print(header)
+    print('-' * len(header))
+    for name, data in results.items():
+        rows = [('GERAL', data['geral'])] + list(data['classes'].items())
+        for cls, summary in rows:
+            attempts = summary['tentativas_ate_sucesso']
+            print(f"{name:<26} | {cls:<24} | {summary['taxa_leitura']:>6.1%} | {summary['p50_ms']:>7.1f} | "
+                  f"{summary['p95_ms']:>7.1f} | {summary['p99_ms']:>7.1f} | "
+                  f"{attempts if attempts is None else round(attempts, 1)!s:>5}")
+        print(f"{name:<26} | {'pico de memória':<24} | {data['geral']['pico_memoria_kb']:>.0f} KB")
+
+
+def compare_with_baseline(results, baseline, rate_tolerance, latency_tolerance, min_latency_ms=1.0):
+    """Lista de regressões (taxa de leitura menor ou p95 maior que a tolerância)"""
+    regressions = []
+    for name, data in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        rows = [('GERAL', data['geral'], base['geral'])]
+        rows += [(cls, summary, base['classes'][cls]) for cls, summary in data['classes'].items()
+                 if cls in base['classes']]
+        for cls, now, before in rows:
+            if now['taxa_leitura'] < before['taxa_leitura'] - rate_tolerance:
+                regressions.append(f"{name} [{cls}] taxa {before['taxa_leitura']:.1%} → {now['taxa_leitura']:.1%}")
+            if (now['p95_ms'] > before['p95_ms'] * (1 + latency_tolerance) and
+                    now['p95_ms'] - before['p95_ms'] > min_latency_ms):
+                regressions.append(f"{name} [{cls}] p95 {before['p95_ms']:.1f} → {now['p95_ms']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark das estratégias de detecção de QR')
+    parser.add_argument('--corpus', default=CORPUS_PADRAO, help='Pasta com manifesto.jsonl')
+    parser.add_argument('--gerar', type=int, default=350, help='Imagens a gerar se o corpus não existir')
+    parser.add_argument('--backend', choices=('pyzbar', 'opencv'),
+                        default='pyzbar' if PYZBAR_AVAILABLE else 'opencv',
+                        help='Decodificador usado pelas estratégias (padrão: pyzbar se instalado)')
+    parser.add_argument('--estrategias', nargs='+', help='Subconjunto de estratégias')
+    parser.add_argument('--amostra-memoria', type=int, default=20)
+    parser.add_argument('--saida', help='Grava os resultados em JSON')
+    parser.add_argument('--baseline', help='Compara com resultados salvos e sai com 1 se regredir')
+    parser.add_argument('--salvar-baseline', help='Grava os resultados como nova baseline')
+    parser.add_argument('--tolerancia-taxa', type=float, default=0.02, help='Queda absoluta tolerada na taxa')
+    parser.add_argument('--tolerancia-latencia', type=float, default=0.25, help='Aumento relativo tolerado no p95')
+    args = parser.parse_args()
+
+    if args.backend == 'pyzbar' and not PYZBAR_AVAILABLE:
+        parser.error("pyzbar/libzbar não disponível; use --backend opencv")
+    decoder = None if args.backend == 'pyzbar' else opencv_decode
+
+    corpus = Path(args.corpus)
+    if not (corpus / 'manifesto.jsonl').exists():
+        print(f"📦 Gerando corpus com {args.gerar} imagens em {corpus}...")
+        generate_images(corpus, args.gerar)
+    manifest = load_manifest(corpus)
+
+    strategies = build_strategies(decoder)
+    if args.estrategias:
+        strategies = {name: fn for name, fn in strategies.items() if name in args.estrategias}
+    if not WEB_DISPONIVEL:
+        print("⚠️ Estratégias web indisponíveis (Pillow não instalado)")
+
+    print(f"🔍 {len(manifest)} imagens, backend {args.backend}")
+    results = run_benchmark(corpus, manifest, strategies, args.amostra_memoria)
+    print()
+    print_report(results)
+
+    document = {
+        'meta': {
+            'backend': args.backend,
+            'corpus': str(corpus),
+            'imagens': len(manifest),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'data': time.strftime('%Y-%m-%d %H:%M:%S'),
+        },
+        'resultados': results,
+    }
+    for path in filter(None, (args.saida, args.salvar_baseline)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+        print(f"💾 Resultados gravados em {path}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('backend') != args.backend:
+            print(f"⚠️ Baseline usa backend {baseline['meta'].get('backend')}; comparação pode não ser justa")
+        regressions = compare_with_baseline(results, baseline['resultados'],
+                                            args.tolerancia_taxa, args.tolerancia_latencia)
+        if regressions:
+            print("\n❌ REGRESSÕES em relação à baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print("\n✅ Sem regressões em relação à baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Campos da chave: fatiamento por chave x tabela colunar vetorizada
+
+Uso:
+    python benchmarks/bench_key_fields.py --chaves 1000000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'v2-android'))
+
+from access_key import KEY_FIELDS, decode_key_fields  # noqa: E402
+from bench_key_validation import generate_keys  # noqa: E402
+
+
+def decode_per_key(keys):
+    """Referência: dicionário por chave com fatias de str"""
+    return [{name: key[start:end] for name, start, end, _ in KEY_FIELDS} for key in keys]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Decodificação dos campos da chave de acesso')
+    parser.add_argument('--chaves', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    keys = [key for key in generate_keys(args.chaves) if len(key) == 44 and key.isdigit()]
+
+    started = time.perf_counter()
+    rows = decode_per_key(keys)
+    per_key_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    table = decode_key_fields(keys)
+    columnar_s = time.perf_counter() - started
+
+    for row, index in ((rows[0], 0), (rows[-1], -1)):
+        assert int(row['nNF']) == table['nNF'][index]
+        assert row['CNPJ'].encode() == table['CNPJ'][index]
+
+    print(f"Chaves: {len(keys)} | tabela: {table.nbytes / (1024 * 1024):.1f} MB")
+    print(f"Fatiamento por chave: {per_key_s * 1000:.0f} ms")
+    print(f"Tabela colunar:       {columnar_s * 1000:.0f} ms ({per_key_s / columnar_s:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
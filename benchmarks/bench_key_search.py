@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Busca nas chaves salvas: filtro linear x KeySearchIndex
+
+Gera chaves com distribuição parecida com a real (poucos milhares de
+emitentes, 27 UFs, 24 meses, nNF/cNF aleatórios) e mede, para cada tamanho:
+    construção     montagem do índice (uma vez, na carga do histórico)
+    linear         `texto in chave.lower()` em todas as chaves (caminho antigo)
+    índice frio    primeira consulta, sem cache
+    digitação      consulta montada tecla a tecla (cada tecla restringe a anterior)
+    campos         uf/cnpj/mes pelos índices de campo
+
+Uso:
+    python benchmarks/bench_key_search.py --chaves 100000 1000000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'v2-android'))
+
+from access_key import DV_WEIGHTS  # noqa: E402
+from key_search import UF_CODES, KeySearchIndex  # noqa: E402
+from bench_decoders import percentile  # noqa: E402
+
+
+def generate_keys(count, issuers=3000, seed=7):
+    """Chaves válidas: emitente (UF + CNPJ) e mês sorteados de conjuntos pequenos"""
+    rng = np.random.default_rng(seed)
+    uf_codes = np.array([int(code) for code in UF_CODES.values()])
+    issuer_uf = rng.choice(uf_codes, issuers)
+    issuer_cnpj = rng.integers(10 ** 13, 10 ** 14, issuers, dtype=np.int64)
+    months = [2300 + m for m in range(1, 13)] + [2400 + m for m in range(1, 13)]
+
+    issuer = rng.integers(0, issuers, count)
+    month = rng.choice(months, count)
+    serie = rng.integers(1, 10, count)
+    number = rng.integers(1, 10 ** 9, count)
+    code = rng.integers(0, 10 ** 8, count)
+
+    weights = np.array(DV_WEIGHTS, dtype=np.int64)
+    keys = []
+    for i in range(count):
+        body = (f"{issuer_uf[issuer[i]]:02d}{month[i]:04d}{issuer_cnpj[issuer[i]]:014d}65"
+                f"{serie[i]:03d}{number[i]:09d}1{code[i]:08d}")
+        remainder = int(np.frombuffer(body.encode(), np.uint8).astype(np.int64) @ weights - 48 * weights.sum()) % 11
+        keys.append(body + str(0 if remainder < 2 else 11 - remainder))
+    return keys
+
+
+def timed(work, repetitions=5):
+    latencies = []
+    for _ in range(repetitions):
+        started = time.perf_counter()
+        result = work()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return percentile(latencies, 50), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latência da busca nas chaves salvas')
+    parser.add_argument('--chaves', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for count in args.chaves:
+        keys = generate_keys(count)
+        sample = keys[count // 2]
+
+        started = time.perf_counter()
+        index = KeySearchIndex(keys)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        typed = sample[25:31]       # 6 dígitos do nNF
+        cnpj_root = sample[6:14]    # raiz do CNPJ (todas as filiais)
+        queries = {
+            f'"{typed}"': typed,
+            f'"{typed[:2]}"': typed[:2],
+            'uf:SP': 'uf:SP',
+            f'cnpj:{cnpj_root} mes:{sample[2:6]}': f'cnpj:{cnpj_root} mes:{sample[2:6]}',
+        }
+
+        print(f"\n🔑 {count} chaves | índice montado em {build_ms:.0f} ms")
+        header = f"{'consulta':<34} | {'linear ms':>9} | {'índice ms':>9} | {'linhas':>7}"
+        print(header)
+        print('-' * len(header))
+        for label, query in queries.items():
+            needle = query.lower()
+            linear_ms, _ = timed(lambda: [key for key in keys if needle in key.lower()], 3)
+
+            def cold():
+                index._cache.clear()
+                return index.search(query)
+            index_ms, rows = timed(cold)
+            print(f"{label:<34} | {linear_ms if ':' not in query else float('nan'):>9.1f} | "
+                  f"{index_ms:>9.2f} | {len(rows):>7}")
+
+        # Digitação: cada tecla restringe a consulta anterior
+        index._cache.clear()
+        keystrokes = []
+        for size in range(1, len(typed) + 1):
+            started = time.perf_counter()
+            index.count(typed[:size])
+            keystrokes.append((time.perf_counter() - started) * 1000)
+        print(f"digitação '{typed}': " + ' → '.join(f'{ms:.1f}' for ms in keystrokes) + ' ms por tecla')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Abertura do app com armazenamentos grandes de chaves
+Compara a carga completa (json.load + SavedKey para cada chave) com a
+abertura pelo índice compacto do KeyJournal
+
+Uso:
+    python benchmarks/bench_key_store_startup.py --chaves 10000 50000 200000
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'v2-android'))
+
+from key_store import KeyJournal  # noqa: E402
+
+
+class SavedKey:
+    """Mesmo formato do SavedKey dos apps (sem depender do Kivy)"""
+    __slots__ = ('key', 'timestamp')
+
+    def __init__(self, key, timestamp):
+        self.key = key
+        self.timestamp = timestamp
+
+
+def build_store(folder: Path, count: int) -> Path:
+    """Cria snapshot + índice com `count` chaves sintéticas"""
+    rng = random.Random(count)
+    now = time.time()
+    entries = [
+        {'key': ''.join(rng.choices('0123456789', k=44)), 'timestamp': now - i}
+        for i in range(count)
+    ]
+    path = folder / f'chaves_{count}.json'
+    KeyJournal(path).compact(entries)
+    return path
+
+
+def measure(func):
+    """Executa `func` medindo tempo e pico de memória alocada"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed_ms, peak / (1024 * 1024)
+
+
+def full_load(path: Path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [SavedKey(item['key'], item['timestamp']) for item in data]
+
+
+def quick_load(path: Path):
+    index = KeyJournal(path).load_index()
+    return [SavedKey(item['key'], item['timestamp']) for item in index.recent], index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de abertura do armazenamento de chaves')
+    parser.add_argument('--chaves', type=int, nargs='+', default=[10_000, 50_000, 200_000])
+    args = parser.parse_args()
+
+    print(f"{'chaves':>10} | {'completo ms':>12} | {'completo MB':>11} | {'índice ms':>10} | {'índice MB':>9}")
+    print('-' * 66)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.chaves:
+            path = build_store(Path(tmp), count)
+            _, full_ms, full_mb = measure(lambda: full_load(path))
+            _, quick_ms, quick_mb = measure(lambda: quick_load(path))
+            print(f"{count:>10} | {full_ms:>12.1f} | {full_mb:>11.1f} | {quick_ms:>10.1f} | {quick_mb:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Validação de chaves: função escalar x lote NumPy (matriz n x 44)
+
+Uso:
+    python benchmarks/bench_key_validation.py --chaves 1000000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'v2-android'))
+
+from access_key import (  # noqa: E402
+    DV_WEIGHTS, KEY_LENGTH, REASON_LABELS, validate_keys_batch, validation_reason
+)
+
+
+def generate_keys(count, seed=42):
+    """Chaves com DV correto, ~10% com DV trocado e alguns tamanhos/caracteres errados"""
+    rng = np.random.default_rng(seed)
+    digits = rng.integers(0, 10, size=(count, KEY_LENGTH), dtype=np.uint8)
+    remainders = (digits[:, :-1] @ np.array(DV_WEIGHTS, dtype=np.int32)) % 11
+    digits[:, -1] = np.where(remainders < 2, 0, 11 - remainders)
+
+    wrong = rng.random(count) < 0.1
+    digits[wrong, -1] = (digits[wrong, -1] + 1) % 10
+
+    raw = (digits + ord('0')).tobytes()
+    keys = [raw[i:i + KEY_LENGTH].decode('ascii') for i in range(0, len(raw), KEY_LENGTH)]
+    for i in range(0, count, 1000):
+        keys[i] = keys[i][:-1]
+    for i in range(500, count, 1000):
+        keys[i] = keys[i][:20] + 'x' + keys[i][21:]
+    return keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validação de chaves de acesso em lote')
+    parser.add_argument('--chaves', type=int, default=1_000_000)
+    parser.add_argument('--amostra-escalar', type=int, default=100_000,
+                        help='Chaves validadas uma a uma para comparação')
+    args = parser.parse_args()
+
+    keys = generate_keys(args.chaves)
+
+    started = time.perf_counter()
+    mask, reasons = validate_keys_batch(keys)
+    batch_s = time.perf_counter() - started
+
+    sample = keys[:args.amostra_escalar]
+    started = time.perf_counter()
+    scalar = [validation_reason(key) for key in sample]
+    scalar_s = (time.perf_counter() - started) * len(keys) / len(sample)
+
+    assert reasons[:len(sample)].tolist() == scalar, "Lote e função escalar divergem"
+
+    print(f"Chaves: {len(keys)} | válidas: {int(mask.sum())}")
+    for reason, label in REASON_LABELS.items():
+        print(f"  {label:<30} {int((reasons == reason).sum()):>9}")
+    print(f"Lote NumPy: {batch_s * 1000:.0f} ms")
+    print(f"Escalar (estimado): {scalar_s * 1000:.0f} ms ({scalar_s / batch_s:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
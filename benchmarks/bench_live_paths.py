@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Caminhos ao vivo reproduzindo uma sessão de câmera gravada
+
+Reproduz um arquivo .nfcam (camera_replay) frame a frame em cada caminho ao
+vivo do projeto, com o trabalho por frame de cada um, e relata latência
+p50/p95/p99, FPS máximo e frames acima do orçamento da gravação:
+
+    web.transform            QRReader.transform (to_ndarray + visão computacional + chave)
+    simulador.camera_loop    android_simulator (read + flip + QRDetector + parse)
+    v2.process_camera_frame  QRReaderApp (texture RGBA → luminância + QRDetector + parse)
+    v2.nv21                  QRReaderApp com provedor NV21 (plano Y + QRDetector + parse)
+    test_camera_real         test_camera_real (read + flip + decode + chave)
+
+Sem --sessao, monta uma sessão sintética a partir do corpus rotulado: cada
+cupom fica alguns frames em quadro, intercalado com frames só de papel.
+
+Uso:
+    python v2-android/camera_replay.py gravar sessao.nfcam --segundos 30
+    python benchmarks/bench_live_paths.py --sessao sessao.nfcam
+    python benchmarks/bench_live_paths.py --cupons 40 --tempo-real
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(RAIZ, '..', 'v2-android'))
+sys.path.insert(0, os.path.join(RAIZ, '..', 'Mercado-em-Numeros'))
+
+from camera_replay import ReplayCapture, ReplayTexture, ReplayVideoFrame, SessionRecorder  # noqa: E402
+from qr_detection import PYZBAR_AVAILABLE, QRDetector, default_decoder, opencv_decode  # noqa: E402
+from qr_payload import extract_key, parse_qr_payload  # noqa: E402
+from frame_source import FORMAT_NV21, FORMAT_RGBA, RawFrame, bgr_to_nv21, to_luma  # noqa: E402
+from corpus_generator import generate_images, load_manifest  # noqa: E402
+from bench_decoders import CORPUS_PADRAO, percentile  # noqa: E402
+
+try:
+    from deteccao import DetectorVisaoComputacional
+    WEB_DISPONIVEL = True
+except ImportError:
+    WEB_DISPONIVEL = False
+
+SESSAO_SINTETICA = os.path.join(RAIZ, 'corpus', 'sessao_sintetica.nfcam')
+
+
+# === SESSÃO SINTÉTICA ===
+
+def build_synthetic_session(path, corpus, cupons, frames_por_cupom=15, frames_vazios=10, fps=30.0, seed=42):
+    """Grava uma sessão .nfcam com cupons do corpus intercalados com frames sem QR"""
+    rng = np.random.default_rng(seed)
+    manifest = load_manifest(corpus)[:cupons]
+    frame_index = 0
+
+    with SessionRecorder(path, source=f'sintetica:{corpus}') as recorder:
+        for item in manifest:
+            image = cv2.imread(str(Path(corpus) / item['arquivo']), cv2.IMREAD_COLOR)
+            empty = np.clip(rng.normal(235, 8, size=image.shape), 0, 255).astype(np.uint8)
+            for frame in [empty] * frames_vazios + [image] * frames_por_cupom:
+                recorder.write(frame, timestamp=frame_index / fps)
+                frame_index += 1
+    return recorder.frame_count
+
+
+# === CAMINHOS AO VIVO ===
+
+def build_pipelines(decoder):
+    """Nome → (preparo do frame gravado fora da medição, trabalho por frame → chave ou None)"""
+    pipelines = {}
+
+    if WEB_DISPONIVEL:
+        detector_cv = DetectorVisaoComputacional()
+
+        def web_transform(video_frame):
+            img = video_frame.to_ndarray(format='bgr24')
+            texto, _, _ = detector_cv.detect_qr_with_computer_vision(img)
+            return extract_key(texto) if texto else None
+        pipelines['web.transform'] = (ReplayVideoFrame, web_transform)
+
+    simulator_detector = QRDetector(decoder)
+
+    def simulator_loop(frame):
+        frame = cv2.flip(frame, 1)
+        for code in simulator_detector.detect(frame, 'enhanced'):
+            return parse_qr_payload(code.data.decode('utf-8')).key
+        return None
+    pipelines['simulador.camera_loop'] = (None, simulator_loop)
+
+    app_detector = QRDetector(decoder)
+
+    def decode_camera_frame(raw_frame):
+        for code in app_detector.detect(to_luma(raw_frame), 'enhanced'):
+            return parse_qr_payload(code.data.decode('utf-8')).key
+        return None
+
+    def grab_rgba(frame):
+        texture = ReplayTexture(frame)
+        return RawFrame(FORMAT_RGBA, texture.pixels, texture.size)
+
+    def grab_nv21(frame):
+        return RawFrame(FORMAT_NV21, bgr_to_nv21(frame), (frame.shape[1], frame.shape[0]))
+
+    pipelines['v2.process_camera_frame'] = (grab_rgba, decode_camera_frame)
+    pipelines['v2.nv21'] = (grab_nv21, decode_camera_frame)
+
+    def test_camera(frame):
+        frame = cv2.flip(frame, 1)
+        for code in decoder(frame):
+            return extract_key(code.data.decode('utf-8'))
+        return None
+    pipelines['test_camera_real'] = (None, test_camera)
+
+    return pipelines
+
+
+# === MEDIÇÃO ===
+
+def run_pipeline(session_path, prepare, work, realtime):
+    """Lê a sessão com ReplayCapture e mede o trabalho de cada frame"""
+    capture = ReplayCapture(session_path, realtime=realtime, preload=True)
+    budget_ms = 1000 / capture.session.fps if capture.session.fps else None
+    latencies, keys = [], set()
+
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        item = prepare(frame) if prepare else frame
+
+        started = time.perf_counter()
+        key = work(item)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if key:
+            keys.add(key)
+    capture.release()
+
+    total_s = sum(latencies) / 1000
+    return {
+        'frames': len(latencies),
+        'chaves_distintas': len(keys),
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'fps_max': len(latencies) / total_s if total_s else None,
+        'acima_orcamento': sum(1 for ms in latencies if budget_ms and ms > budget_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos caminhos ao vivo com sessão gravada')
+    parser.add_argument('--sessao', help='Arquivo .nfcam (padrão: sessão sintética do corpus)')
+    parser.add_argument('--corpus', default=CORPUS_PADRAO, help='Corpus usado na sessão sintética')
+    parser.add_argument('--cupons', type=int, default=30, help='Cupons na sessão sintética')
+    parser.add_argument('--backend', choices=('pyzbar', 'opencv'),
+                        default='pyzbar' if PYZBAR_AVAILABLE else 'opencv')
+    parser.add_argument('--caminhos', nargs='+', help='Subconjunto de caminhos')
+    parser.add_argument('--tempo-real', action='store_true', help='Respeita os intervalos da gravação')
+    args = parser.parse_args()
+
+    if args.backend == 'pyzbar' and not PYZBAR_AVAILABLE:
+        parser.error("pyzbar/libzbar não disponível; use --backend opencv")
+    decoder = default_decoder() if args.backend == 'pyzbar' else opencv_decode
+
+    session_path = args.sessao
+    if session_path is None:
+        corpus = Path(args.corpus)
+        if not (corpus / 'manifesto.jsonl').exists():
+            print(f"📦 Gerando corpus em {corpus}...")
+            generate_images(corpus, max(args.cupons, 50))
+        session_path = SESSAO_SINTETICA
+        count = build_synthetic_session(session_path, corpus, args.cupons)
+        print(f"🎞️ Sessão sintética: {count} frames em {session_path}")
+
+    pipelines = build_pipelines(decoder)
+    if args.caminhos:
+        pipelines = {name: p for name, p in pipelines.items() if name in args.caminhos}
+    if not WEB_DISPONIVEL:
+        print("⚠️ web.transform indisponível (Pillow não instalado)")
+
+    header = (f"{'caminho':<24} | {'frames':>6} | {'chaves':>6} | {'p50':>7} | {'p95':>7} | "
+              f"{'p99':>7} | {'FPS máx':>7} | {'> orçam.':>8}")
+    print(f"🔍 backend {args.backend}, {'tempo real' if args.tempo_real else 'taxa máxima'}")
+    print(header)
+    print('-' * len(header))
+    for name, (prepare, work) in pipelines.items():
+        r = run_pipeline(session_path, prepare, work, args.tempo_real)
+        print(f"{name:<24} | {r['frames']:>6} | {r['chaves_distintas']:>6} | {r['p50_ms']:>7.1f} | "
+              f"{r['p95_ms']:>7.1f} | {r['p99_ms']:>7.1f} | {r['fps_max']:>7.1f} | {r['acima_orcamento']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Memória e pertinência: set de str x PackedKeySet (19 bytes/chave)
+
+Uso:
+    python benchmarks/bench_packed_keys.py --chaves 100000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'v2-android'))
+
+from access_key import PackedKeySet  # noqa: E402
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current / (1024 * 1024)
+
+
+def measure_lookup(container, probes):
+    started = time.perf_counter()
+    hits = sum(1 for key in probes if key in container)
+    return (time.perf_counter() - started) / len(probes) * 1e6, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memória de conjuntos de chaves de acesso')
+    parser.add_argument('--chaves', type=int, default=100_000)
+    parser.add_argument('--consultas', type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    texts = [''.join(rng.choices('0123456789', k=44)) for _ in range(args.chaves)]
+    probes = rng.sample(texts, args.consultas // 2) + [
+        ''.join(rng.choices('0123456789', k=44)) for _ in range(args.consultas // 2)
+    ]
+
+    # Copia as strings para que o set de str pague pelos próprios objetos
+    str_set, str_mb = measure_memory(lambda: {''.join(key) for key in texts})
+    packed_set, packed_mb = measure_memory(lambda: PackedKeySet.from_keys(texts))
+
+    str_us, str_hits = measure_lookup(str_set, probes)
+    packed_us, packed_hits = measure_lookup(packed_set, probes)
+    assert str_hits == packed_hits
+
+    print(f"{'estrutura':<14} | {'memória MB':>10} | {'bytes/chave':>11} | {'consulta µs':>11}")
+    print('-' * 56)
+    for name, mb, us in (('set[str]', str_mb, str_us), ('PackedKeySet', packed_mb, packed_us)):
+        print(f"{name:<14} | {mb:>10.1f} | {mb * 1024 * 1024 / args.chaves:>11.1f} | {us:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
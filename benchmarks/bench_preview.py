@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Custo da pré-visualização x decodificação (android_simulator)
+
+Mede, nos frames de uma sessão .nfcam, o custo de CPU por frame de:
+    preview antigo   resize + BGR→RGB + flatten + Texture nova por frame
+    preview novo     PreviewRenderer (texture reaproveitada, buffer pré-alocado, BGR direto)
+    decodificação    QRDetector no modo escolhido (referência)
+
+A Texture do Kivy é substituída por uma falsa que só recebe o buffer, então
+o número mede a parte de CPU (o upload para a GPU fica de fora nos dois).
+
+Uso:
+    python benchmarks/bench_preview.py
+    python benchmarks/bench_preview.py --sessao sessao.nfcam --repeticoes 5
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(RAIZ, '..', 'v2-android'))
+
+from preview_renderer import PreviewRenderer  # noqa: E402
+from qr_detection import MODES, QRDetector, default_decoder  # noqa: E402
+from corpus_generator import generate_images  # noqa: E402
+from bench_decoders import CORPUS_PADRAO, percentile  # noqa: E402
+from bench_live_paths import SESSAO_SINTETICA, build_synthetic_session  # noqa: E402
+from bench_shm_decoders import load_frames  # noqa: E402
+
+
+class FakeTexture:
+    """Texture sem GPU: guarda o buffer recebido"""
+
+    def __init__(self, size, colorfmt='rgb'):
+        self.size = size
+        self.storage = bytearray(size[0] * size[1] * 3)
+
+    def flip_vertical(self):
+        pass
+
+    def blit_buffer(self, pbuffer, colorfmt='rgb', bufferfmt='ubyte'):
+        self.storage[:] = memoryview(pbuffer).cast('B')
+
+
+def old_preview(frame):
+    """update_camera_display antes do PreviewRenderer"""
+    height, width = frame.shape[:2]
+    display_height = 240
+    display_width = int(width * display_height / height)
+    resized_frame = cv2.resize(frame, (display_width, display_height))
+    rgb_frame = cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
+    texture = FakeTexture(size=(display_width, display_height))
+    texture.blit_buffer(rgb_frame.flatten(), colorfmt='rgb', bufferfmt='ubyte')
+    return texture
+
+
+def measure(frames, work, repetitions):
+    latencies = []
+    for _ in range(repetitions):
+        for frame in frames:
+            started = time.perf_counter()
+            work(frame)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Custo de CPU da pré-visualização por frame')
+    parser.add_argument('--sessao', help='Arquivo .nfcam (padrão: sessão sintética do corpus)')
+    parser.add_argument('--corpus', default=CORPUS_PADRAO)
+    parser.add_argument('--cupons', type=int, default=10)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--modo', choices=MODES, default='enhanced')
+    args = parser.parse_args()
+
+    session_path = args.sessao
+    if session_path is None:
+        corpus = Path(args.corpus)
+        if not (corpus / 'manifesto.jsonl').exists():
+            generate_images(corpus, max(args.cupons, 50))
+        session_path = SESSAO_SINTETICA
+        build_synthetic_session(session_path, corpus, args.cupons)
+    frames = load_frames(session_path)
+
+    renderer = PreviewRenderer(FakeTexture)
+    detector = QRDetector(default_decoder())
+    results = {
+        'preview antigo': measure(frames, old_preview, args.repeticoes),
+        'preview novo': measure(frames, renderer.render, args.repeticoes),
+        'decodificação': measure(frames, lambda f: detector.detect(f, args.modo), 1),
+    }
+    decode_p50 = percentile(results['decodificação'], 50)
+
+    print(f"🎞️ {len(frames)} frames ({frames[0].shape[1]}x{frames[0].shape[0]}), "
+          f"{renderer.textures_created} texture(s) criadas no caminho novo")
+    header = f"{'caminho':<16} | {'p50 ms':>7} | {'p95 ms':>7} | {'% decod.':>8}"
+    print(header)
+    print('-' * len(header))
+    for name, latencies in results.items():
+        p50 = percentile(latencies, 50)
+        print(f"{name:<16} | {p50:>7.3f} | {percentile(latencies, 95):>7.3f} | {p50 / decode_p50:>8.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Extração da chave do payload do QR: splits encadeados x parser único
+
+Corpus sintético com as URLs de consulta das 27 UFs nos formatos v1
+(chNFe=), v2 online/offline, v3 online/offline, separador %7C e chave pura.
+
+Uso:
+    python benchmarks/bench_qr_payload.py --payloads 500000
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'v2-android'))
+
+from qr_payload import extract_key, parse_qr_payload  # noqa: E402
+from corpus_generator import PORTAIS, generate_keys, make_payload  # noqa: E402
+
+
+def extrair_chave_splits(texto):
+    """Lógica anterior do extrair_chave (splits encadeados + busca de 44 dígitos)"""
+    if 'p=' in texto:
+        return texto.split("p=")[1].split("|")[0]
+    if 'chNFe=' in texto:
+        return texto.split("chNFe=")[1].split("&")[0]
+    match = re.search(r'\d{44}', texto)
+    return match.group() if match else None
+
+
+def timed(function, payloads):
+    started = time.perf_counter()
+    results = [function(text) for text in payloads]
+    return results, (time.perf_counter() - started) / len(payloads) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parser de payload do QR Code NFC-e')
+    parser.add_argument('--payloads', type=int, default=500_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    expected = generate_keys(args.payloads)
+    payloads = [make_payload(rng, key) for key in expected]
+
+    old, old_us = timed(extrair_chave_splits, payloads)
+    keys, key_us = timed(extract_key, payloads)
+    parsed, parse_us = timed(parse_qr_payload, payloads)
+
+    assert keys == expected
+    assert [payload.key for payload in parsed] == expected
+    old_ok = sum(a == b for a, b in zip(old, expected))
+
+    print(f"Payloads: {len(payloads)} ({len(PORTAIS)} UFs)")
+    print(f"{'método':<26} | {'µs/payload':>10} | {'chaves corretas':>15}")
+    print('-' * 58)
+    print(f"{'splits encadeados':<26} | {old_us:>10.2f} | {old_ok:>15}")
+    print(f"{'extract_key':<26} | {key_us:>10.2f} | {len(payloads):>15}")
+    print(f"{'parse_qr_payload (campos)':<26} | {parse_us:>10.2f} | {len(payloads):>15}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Escalabilidade da decodificação multiprocesso (shm_decoders)
+
+Carrega os frames de uma sessão .nfcam (camera_replay) e mede a vazão da
+decodificação:
+    thread única    QRDetector no próprio processo (referência, limitada pelo GIL)
+    N processos     SharedFramePool com N workers, frames via memória compartilhada
+
+Para cada N relata frames/s, speedup sobre o primeiro N (1 por padrão), latência
+por frame no worker (p50/p95) e chaves distintas lidas. A inicialização dos processos
+(spawn + imports) fica fora da medição.
+
+Uso:
+    python benchmarks/bench_shm_decoders.py --processos 1 2 4 8
+    python benchmarks/bench_shm_decoders.py --sessao sessao.nfcam --modo aggressive
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(RAIZ, '..', 'v2-android'))
+
+from camera_replay import ReplayCapture  # noqa: E402
+from qr_detection import MODES, PYZBAR_AVAILABLE, QRDetector, default_decoder, opencv_decode  # noqa: E402
+from qr_payload import extract_key  # noqa: E402
+from shm_decoders import SharedFramePool  # noqa: E402
+from corpus_generator import generate_images  # noqa: E402
+from bench_decoders import CORPUS_PADRAO, percentile  # noqa: E402
+from bench_live_paths import SESSAO_SINTETICA, build_synthetic_session  # noqa: E402
+
+
+def load_frames(session_path, limit=None):
+    capture = ReplayCapture(session_path, realtime=False, preload=True)
+    frames = []
+    while limit is None or len(frames) < limit:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def distinct_keys(code_lists):
+    keys = set()
+    for codes in code_lists:
+        for code in codes:
+            key = extract_key(code.data.decode('utf-8', errors='replace'))
+            if key:
+                keys.add(key)
+    return len(keys)
+
+
+def run_in_process(frames, decoder, mode):
+    detector = QRDetector(decoder)
+    latencies, results = [], []
+    started = time.perf_counter()
+    for frame in frames:
+        t = time.perf_counter()
+        results.append(detector.detect(frame, mode))
+        latencies.append((time.perf_counter() - t) * 1000)
+    elapsed = time.perf_counter() - started
+    return elapsed, latencies, results
+
+
+def run_pool(frames, workers, backend, mode):
+    with SharedFramePool(workers, backend=backend) as pool:
+        # Aquecimento: spawn e imports dos processos ficam fora da medição
+        warmup = [pool.submit(frames[0], mode, block=True) for _ in range(workers)]
+        for future in warmup:
+            future.result()
+
+        started = time.perf_counter()
+        futures = [pool.submit(frame, mode, block=True) for frame in frames]
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+    return elapsed, [r.seconds * 1000 for r in results], [r.codes for r in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vazão da decodificação com 1..N processos')
+    parser.add_argument('--sessao', help='Arquivo .nfcam (padrão: sessão sintética do corpus)')
+    parser.add_argument('--corpus', default=CORPUS_PADRAO, help='Corpus usado na sessão sintética')
+    parser.add_argument('--cupons', type=int, default=20, help='Cupons na sessão sintética')
+    parser.add_argument('--frames', type=int, help='Limita os frames medidos')
+    parser.add_argument('--processos', type=int, nargs='+',
+                        default=sorted({1, 2, max(1, (os.cpu_count() or 2) // 2), os.cpu_count() or 1}))
+    parser.add_argument('--modo', choices=MODES, default='enhanced')
+    parser.add_argument('--backend', choices=('pyzbar', 'opencv'),
+                        default='pyzbar' if PYZBAR_AVAILABLE else 'opencv')
+    args = parser.parse_args()
+
+    if args.backend == 'pyzbar' and not PYZBAR_AVAILABLE:
+        parser.error("pyzbar/libzbar não disponível; use --backend opencv")
+    decoder = default_decoder() if args.backend == 'pyzbar' else opencv_decode
+
+    session_path = args.sessao
+    if session_path is None:
+        corpus = Path(args.corpus)
+        if not (corpus / 'manifesto.jsonl').exists():
+            print(f"📦 Gerando corpus em {corpus}...")
+            generate_images(corpus, max(args.cupons, 50))
+        session_path = SESSAO_SINTETICA
+        build_synthetic_session(session_path, corpus, args.cupons)
+
+    frames = load_frames(session_path, args.frames)
+    print(f"🎞️ {len(frames)} frames de {session_path} | backend {args.backend}, modo {args.modo}, "
+          f"{os.cpu_count()} CPUs")
+
+    header = f"{'execução':<16} | {'frames/s':>8} | {'speedup':>7} | {'p50 ms':>7} | {'p95 ms':>7} | {'chaves':>6}"
+    print(header)
+    print('-' * len(header))
+
+    elapsed, latencies, results = run_in_process(frames, decoder, args.modo)
+    print(f"{'thread única':<16} | {len(frames) / elapsed:>8.1f} | {'':>7} | {percentile(latencies, 50):>7.1f} | "
+          f"{percentile(latencies, 95):>7.1f} | {distinct_keys(results):>6}")
+
+    baseline = None
+    for workers in args.processos:
+        elapsed, latencies, results = run_pool(frames, workers, args.backend, args.modo)
+        throughput = len(frames) / elapsed
+        baseline = baseline or throughput
+        print(f"{f'{workers} processo(s)':<16} | {throughput:>8.1f} | {throughput / baseline:>6.2f}x | "
+              f"{percentile(latencies, 50):>7.1f} | {percentile(latencies, 95):>7.1f} | {distinct_keys(results):>6}")
+
+
+if __name__ == '__main__':
+    main()
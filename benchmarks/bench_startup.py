@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Inicialização do scanner Streamlit (appscannerFinal.py)
+
+Mede, sempre em interpretadores novos (imports a frio):
+    1. tempo de import de cada dependência pesada;
+    2. imports do topo do app antes (todas as dependências) x agora (só
+       Streamlit + biblioteca padrão, o resto sob demanda);
+    3. tempo até a primeira renderização e de um rerun, executando o app com
+       streamlit.testing (AppTest) em uma pasta temporária com N chaves no CSV.
+
+Uso:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeticoes 7 --chaves 50000 --saida startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import argparse
+import statistics
+import subprocess
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+PASTA_APP = os.path.abspath(os.path.join(RAIZ, '..', 'Mercado-em-Numeros'))
+APP = os.path.join(PASTA_APP, 'appscannerFinal.py')
+sys.path.insert(0, os.path.join(RAIZ, '..', 'v2-android'))
+
+DEPENDENCIAS = ('streamlit', 'pandas', 'cv2', 'numpy', 'PIL.Image', 'streamlit_webrtc', 'pyzbar.pyzbar')
+
+# Topo do appscannerFinal.py antes e depois dos imports sob demanda
+IMPORTS_ANTES = ('streamlit', 'PIL.Image', 'pandas', 'cv2', 'numpy', 'streamlit_webrtc',
+                 'pyzbar.pyzbar', 're', 'csv', 'tempfile')
+IMPORTS_AGORA = ('streamlit', 're', 'csv', 'tempfile')
+
+SCRIPT_IMPORT = """
+import sys, time
+inicio = time.perf_counter()
+try:
+    for nome in sys.argv[1:]:
+        __import__(nome)
+except ImportError as erro:
+    print('ERRO', erro)
+else:
+    print(time.perf_counter() - inicio)
+"""
+
+SCRIPT_RENDER = """
+import sys, time, json
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+importado = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+app.run()
+primeira = time.perf_counter()
+app.run()
+rerun = time.perf_counter()
+print(json.dumps({
+    'import_streamlit_s': importado - inicio,
+    'primeira_renderizacao_s': primeira - importado,
+    'rerun_s': rerun - primeira,
+    'excecoes': [str(e.value) for e in app.exception],
+}))
+"""
+
+
+def medir_import(modulos, repeticoes):
+    """Mediana do tempo de import a frio (None se algum módulo não existir)"""
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-c', SCRIPT_IMPORT, *modulos],
+                               capture_output=True, text=True, cwd=PASTA_APP).stdout.strip()
+        if not saida or saida.startswith('ERRO'):
+            return None
+        tempos.append(float(saida.splitlines()[-1]))
+    return statistics.median(tempos)
+
+
+def criar_csv_chaves(pasta, quantidade):
+    """chaves.csv no formato do app (aspas em tudo, chave com aspa simples)"""
+    from corpus_generator import generate_keys
+    caminho = os.path.join(pasta, 'chaves.csv')
+    with open(caminho, 'w', encoding='utf-8-sig', newline='') as f:
+        f.write('"Chave"\n')
+        for chave in generate_keys(quantidade):
+            f.write(f'"\'{chave}"\n')
+    return caminho
+
+
+def medir_renderizacao(quantidade_chaves, repeticoes):
+    """Primeira renderização e rerun do app (mediana), em pasta temporária"""
+    resultados = []
+    with tempfile.TemporaryDirectory() as pasta:
+        if quantidade_chaves:
+            criar_csv_chaves(pasta, quantidade_chaves)
+        for _ in range(repeticoes):
+            processo = subprocess.run([sys.executable, '-c', SCRIPT_RENDER, APP],
+                                      capture_output=True, text=True, cwd=pasta)
+            linhas = processo.stdout.strip().splitlines()
+            if processo.returncode != 0 or not linhas:
+                return {'erro': (processo.stderr.strip().splitlines() or ['falhou'])[-1]}
+            resultados.append(json.loads(linhas[-1]))
+
+    resumo = {chave: statistics.median(r[chave] for r in resultados)
+              for chave in ('import_streamlit_s', 'primeira_renderizacao_s', 'rerun_s')}
+    resumo['excecoes'] = resultados[-1]['excecoes']
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de inicialização do appscannerFinal.py')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--chaves', type=int, default=10_000, help='Chaves no CSV usado na renderização')
+    parser.add_argument('--saida', help='Grava os resultados em JSON')
+    args = parser.parse_args()
+
+    print(f"📦 Import a frio (mediana de {args.repeticoes})")
+    dependencias = {}
+    for nome in DEPENDENCIAS:
+        tempo = medir_import([nome], args.repeticoes)
+        dependencias[nome] = tempo
+        print(f"   {nome:<18} {'não instalado' if tempo is None else f'{tempo * 1000:8.1f} ms'}")
+
+    topo = {'antes': medir_import(IMPORTS_ANTES, args.repeticoes),
+            'agora': medir_import(IMPORTS_AGORA, args.repeticoes)}
+    print("\n🚀 Imports do topo do app")
+    for rotulo, tempo in topo.items():
+        print(f"   {rotulo:<18} {'indisponível' if tempo is None else f'{tempo * 1000:8.1f} ms'}")
+
+    renderizacao = None
+    if dependencias['streamlit'] is None:
+        print("\n⚠️ Streamlit não instalado: renderização não medida")
+    else:
+        print(f"\n🖥️ Renderização (AppTest, {args.chaves} chaves no CSV)")
+        renderizacao = medir_renderizacao(args.chaves, args.repeticoes)
+        if 'erro' in renderizacao:
+            print(f"   ❌ {renderizacao['erro']}")
+        else:
+            print(f"   primeira renderização {renderizacao['primeira_renderizacao_s'] * 1000:8.1f} ms")
+            print(f"   rerun                 {renderizacao['rerun_s'] * 1000:8.1f} ms")
+            for excecao in renderizacao['excecoes']:
+                print(f"   ⚠️ {excecao}")
+
+    if args.saida:
+        documento = {
+            'meta': {'python': platform.python_version(), 'data': time.strftime('%Y-%m-%d %H:%M:%S'),
+                     'repeticoes': args.repeticoes, 'chaves': args.chaves},
+            'import_dependencias_s': dependencias,
+            'import_topo_s': topo,
+            'renderizacao': renderizacao,
+        }
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(documento, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados gravados em {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
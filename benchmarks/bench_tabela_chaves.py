@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - Rodapé do appscannerFinal: DataFrame inteiro x página fatiada no servidor
+
+Para cada tamanho do CSV mede:
+    antigo      df.copy() + serialização do DataFrame inteiro (o que ia ao navegador)
+    montagem    TabelaChaves a partir do CSV (uma vez por versão do arquivo)
+    página      filtro + ordenação + formatação de uma página (TAMANHO_PAGINA linhas),
+                na primeira consulta (sem cache) e ao trocar de página (com cache)
+
+O peso enviado é estimado pelo JSON da tabela (o Streamlit usa Arrow; a
+proporção entre os dois caminhos é a mesma).
+
+Uso:
+    python benchmarks/bench_tabela_chaves.py --chaves 10000 100000 1000000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(RAIZ, '..', 'Mercado-em-Numeros'))
+
+from tabela_chaves import TabelaChaves  # noqa: E402
+from bench_key_search import generate_keys  # noqa: E402
+from bench_decoders import percentile  # noqa: E402
+
+
+def timed(work, repetitions=5):
+    latencies = []
+    for _ in range(repetitions):
+        started = time.perf_counter()
+        result = work()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return percentile(latencies, 50), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Custo por rerun da tabela de chaves salvas')
+    parser.add_argument('--chaves', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    header = f"{'chaves':>9} | {'antigo ms':>9} | {'antigo KB':>10} | {'montagem ms':>11} | {'página ms':>9} | {'c/ cache':>8} | {'página KB':>9}"
+    print(header)
+    print('-' * len(header))
+    for count in args.chaves:
+        keys = generate_keys(count)
+        df = pd.DataFrame({'Chave': ["'" + key for key in keys]})
+        sample = keys[count // 2]
+
+        old_ms, payload = timed(lambda: df.copy().to_json(orient='split'), 3)
+        build_ms, tabela = timed(lambda: TabelaChaves(df['Chave'].to_numpy()), 1)
+
+        consultas = [
+            ('', 'Ordem de leitura', 1),
+            ('', 'CNPJ', 10),
+            (f'uf:{sample[:2]} mes:{sample[2:6]}', 'Número da nota', 1),
+            (sample[25:31], 'Ordem de leitura', 1),
+        ]
+        page_ms = []
+        for consulta, ordenacao, numero in consultas:
+            # Primeira consulta sem cache de filtro/ordem: pior caso de cada página
+            tabela._filtros.clear()
+            tabela._ordens.clear()
+            ms, (linhas, _, _) = timed(lambda: tabela.pagina(consulta, ordenacao, True, numero), 1)
+            page_ms.append(ms)
+        cached_ms = max(timed(lambda: tabela.pagina(consulta, ordenacao, True, numero + 1))[0]
+                        for consulta, ordenacao, numero in consultas)
+        page_kb = len(pd.DataFrame(tabela.pagina()[0]).to_json(orient='split')) / 1024
+
+        print(f"{count:>9} | {old_ms:>9.1f} | {len(payload) / 1024:>10.0f} | {build_ms:>11.0f} | "
+              f"{max(page_ms):>9.1f} | {cached_ms:>8.1f} | {page_kb:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
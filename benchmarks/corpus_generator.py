@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CORPUS SINTÉTICO - Chaves de acesso e imagens de QR Code reproduzíveis
+
+Chaves: milhões de chaves de 44 dígitos com DV correto, UF distribuída pela
+população, CNPJs válidos de um conjunto de lojas com popularidade de Zipf
+(poucas redes concentram as compras) e meses de emissão recentes.
+
+Imagens: QR Codes de URLs NFC-e reais (encoder do OpenCV) impressos sobre
+"papel" e degradados de forma controlada (desfoque, perspectiva, baixo
+contraste, desbotamento de papel térmico, amassado e artefatos JPEG), com um
+manifesto JSONL rotulado para os benchmarks de decodificação.
+
+Uso:
+    python benchmarks/corpus_generator.py chaves --quantidade 1000000 --saida corpus/chaves.txt
+    python benchmarks/corpus_generator.py imagens --quantidade 600 --saida corpus/imagens
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'v2-android'))
+
+from access_key import DV_WEIGHTS, KEY_LENGTH  # noqa: E402
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+# === DISTRIBUIÇÕES ===
+
+# Código IBGE da UF → população em milhões (Censo 2022), usada como peso
+POPULACAO_UF = {
+    11: 1.6, 12: 0.8, 13: 3.9, 14: 0.6, 15: 8.1, 16: 0.7, 17: 1.5,
+    21: 6.8, 22: 3.3, 23: 8.8, 24: 3.3, 25: 4.0, 26: 9.1, 27: 3.1, 28: 2.2, 29: 14.1,
+    31: 20.5, 32: 3.8, 33: 16.1, 35: 44.4,
+    41: 11.4, 42: 7.6, 43: 10.9,
+    50: 2.8, 51: 3.7, 52: 7.1, 53: 2.8,
+}
+
+# Código IBGE da UF → endereço de consulta do QR (variações reais de caminho)
+PORTAIS = {
+    11: 'http://www.nfce.sefin.ro.gov.br/consultanfce/consulta.jsp',
+    12: 'http://www.sefaznet.ac.gov.br/nfce/qrcode',
+    13: 'https://sistemas.sefaz.am.gov.br/nfceweb/consultarNFCe.jsp',
+    14: 'https://www.sefaz.rr.gov.br/servico/qrcode',
+    15: 'https://appnfc.sefa.pa.gov.br/portal/view/consultas/nfce/nfceForm.seam',
+    16: 'https://www.sefaz.ap.gov.br/nfce/nfcep.php',
+    17: 'http://www.sefaz.to.gov.br/nfce/qrcode',
+    21: 'http://www.sefaz.ma.gov.br/nfce/consulta/qrcode',
+    22: 'http://www.sefaz.pi.gov.br/nfce/qrcode',
+    23: 'http://nfce.sefaz.ce.gov.br/pages/ShowNFCe.html',
+    24: 'http://nfce.set.rn.gov.br/consultarNFCe.aspx',
+    25: 'https://www.sefaz.pb.gov.br/nfce',
+    26: 'http://nfce.sefaz.pe.gov.br/nfce/consulta',
+    27: 'http://nfce.sefaz.al.gov.br/QRCode/consultarNFCe.jsp',
+    28: 'http://www.nfce.se.gov.br/nfce/qrcode',
+    29: 'http://nfe.sefaz.ba.gov.br/servicos/nfce/qrcode.aspx',
+    31: 'https://portalsped.fazenda.mg.gov.br/portalnfce/sistema/qrcode.xhtml',
+    32: 'http://app.sefaz.es.gov.br/ConsultaNFCe/qrcode.aspx',
+    33: 'https://consultadfe.fazenda.rj.gov.br/consultaNFCe/QRCode',
+    35: 'https://www.nfce.fazenda.sp.gov.br/NFCeConsultaPublica/Paginas/ConsultaQRCode.aspx',
+    41: 'http://www.fazenda.pr.gov.br/nfce/qrcode',
+    42: 'https://sat.sef.sc.gov.br/nfce/consulta',
+    43: 'https://www.sefaz.rs.gov.br/NFCE/NFCE-COM.aspx',
+    50: 'http://www.dfe.ms.gov.br/nfce/qrcode',
+    51: 'http://www.sefaz.mt.gov.br/nfce/consultanfce',
+    52: 'http://nfe.sefaz.go.gov.br/nfeweb/sites/nfce/danfeNFCe',
+    53: 'http://www.fazenda.df.gov.br/nfce/qrcode',
+}
+
+CNPJ_PESOS_1 = np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+CNPJ_PESOS_2 = np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+
+DEGRADACOES = ('limpa', 'desfoque', 'perspectiva', 'baixo_contraste', 'termico', 'amassado', 'jpeg')
+INTENSIDADES = {'leve': 0.25, 'media': 0.6, 'forte': 1.0}
+
+
+# === CHAVES ===
+
+def _put_number(digits, start, width, values):
+    """Grava `values` (inteiros) nas colunas [start, start + width) da matriz"""
+    values = values.astype(np.int64, copy=True)
+    for column in range(start + width - 1, start - 1, -1):
+        digits[:, column] = values % 10
+        values //= 10
+
+
+def _cnpj_check_digits(base):
+    """Completa CNPJs (n, 12) com os dois dígitos verificadores"""
+    def dv(digits, weights):
+        remainder = (digits @ weights) % 11
+        return np.where(remainder < 2, 0, 11 - remainder)
+
+    first = dv(base, CNPJ_PESOS_1)
+    with_first = np.column_stack([base, first])
+    return np.column_stack([with_first, dv(with_first, CNPJ_PESOS_2)]).astype(np.uint8)
+
+
+def generate_key_matrix(count, seed=42, lojas=5_000, meses=24, referencia=(2025, 10)):
+    """
+    Matriz (count, 44) de dígitos de chaves válidas
+
+    Cada loja tem UF, CNPJ e série fixos; as compras se distribuem entre as
+    lojas por Zipf (s = 1.1) e entre os `meses` anteriores a `referencia`.
+    """
+    rng = np.random.default_rng(seed)
+
+    ufs = np.array(list(POPULACAO_UF))
+    pesos_uf = np.array(list(POPULACAO_UF.values()))
+    loja_uf = rng.choice(ufs, size=lojas, p=pesos_uf / pesos_uf.sum())
+    cnpj_base = rng.integers(0, 10, size=(lojas, 12))
+    cnpj_base[:, 8:12] = [0, 0, 0, 1]     # Estabelecimento matriz (/0001)
+    loja_cnpj = _cnpj_check_digits(cnpj_base)
+    loja_serie = rng.choice([1, 1, 1, 2, 3, 101], size=lojas)
+
+    popularidade = 1.0 / np.arange(1, lojas + 1) ** 1.1
+    loja = rng.choice(lojas, size=count, p=popularidade / popularidade.sum())
+
+    ano, mes = referencia
+    atraso = rng.integers(0, meses, size=count)
+    total_meses = ano * 12 + (mes - 1) - atraso
+    aamm = (total_meses // 12 % 100) * 100 + total_meses % 12 + 1
+
+    digits = np.zeros((count, KEY_LENGTH), dtype=np.uint8)
+    _put_number(digits, 0, 2, loja_uf[loja])
+    _put_number(digits, 2, 4, aamm)
+    digits[:, 6:20] = loja_cnpj[loja]
+    _put_number(digits, 20, 2, np.where(rng.random(count) < 0.9, 65, 55))
+    _put_number(digits, 22, 3, loja_serie[loja])
+    _put_number(digits, 25, 9, rng.integers(1, 1_000_000, size=count))
+    _put_number(digits, 34, 1, np.where(rng.random(count) < 0.97, 1, 9))
+    _put_number(digits, 35, 8, rng.integers(0, 100_000_000, size=count))
+
+    remainder = (digits[:, :-1].astype(np.int32) @ np.array(DV_WEIGHTS, dtype=np.int32)) % 11
+    digits[:, -1] = np.where(remainder < 2, 0, 11 - remainder)
+    return digits
+
+
+def keys_from_matrix(digits):
+    """Matriz de dígitos → lista de chaves textuais"""
+    raw = (digits + ord('0')).tobytes().decode('ascii')
+    return [raw[i:i + KEY_LENGTH] for i in range(0, len(raw), KEY_LENGTH)]
+
+
+def generate_keys(count, seed=42, **kwargs):
+    """Lista de `count` chaves válidas e reproduzíveis"""
+    return keys_from_matrix(generate_key_matrix(count, seed, **kwargs))
+
+
+def write_keys(path, digits, formato='txt'):
+    """Grava as chaves (uma por linha ou no formato do chaves.csv) sem passar por str"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    prefix = [ord("'")] if formato == 'csv' else []
+    line_end = [ord('\r'), ord('\n')] if formato == 'csv' else [ord('\n')]
+
+    with open(path, 'wb') as f:
+        if formato == 'csv':
+            f.write(b'\xef\xbb\xbfChave\r\n')      # utf-8-sig, como o app grava
+        for start in range(0, len(digits), 100_000):
+            block = digits[start:start + 100_000] + ord('0')
+            columns = [np.full((len(block), len(prefix)), prefix, dtype=np.uint8), block,
+                       np.full((len(block), len(line_end)), line_end, dtype=np.uint8)]
+            f.write(np.hstack(columns).tobytes())
+
+
+# === PAYLOADS ===
+
+def make_payload(rng, key):
+    """URL do QR no formato de um portal real (v1, v2/v3 online e offline, %7C ou chave pura)"""
+    url = PORTAIS[int(key[:2])]
+    amb = rng.choice('12')
+    sha = ''.join(rng.choices('0123456789ABCDEF', k=40))
+    kind = rng.randrange(7)
+    if kind == 0:
+        return (f"{url}?chNFe={key}&nVersao=100&tpAmb={amb}&dhEmi=323032352d30&vNF=12.50"
+                f"&digVal=6a4b&cIdToken=000001&cHashQRCode={sha}")
+    if kind == 1:
+        return f"{url}?p={key}|2|{amb}|{rng.randint(1, 999)}|{sha}"
+    if kind == 2:
+        return (f"{url}?p={key}|2|{amb}|{rng.randint(1, 28):02d}|{rng.randint(1, 999)}.{rng.randint(0, 99):02d}"
+                f"|{sha[:28]}|1|{sha}")
+    if kind == 3:
+        return f"{url}?p={key}|3|{amb}"
+    if kind == 4:
+        return f"{url}?p={key}|3|{amb}|20250101120000|15.90|1|12345678909|{sha}"
+    if kind == 5:
+        return f"{url}?p={key}%7C2%7C{amb}%7C1%7C{sha}"
+    return key
+
+
+# === IMAGENS ===
+
+def render_qr(payload, module_px=6):
+    """QR em tons de cinza (correção M, como nos cupons) com zona de silêncio"""
+    params = cv2.QRCodeEncoder.Params()
+    params.correction_level = cv2.QRCodeEncoder_CORRECT_LEVEL_M
+    qr = cv2.QRCodeEncoder.create(params).encode(payload)
+    return cv2.resize(qr, None, fx=module_px, fy=module_px, interpolation=cv2.INTER_NEAREST)
+
+
+def print_on_paper(qr, rng, size=(640, 480)):
+    """Cola o QR em uma folha com textura leve, em posição aleatória"""
+    height, width = size
+    paper = np.clip(rng.normal(238, 6, size=(height, width)), 0, 255).astype(np.uint8)
+    scale = min(1.0, 0.8 * min(height, width) / qr.shape[0])
+    if scale < 1.0:
+        qr = cv2.resize(qr, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    top = rng.integers(0, height - qr.shape[0] + 1)
+    left = rng.integers(0, width - qr.shape[1] + 1)
+    region = paper[top:top + qr.shape[0], left:left + qr.shape[1]]
+    paper[top:top + qr.shape[0], left:left + qr.shape[1]] = np.minimum(region, qr)
+    return paper
+
+
+def degrade(image, degradacao, intensidade, rng):
+    """Aplica uma degradação com intensidade em [0, 1]"""
+    height, width = image.shape[:2]
+
+    if degradacao == 'desfoque':
+        sigma = 0.5 + 3.0 * intensidade
+        return cv2.GaussianBlur(image, (0, 0), sigma)
+
+    if degradacao == 'perspectiva':
+        jitter = 0.25 * intensidade * np.array([width, height])
+        src = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+        dst = (src + rng.uniform(-1, 1, size=(4, 2)) * jitter).astype(np.float32)
+        matrix = cv2.getPerspectiveTransform(src, dst)
+        return cv2.warpPerspective(image, matrix, (width, height), borderValue=200)
+
+    if degradacao == 'baixo_contraste':
+        factor = 1.0 - 0.85 * intensidade
+        mean = float(image.mean())
+        return np.clip(mean + (image.astype(np.float32) - mean) * factor, 0, 255).astype(np.uint8)
+
+    if degradacao == 'termico':
+        # Tinta térmica desbota em faixas: o preto clareia de forma desigual
+        angle = rng.uniform(0, np.pi)
+        yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+        ramp = (np.cos(angle) * xx / width + np.sin(angle) * yy / height)
+        ramp = (ramp - ramp.min()) / max(float(np.ptp(ramp)), 1e-6)
+        fade = 1.0 - intensidade * (0.35 + 0.55 * ramp)
+        ink = 255.0 - image.astype(np.float32)
+        return np.clip(255.0 - ink * fade, 0, 255).astype(np.uint8)
+
+    if degradacao == 'amassado':
+        # Campo de deslocamento suave + sombreamento das dobras + ruído
+        amplitude = 6.0 * intensidade
+        field = rng.normal(0, 1, size=(2, 4, 4)).astype(np.float32)
+        dx = cv2.resize(field[0], (width, height), interpolation=cv2.INTER_CUBIC) * amplitude
+        dy = cv2.resize(field[1], (width, height), interpolation=cv2.INTER_CUBIC) * amplitude
+        yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+        warped = cv2.remap(image, xx + dx, yy + dy, cv2.INTER_LINEAR, borderValue=200)
+        shading = 1.0 - 0.25 * intensidade * np.abs(cv2.Sobel(dx, cv2.CV_32F, 1, 0) / (amplitude + 1e-6))
+        noise = rng.normal(0, 12 * intensidade, size=image.shape)
+        return np.clip(warped * shading + noise, 0, 255).astype(np.uint8)
+
+    if degradacao == 'jpeg':
+        quality = int(90 - 85 * intensidade)
+        _, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return cv2.imdecode(encoded, cv2.IMREAD_GRAYSCALE)
+
+    return image
+
+
+def generate_images(saida, quantidade, seed=42, degradacoes=DEGRADACOES, intensidades=tuple(INTENSIDADES),
+                    formato='png'):
+    """
+    Gera `quantidade` imagens rotuladas e o manifesto `manifesto.jsonl`
+
+    As combinações degradação × intensidade são percorridas em rodízio, de
+    forma que cada classe tenha aproximadamente o mesmo número de amostras.
+    """
+    if not CV2_AVAILABLE:
+        raise ImportError("Geração de imagens requer opencv-python")
+
+    saida = Path(saida)
+    saida.mkdir(parents=True, exist_ok=True)
+    keys = generate_keys(quantidade, seed)
+    classes = [(d, i) for d in degradacoes for i in (intensidades if d != 'limpa' else ('leve',))]
+
+    with open(saida / 'manifesto.jsonl', 'w', encoding='utf-8') as manifesto:
+        for index, key in enumerate(keys):
+            degradacao, intensidade = classes[index % len(classes)]
+            sample_seed = seed * 1_000_003 + index
+            rng = np.random.default_rng(sample_seed)
+            payload = make_payload(random.Random(sample_seed), key)
+
+            image = print_on_paper(render_qr(payload, module_px=int(rng.integers(4, 8))), rng)
+            image = degrade(image, degradacao, INTENSIDADES[intensidade], rng)
+
+            arquivo = f"{index:06d}_{degradacao}_{intensidade}.{formato}"
+            cv2.imwrite(str(saida / arquivo), image)
+            manifesto.write(json.dumps({
+                'arquivo': arquivo, 'chave': key, 'payload': payload,
+                'degradacao': degradacao, 'intensidade': intensidade, 'seed': sample_seed,
+            }, ensure_ascii=False) + '\n')
+
+
+def load_manifest(pasta):
+    """Lê o manifesto de um corpus de imagens (lista de dicionários)"""
+    pasta = Path(pasta)
+    with open(pasta / 'manifesto.jsonl', 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# === LINHA DE COMANDO ===
+
+def main():
+    parser = argparse.ArgumentParser(description='Corpus sintético de chaves de acesso e QR Codes')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    chaves = sub.add_parser('chaves', help='Gera chaves válidas (txt ou formato do chaves.csv)')
+    chaves.add_argument('--quantidade', type=int, default=1_000_000)
+    chaves.add_argument('--saida', default='corpus/chaves.txt')
+    chaves.add_argument('--formato', choices=('txt', 'csv'), default='txt')
+    chaves.add_argument('--lojas', type=int, default=5_000)
+    chaves.add_argument('--seed', type=int, default=42)
+
+    imagens = sub.add_parser('imagens', help='Gera imagens de QR degradadas + manifesto')
+    imagens.add_argument('--quantidade', type=int, default=600)
+    imagens.add_argument('--saida', default='corpus/imagens')
+    imagens.add_argument('--degradacoes', nargs='+', choices=DEGRADACOES, default=list(DEGRADACOES))
+    imagens.add_argument('--intensidades', nargs='+', choices=tuple(INTENSIDADES), default=list(INTENSIDADES))
+    imagens.add_argument('--formato', choices=('png', 'jpg'), default='png')
+    imagens.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if args.comando == 'chaves':
+        digits = generate_key_matrix(args.quantidade, args.seed, lojas=args.lojas)
+        write_keys(args.saida, digits, args.formato)
+        print(f"✅ {args.quantidade} chaves gravadas em {args.saida}")
+    else:
+        generate_images(args.saida, args.quantidade, args.seed, args.degradacoes, args.intensidades, args.formato)
+        print(f"✅ {args.quantidade} imagens + manifesto.jsonl em {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -21,7 +21,7 @@ source.include_exts = py,png,jpg,kv,atlas,json
 source.exclude_exts = pyc,pyo
 
 # (list) Padrões de diretórios para excluir
-source.exclude_dirs = tests, bin, .git, .github, __pycache__, .buildozer
+source.exclude_dirs = tests, bin, benchmarks, .git, .github, __pycache__, .buildozer
 
 # (list) Padrões de arquivos específicos para excluir
 source.exclude_patterns = test_*,*_test*,*_backup*,*_old*,*.log,*.tmp
@@ -22,7 +22,7 @@ source.include_patterns = main.py
 
 # (list) EXCLUSÕES AGRESSIVAS - Lista negra
 source.exclude_exts = pyc,pyo,bak,tmp,log,old
-source.exclude_dirs = tests,test,__pycache__,.git,.github,.buildozer,bin,dist,backup,old
+source.exclude_dirs = tests,test,benchmarks,__pycache__,.git,.github,.buildozer,bin,dist,backup,old
 source.exclude_patterns = test_*,*_test*,*_backup*,*_old*,*_bak*,*_complex*,*_moderno*,*_novo*,android_*,build_*,deploy_*,quick_*,*.log,*.tmp
 
 # (str) Versão
@@ -11,7 +11,7 @@ source.dir = .
 # Inclusões e exclusões - ULTRA RESTRITIVO
 source.include_exts = py
 source.exclude_exts = pyc,pyo,bak,tmp,log
-source.exclude_dirs = tests,test,bin,dist,build,.git,.github,.buildozer,__pycache__,venv,.venv,node_modules
+source.exclude_dirs = tests,test,benchmarks,bin,dist,build,.git,.github,.buildozer,__pycache__,venv,.venv,node_modules
 source.exclude_patterns = test_*,*_test*,*_backup*,*_old*,*_bak*,*_tmp*,*.log,*.tmp,README*,LICENSE*,*.md
 
 # Versionamento
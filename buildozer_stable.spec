@@ -63,7 +63,7 @@ android.ndk_path =
 android.sdk_path = 
 
 # (list) Padrões para ignorar durante packaging
-source.exclude_dirs = tests, bin, venv, __pycache__, .buildozer, .git
+source.exclude_dirs = tests, bin, benchmarks, venv, __pycache__, .buildozer, .git
 
 # (list) Padrões de arquivos para excluir
 source.exclude_patterns = license,images/*/*.jpg,*.pyc,*.pyo
@@ -5,7 +5,6 @@ from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.floatlayout import FloatLayout
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
@@ -23,11 +22,20 @@ from kivy.utils import platform
 import json
 import re
 import os
+import sys
 import csv
 import time
 import threading
 from datetime import datetime
 
+# Journal de chaves e lista virtualizada compartilhados com a versão Android
+PASTA_COMPARTILHADA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'v2-android')
+if PASTA_COMPARTILHADA not in sys.path:
+    sys.path.append(PASTA_COMPARTILHADA)
+
+from key_store import KeyJournal
+from keys_view import KeysRecycleView
+
 # Importações para Android
 if platform == 'android':
     try:
@@ -72,6 +80,9 @@ class SavedKey:
     def get_formatted_date(self):
         return datetime.fromtimestamp(self.timestamp).strftime('%d/%m/%Y %H:%M')
 
+def format_saved_key(key, timestamp):
+    return f"{key[:20]}...\n{datetime.fromtimestamp(timestamp).strftime('%d/%m/%Y %H:%M')}"
+
 class ModernCard(FloatLayout):
     def __init__(self, bg_color=COLORS['surface'], **kwargs):
         super().__init__(**kwargs)
@@ -253,6 +264,7 @@ class MercadoEmNumerosApp(App):
         
         # Variáveis de estado
         self.saved_keys = []
+        self.key_store = KeyJournal('saved_keys.json')
         self.load_saved_keys()
         
         return self.sm
@@ -277,7 +289,7 @@ class MercadoEmNumerosApp(App):
         if self.validate_fiscal_key(key):
             saved_key = SavedKey(key)
             self.saved_keys.insert(0, saved_key)
-            self.save_keys()
+            self.save_key(saved_key)
             self.main_screen.status_label.text = f'Chave processada e salva: {key[:20]}...'
         else:
             self.main_screen.status_label.text = 'Chave fiscal inválida'
@@ -289,19 +301,23 @@ class MercadoEmNumerosApp(App):
     
     def load_saved_keys(self):
         try:
-            if os.path.exists('saved_keys.json'):
-                with open('saved_keys.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.saved_keys = [SavedKey.from_dict(item) for item in data]
+            data = self.key_store.load()
+            self.saved_keys = [SavedKey.from_dict(item) for item in data]
         except Exception as e:
             print(f"Erro ao carregar chaves: {e}")
             self.saved_keys = []
     
+    def save_key(self, saved_key):
+        try:
+            self.key_store.append_add(saved_key.key, saved_key.timestamp)
+            if self.key_store.needs_compaction:
+                self.key_store.compact_async([key.to_dict() for key in self.saved_keys])
+        except Exception as e:
+            print(f"Erro ao salvar chave: {e}")
+    
     def save_keys(self):
         try:
-            data = [key.to_dict() for key in self.saved_keys]
-            with open('saved_keys.json', 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.key_store.compact([key.to_dict() for key in self.saved_keys])
         except Exception as e:
             print(f"Erro ao salvar chaves: {e}")
     
@@ -322,41 +338,12 @@ class MercadoEmNumerosApp(App):
         )
         content.add_widget(header)
         
-        # Lista de chaves
-        scroll = ScrollView()
-        keys_layout = BoxLayout(orientation='vertical', spacing=dp(5), size_hint_y=None)
-        keys_layout.bind(minimum_height=keys_layout.setter('height'))
-        
-        for i, saved_key in enumerate(self.saved_keys[:10]):  # Mostra apenas as 10 mais recentes
-            key_layout = BoxLayout(
-                orientation='horizontal',
-                size_hint_y=None,
-                height=dp(60),
-                spacing=dp(10)
-            )
-            
-            key_info = Label(
-                text=f'{saved_key.key[:20]}...\n{saved_key.get_formatted_date()}',
-                font_size=sp(12),
-                halign='left',
-                valign='middle'
-            )
-            key_info.bind(size=key_info.setter('text_size'))
-            
-            use_btn = Button(
-                text='Usar',
-                size_hint_x=None,
-                width=dp(60),
-                background_color=COLORS['primary']
-            )
-            use_btn.bind(on_press=lambda x, key=saved_key.key: self.use_saved_key(key))
-            
-            key_layout.add_widget(key_info)
-            key_layout.add_widget(use_btn)
-            keys_layout.add_widget(key_layout)
-        
-        scroll.add_widget(keys_layout)
-        content.add_widget(scroll)
+        # Lista virtualizada: todas as chaves, só as linhas visíveis viram widgets
+        keys_view = KeysRecycleView(row_height=dp(60), font_size=sp(12), action_text='Usar',
+                                    action_color=COLORS['primary'], formatter=format_saved_key)
+        keys_view.set_keys(self.saved_keys)
+        keys_view.bind(on_key_action=lambda view, key: self.use_saved_key(key))
+        content.add_widget(keys_view)
         
         # Botão fechar
         close_btn = Button(
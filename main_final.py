@@ -19,8 +19,16 @@ from kivy.graphics import Color, RoundedRectangle
 import json
 import re
 import os
+import sys
 from datetime import datetime
 
+# Journal de chaves compartilhado com a versão Android
+PASTA_COMPARTILHADA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'v2-android')
+if PASTA_COMPARTILHADA not in sys.path:
+    sys.path.append(PASTA_COMPARTILHADA)
+
+from key_store import KeyJournal
+
 # Importações Android
 if platform == 'android':
     try:
@@ -309,6 +317,7 @@ class LeitorQRApp(App):
         
         # Estado da aplicação
         self.saved_keys = []
+        self.key_store = KeyJournal('saved_keys.json')
         self.load_saved_keys()
         
         return self.sm
@@ -337,7 +346,7 @@ class LeitorQRApp(App):
             # Salva a chave
             saved_key = SavedKey(key)
             self.saved_keys.insert(0, saved_key)
-            self.save_keys()
+            self.save_key(saved_key)
             
             # Feedback visual
             short_key = key[:15] + '...' if len(key) > 15 else key
@@ -353,22 +362,27 @@ class LeitorQRApp(App):
         return len(clean_key) == 44
     
     def load_saved_keys(self):
-        """Carrega chaves salvas do arquivo"""
+        """Carrega chaves salvas (snapshot + journal)"""
         try:
-            if os.path.exists('saved_keys.json'):
-                with open('saved_keys.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.saved_keys = [SavedKey.from_dict(item) for item in data]
+            data = self.key_store.load()
+            self.saved_keys = [SavedKey.from_dict(item) for item in data]
         except Exception as e:
             print(f"Erro ao carregar chaves: {e}")
             self.saved_keys = []
     
+    def save_key(self, saved_key):
+        """Registra uma chave no journal (uma linha por leitura)"""
+        try:
+            self.key_store.append_add(saved_key.key, saved_key.timestamp)
+            if self.key_store.needs_compaction:
+                self.key_store.compact_async([key.to_dict() for key in self.saved_keys])
+        except Exception as e:
+            print(f"Erro ao salvar chave: {e}")
+    
     def save_keys(self):
-        """Salva chaves no arquivo"""
+        """Salva chaves (snapshot completo)"""
         try:
-            data = [key.to_dict() for key in self.saved_keys]
-            with open('saved_keys.json', 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.key_store.compact([key.to_dict() for key in self.saved_keys])
         except Exception as e:
             print(f"Erro ao salvar chaves: {e}")
     
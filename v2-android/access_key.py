@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔑 CHAVE DE ACESSO - Representação compacta de chaves de 44 dígitos
+
+Uma chave NF-e/NFC-e como str ocupa ~93 bytes + overhead de objeto e de
+conjunto. Aqui ela vira um inteiro de 19 bytes (10^44 < 2^152), em ordem
+big-endian: a ordem dos bytes é a mesma ordem numérica/textual das chaves,
+o que permite guardar conjuntos inteiros em um único buffer ordenado.
+
+Também concentra a validação do dígito verificador (módulo 11, pesos 2..9
+aplicados da direita para a esquerda), escalar e em lote com NumPy, e a
+decodificação dos campos da chave em uma tabela colunar.
+"""
+
+from bisect import bisect_left
+from itertools import compress
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+KEY_LENGTH = 44
+PACKED_SIZE = 19
+EXCEL_PREFIX = "'"
+
+# Pesos do DV para as 43 primeiras posições: 2..9 a partir da direita
+DV_WEIGHTS = tuple(2 + (KEY_LENGTH - 2 - i) % 8 for i in range(KEY_LENGTH - 1))
+
+# Motivos de falha da validação em lote
+REASON_OK = 0
+REASON_LENGTH = 1
+REASON_NOT_DIGIT = 2
+REASON_CHECK_DIGIT = 3
+REASON_LABELS = {
+    REASON_OK: 'válida',
+    REASON_LENGTH: 'tamanho diferente de 44',
+    REASON_NOT_DIGIT: 'caractere não numérico',
+    REASON_CHECK_DIGIT: 'dígito verificador incorreto',
+}
+
+# Campos da chave: nome, início, fim e tipo da coluna decodificada
+KEY_FIELDS = (
+    ('cUF', 0, 2, 'u1'),        # Código IBGE da UF
+    ('AAMM', 2, 6, 'u2'),       # Ano e mês de emissão
+    ('CNPJ', 6, 20, 'S14'),     # Texto: preserva zeros à esquerda
+    ('mod', 20, 22, 'u1'),      # Modelo (55 NF-e, 65 NFC-e)
+    ('serie', 22, 25, 'u2'),
+    ('nNF', 25, 34, 'u4'),
+    ('tpEmis', 34, 35, 'u1'),   # Forma de emissão
+    ('cNF', 35, 43, 'u4'),      # Código numérico
+    ('cDV', 43, 44, 'u1'),      # Dígito verificador
+)
+
+
+def normalize_key(value) -> str:
+    """Remove espaços e a aspa simples usada para forçar texto no Excel"""
+    text = str(value).strip()
+    if text.startswith(EXCEL_PREFIX):
+        text = text[1:]
+    return text
+
+
+def pack_key(key: str) -> bytes:
+    """Chave textual (44 dígitos) → 19 bytes"""
+    key = normalize_key(key)
+    if len(key) != KEY_LENGTH or not (key.isascii() and key.isdigit()):
+        raise ValueError(f"Chave de acesso inválida: {key!r}")
+    return int(key).to_bytes(PACKED_SIZE, 'big')
+
+
+def unpack_key(raw: bytes) -> str:
+    """19 bytes → chave textual com zeros à esquerda"""
+    return str(int.from_bytes(raw, 'big')).zfill(KEY_LENGTH)
+
+
+# === DÍGITO VERIFICADOR ===
+
+def compute_check_digit(body: str) -> int:
+    """DV (módulo 11) dos 43 primeiros dígitos da chave"""
+    total = sum(int(digit) * weight for digit, weight in zip(body, DV_WEIGHTS))
+    remainder = total % 11
+    return 0 if remainder < 2 else 11 - remainder
+
+
+def validation_reason(key: str) -> int:
+    """Motivo de falha (REASON_*) de uma chave; REASON_OK se válida"""
+    if len(key) != KEY_LENGTH:
+        return REASON_LENGTH
+    if not (key.isascii() and key.isdigit()):
+        return REASON_NOT_DIGIT
+    if compute_check_digit(key[:-1]) != int(key[-1]):
+        return REASON_CHECK_DIGIT
+    return REASON_OK
+
+
+def is_valid_key(key: str) -> bool:
+    """Chave de 44 dígitos com DV correto"""
+    return validation_reason(key) == REASON_OK
+
+
+def validate_keys_batch(keys: Sequence[str]) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Valida muitas chaves de uma vez
+
+    As chaves de 44 caracteres viram uma matriz (n, 44) de uint8 e todos os
+    DVs saem de um único produto matriz-vetor. Retorna (máscara booleana,
+    motivos REASON_* em uint8), na ordem de `keys`.
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("Validação em lote requer numpy")
+
+    keys = keys if isinstance(keys, list) else list(keys)
+    lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+    reasons = np.full(len(keys), REASON_LENGTH, dtype=np.uint8)
+
+    full_length = lengths == KEY_LENGTH
+    if full_length.all():
+        candidates = keys
+    else:
+        candidates = list(compress(keys, full_length.tolist()))
+
+    if candidates:
+        digits = _char_matrix(candidates) - ord('0')
+
+        # uint8: caracteres abaixo de '0' dão a volta e também ficam > 9
+        not_digit = digits.max(axis=1) > 9
+        # float32 usa o BLAS e é exato aqui (soma máxima 43 * 9 * 9)
+        totals = digits[:, :-1].astype(np.float32) @ np.array(DV_WEIGHTS, dtype=np.float32)
+        remainders = totals.astype(np.int32) % 11
+        expected = np.where(remainders < 2, 0, 11 - remainders)
+        wrong_dv = expected != digits[:, -1]
+
+        candidate_reasons = np.full(len(candidates), REASON_OK, dtype=np.uint8)
+        candidate_reasons[wrong_dv] = REASON_CHECK_DIGIT
+        candidate_reasons[not_digit] = REASON_NOT_DIGIT
+        reasons[full_length] = candidate_reasons
+
+    return reasons == REASON_OK, reasons
+
+
+def _char_matrix(keys: Sequence[str]) -> 'np.ndarray':
+    """Chaves de 44 caracteres → matriz (n, 44) de bytes ASCII"""
+    # Caracteres não ASCII viram '?' (1 byte) e caem como não numéricos
+    joined = ''.join(keys).encode('ascii', errors='replace')
+    return np.frombuffer(joined, dtype=np.uint8).reshape(-1, KEY_LENGTH)
+
+
+# === CAMPOS DA CHAVE ===
+
+KEY_FIELDS_DTYPE = [(name, dtype) for name, _, _, dtype in KEY_FIELDS] if NUMPY_AVAILABLE else None
+
+
+def decode_key_fields(keys: Sequence[str]) -> 'np.ndarray':
+    """
+    Decodifica muitas chaves em um array estruturado (uma coluna por campo)
+
+    Fatiamento vetorizado sobre a matriz (n, 44): cada campo numérico é
+    montado coluna a coluna sobre todas as chaves de uma vez. Todas as
+    chaves devem ter 44 dígitos (filtre antes com `validate_keys_batch`).
+    O resultado vai direto para `pandas.DataFrame(tabela)`.
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("Decodificação em lote requer numpy")
+
+    keys = keys if isinstance(keys, list) else list(keys)
+    table = np.zeros(len(keys), dtype=KEY_FIELDS_DTYPE)
+    if not keys:
+        return table
+
+    if (np.fromiter(map(len, keys), dtype=np.int64, count=len(keys)) != KEY_LENGTH).any():
+        raise ValueError("Todas as chaves devem ter 44 dígitos")
+    chars = _char_matrix(keys)
+    digits = chars - ord('0')
+    if (digits.max(axis=1) > 9).any():
+        raise ValueError("Chave com caractere não numérico")
+
+    # Horner coluna a coluna em uint32 (o maior campo numérico tem 9 dígitos)
+    value = np.empty(len(keys), dtype=np.uint32)
+    for name, start, end, dtype in KEY_FIELDS:
+        if dtype.startswith('S'):
+            table[name] = np.ascontiguousarray(chars[:, start:end]).view(dtype).ravel()
+            continue
+        value[:] = digits[:, start]
+        for column in range(start + 1, end):
+            value *= 10
+            value += digits[:, column]
+        table[name] = value
+    return table
+
+
+class PackedKey:
+    """Chave de acesso compacta, imutável e ordenável"""
+
+    __slots__ = ('raw',)
+
+    def __init__(self, raw: bytes):
+        if len(raw) != PACKED_SIZE:
+            raise ValueError(f"Chave compacta deve ter {PACKED_SIZE} bytes")
+        self.raw = bytes(raw)
+
+    @classmethod
+    def from_str(cls, key: str) -> 'PackedKey':
+        return cls(pack_key(key))
+
+    @classmethod
+    def from_csv(cls, value: str) -> 'PackedKey':
+        """Aceita o formato do CSV (com ou sem a aspa do Excel)"""
+        return cls(pack_key(value))
+
+    def to_csv(self) -> str:
+        """Formato gravado no chaves.csv (aspa simples força texto no Excel)"""
+        return EXCEL_PREFIX + str(self)
+
+    def __str__(self) -> str:
+        return unpack_key(self.raw)
+
+    def __repr__(self) -> str:
+        return f"PackedKey('{self}')"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PackedKey):
+            return self.raw == other.raw
+        return NotImplemented
+
+    def __lt__(self, other: 'PackedKey') -> bool:
+        return self.raw < other.raw
+
+    def __hash__(self) -> int:
+        return hash(self.raw)
+
+
+class PackedKeySet:
+    """
+    Conjunto de chaves em um bytearray ordenado (19 bytes por chave)
+
+    Pertinência por busca binária O(log n); inserção O(n) por deslocamento de
+    memória, desprezível para dezenas de milhares de chaves.
+    """
+
+    __slots__ = ('_buffer',)
+
+    def __init__(self, buffer: Optional[bytes] = None):
+        self._buffer = bytearray(buffer or b'')
+        if len(self._buffer) % PACKED_SIZE:
+            raise ValueError("Buffer não é múltiplo do tamanho da chave compacta")
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[str]) -> 'PackedKeySet':
+        """Construção em lote: empacota, ordena e remove duplicatas"""
+        packed = sorted({pack_key(key) for key in keys})
+        return cls(b''.join(packed))
+
+    def to_bytes(self) -> bytes:
+        """Buffer ordenado (para persistência)"""
+        return bytes(self._buffer)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer)
+
+    def __len__(self) -> int:
+        return len(self._buffer) // PACKED_SIZE
+
+    def _record(self, index: int) -> bytes:
+        start = index * PACKED_SIZE
+        return bytes(self._buffer[start:start + PACKED_SIZE])
+
+    def _find(self, raw: bytes):
+        """Posição de inserção de `raw` e se já está presente"""
+        pos = bisect_left(_RecordView(self), raw)
+        return pos, pos < len(self) and self._record(pos) == raw
+
+    def __contains__(self, key) -> bool:
+        try:
+            raw = key.raw if isinstance(key, PackedKey) else pack_key(key)
+        except ValueError:
+            return False
+        return self._find(raw)[1]
+
+    def add(self, key) -> bool:
+        """Adiciona chave; retorna False se já existia"""
+        raw = key.raw if isinstance(key, PackedKey) else pack_key(key)
+        pos, found = self._find(raw)
+        if found:
+            return False
+        start = pos * PACKED_SIZE
+        self._buffer[start:start] = raw
+        return True
+
+    def discard(self, key):
+        try:
+            raw = key.raw if isinstance(key, PackedKey) else pack_key(key)
+        except ValueError:
+            return
+        pos, found = self._find(raw)
+        if found:
+            start = pos * PACKED_SIZE
+            del self._buffer[start:start + PACKED_SIZE]
+
+    def clear(self):
+        self._buffer = bytearray()
+
+    def __iter__(self) -> Iterator[str]:
+        """Itera as chaves textuais em ordem crescente"""
+        for index in range(len(self)):
+            yield unpack_key(self._record(index))
+
+
+class _RecordView:
+    """Sequência somente leitura de registros para o bisect"""
+
+    __slots__ = ('_keys',)
+
+    def __init__(self, keys: PackedKeySet):
+        self._keys = keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __getitem__(self, index: int) -> bytes:
+        return self._keys._record(index)
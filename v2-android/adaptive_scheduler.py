@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ AGENDADOR ADAPTATIVO - Taxa de decodificação ajustada à cena e ao aparelho
+
+Em vez de um FPS fixo de processamento e de um cooldown global, a taxa de
+decodificação é recalculada a cada frame processado a partir de:
+
+    cena         região com cara de QR (`qr_candidate_cells`) → taxa máxima;
+                 cena vazia por `idle_after` segundos → taxa ociosa
+    latência     média móvel do tempo de decodificação: a taxa nunca ocupa
+                 mais que `target_duty` de um núcleo
+    CPU          uso do processo e load average por núcleo acima de `max_cpu`
+                 → taxa pela metade
+    aparelho     temperatura (sysfs: zona de bateria/carcaça, ou do SoC com
+                 limites próprios) e bateria (plyer no Android, sysfs no
+                 Linux): quente → metade, crítico → ociosa; na bateria limita
+                 à taxa base, com bateria fraca à ociosa
+
+Depois de uma leitura o cooldown termina antes de `cooldown` segundos quando
+o cupom sai do quadro (`clear_frames` frames seguidos sem região candidata,
+após `min_cooldown`), liberando o próximo cupom mais cedo. Durante o cooldown
+o worker só roda a checagem de região (barata), sem decodificar.
+
+Cada mudança de taxa vira uma `Decision` (taxa, motivos e as medidas que a
+justificaram), guardada em `decisions` e publicada nas métricas
+(gauge `decode_target_fps`, contador `scheduler_decisions{reason}`).
+"""
+
+import os
+import re
+import glob
+import time
+import threading
+from collections import deque
+from typing import NamedTuple, Optional, Tuple
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+try:
+    from plyer import battery
+    PLYER_AVAILABLE = True
+except ImportError:
+    PLYER_AVAILABLE = False
+
+
+# === REGIÃO CANDIDATA ===
+
+def qr_candidate_cells(luma, width: int = 192, cell: int = 12, min_contrast: float = 24.0,
+                       relative_contrast: float = 0.4, dark_range: Tuple[float, float] = (0.35, 0.65)) -> int:
+    """
+    Tamanho (em células) do maior bloco com textura de QR no frame em cinza
+
+    O frame é reduzido a `width` px de largura e dividido em células de
+    `cell` px. Uma célula é candidata com contraste alto (relativo ao frame)
+    e metade dos pixels escura, como os módulos de um QR; texto impresso tem
+    bem menos tinta por célula. O maior componente de células vizinhas com
+    forma aproximadamente quadrada é o resultado (0 = cena sem QR). ~1 ms em
+    800 px.
+    """
+    height, frame_width = luma.shape[:2]
+    rows, cols = max(1, round(height * width / frame_width) // cell), width // cell
+    small = cv2.resize(luma, (cols * cell, rows * cell), interpolation=cv2.INTER_AREA)
+    blocks = small.reshape(rows, cell, cols, cell)
+    high = blocks.max(axis=(1, 3)).astype(np.float32)
+    low = blocks.min(axis=(1, 3)).astype(np.float32)
+    mean = cv2.resize(small, (cols, rows), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+    # Em célula binária a média fica entre claro e escuro na proporção da tinta
+    spread = high - low
+    dark_fraction = (high - mean) / np.maximum(spread, 1)
+    threshold = max(min_contrast, relative_contrast * float(high.max() - low.min()))
+    mask = ((spread >= threshold) & (dark_fraction >= dark_range[0]) &
+            (dark_fraction <= dark_range[1])).astype(np.uint8)
+
+    _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    best = 0
+    for _, _, box_width, box_height, area in stats[1:]:
+        if 0.5 <= box_width / box_height <= 2 and area >= 0.4 * box_width * box_height:
+            best = max(best, int(area))
+    return best
+
+
+# === ESTADO DO APARELHO ===
+
+class DeviceState(NamedTuple):
+    temperature_c: Optional[float] = None
+    on_battery: Optional[bool] = None
+    battery_percent: Optional[float] = None
+    temperature_source: Optional[str] = None    # 'skin' (bateria/carcaça) ou 'soc'
+
+
+# Zonas que acompanham o aparelho por fora; CPU/GPU passam de 42 °C com a câmera ligada
+_SKIN_ZONE = re.compile(r'batt|bms|skin|case|shell|back|xo[-_]?therm|quiet[-_]?therm', re.IGNORECASE)
+
+
+def _read_number(path: str) -> Optional[float]:
+    try:
+        with open(path) as f:
+            return float(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class DeviceMonitor:
+    """
+    Temperatura e bateria, relidas no máximo a cada `poll_interval` segundos
+
+    Temperatura: maior zona de bateria/carcaça de /sys/class/thermal
+    (`thermal_zone*/type`, milésimos de grau); sem nenhuma, a maior das
+    demais, marcada como 'soc' para o agendador usar limites mais altos.
+    Bateria: plyer quando disponível (Android), senão /sys/class/power_supply.
+    Campos sem fonte ficam None e não influenciam a taxa.
+    """
+
+    def __init__(self, poll_interval: float = 10.0, sysfs_root: str = '/sys/class'):
+        self.poll_interval = poll_interval
+        self.sysfs_root = sysfs_root
+        self._state = DeviceState()
+        self._read_at = None
+
+    def read(self, now: Optional[float] = None) -> DeviceState:
+        now = time.monotonic() if now is None else now
+        if self._read_at is None or now - self._read_at >= self.poll_interval:
+            self._read_at = now
+            temperature, source = self._temperature()
+            self._state = DeviceState(temperature, *self._battery(), temperature_source=source)
+        return self._state
+
+    def _temperature(self) -> Tuple[Optional[float], Optional[str]]:
+        readings = {'skin': [], 'soc': []}
+        for zone in glob.glob(f'{self.sysfs_root}/thermal/thermal_zone*'):
+            value = _read_number(f'{zone}/temp')
+            if value is None or value <= 0:
+                continue
+            kind = 'skin' if _SKIN_ZONE.search(_read_text(f'{zone}/type') or '') else 'soc'
+            readings[kind].append(value / 1000)
+        for source in ('skin', 'soc'):
+            if readings[source]:
+                return max(readings[source]), source
+        return None, None
+
+    def _battery(self) -> Tuple[Optional[bool], Optional[float]]:
+        if PLYER_AVAILABLE:
+            try:
+                status = battery.status
+                if status.get('percentage') is not None:
+                    return not status.get('isCharging', False), status.get('percentage')
+            except Exception:
+                pass
+
+        for supply in glob.glob(f'{self.sysfs_root}/power_supply/*'):
+            if _read_text(f'{supply}/type') != 'Battery':
+                continue
+            status = _read_text(f'{supply}/status')
+            return (status == 'Discharging') if status else None, _read_number(f'{supply}/capacity')
+        return None, None
+
+
+class CpuSampler:
+    """Uso de CPU do processo (todas as threads) e load average, por núcleo"""
+
+    def __init__(self, min_interval: float = 1.0):
+        self.min_interval = min_interval
+        self.cores = os.cpu_count() or 1
+        self._last = (time.monotonic(), time.process_time())
+        self.load = 0.0
+
+    def sample(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        wall, cpu = self._last
+        if now - wall >= self.min_interval:
+            process_time = time.process_time()
+            process_load = (process_time - cpu) / ((now - wall) * self.cores)
+            try:
+                system_load = os.getloadavg()[0] / self.cores
+            except (AttributeError, OSError):
+                system_load = 0.0
+            self.load = max(process_load, system_load)
+            self._last = (now, process_time)
+        return self.load
+
+
+# === AGENDADOR ===
+
+class Decision(NamedTuple):
+    """Uma mudança de taxa e o que a motivou"""
+    time: float
+    fps: float
+    reasons: Tuple[str, ...]
+    latency_ms: Optional[float]
+    cpu_load: float
+    temperature_c: Optional[float]
+    on_battery: Optional[bool]
+
+
+class AdaptiveScheduler:
+    """
+    Decide quando entregar o próximo frame ao decodificador
+
+        if scheduler.due():                       # thread da UI / loop da câmera
+            worker.submit(frame)
+        scheduler.record(seconds, candidate, found)   # após cada frame processado
+        scheduler.record_read()                   # chave lida → cooldown
+    """
+
+    def __init__(self, base_fps: float = 10.0, max_fps: float = 20.0, idle_fps: float = 3.0,
+                 target_duty: float = 0.7, max_cpu: float = 0.85,
+                 hot_c: float = 42.0, critical_c: float = 47.0,
+                 soc_hot_c: float = 70.0, soc_critical_c: float = 80.0, low_battery: float = 20.0,
+                 idle_after: float = 3.0, candidate_hold: float = 1.5, min_candidate_cells: int = 6,
+                 cooldown: float = 1.5, min_cooldown: float = 0.4, clear_frames: int = 3,
+                 device: Optional[DeviceMonitor] = None, cpu: Optional[CpuSampler] = None,
+                 metrics=None, clock=time.monotonic, history: int = 100):
+        self.base_fps = base_fps
+        self.max_fps = max_fps
+        self.idle_fps = idle_fps
+        self.target_duty = target_duty
+        self.max_cpu = max_cpu
+        self.hot_c = hot_c
+        self.critical_c = critical_c
+        self.soc_hot_c = soc_hot_c
+        self.soc_critical_c = soc_critical_c
+        self.low_battery = low_battery
+        self.idle_after = idle_after
+        self.candidate_hold = candidate_hold
+        self.min_candidate_cells = min_candidate_cells
+        self.cooldown = cooldown
+        self.min_cooldown = min_cooldown
+        self.clear_frames = clear_frames
+        self.device = device if device is not None else DeviceMonitor()
+        self.cpu = cpu if cpu is not None else CpuSampler()
+        self.metrics = metrics
+        self.clock = clock
+        self.decisions = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Estado de uma nova sessão de câmera (a cena começa 'desconhecida')"""
+        now = self.clock()
+        with self._lock:
+            self.fps = self.base_fps
+            self.reasons = ('base',)
+            self.latency = None
+            self.started = now
+            self._last_submit = None
+            self._last_candidate = None
+            self._last_read = None
+            self._clear_streak = 0
+            self.submitted = 0
+            self.processed = 0
+            self.reads = 0
+            self.early_releases = 0
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.fps
+
+    def is_candidate(self, luma) -> bool:
+        """Checagem barata de região com cara de QR (frame em cinza)"""
+        return qr_candidate_cells(luma) >= self.min_candidate_cells
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """True se já passou o intervalo da taxa atual (e conta o envio)"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            if self._last_submit is not None and now - self._last_submit < 1.0 / self.fps:
+                return False
+            self._last_submit = now
+            self.submitted += 1
+            return True
+
+    def in_cooldown(self, now: Optional[float] = None) -> bool:
+        """Cooldown após leitura, encerrado cedo se o cupom saiu do quadro"""
+        if self._last_read is None:
+            return False
+        elapsed = (self.clock() if now is None else now) - self._last_read
+        if elapsed >= self.cooldown:
+            return False
+        return not (elapsed >= self.min_cooldown and self._clear_streak >= self.clear_frames)
+
+    def record(self, seconds: float, candidate: bool, found: bool = False, decoded: bool = True,
+               now: Optional[float] = None):
+        """
+        Resultado de um frame processado (thread do worker)
+
+        `decoded=False` para frames em que só a região foi checada (cooldown):
+        não entram na média de latência de decodificação.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            self.processed += 1
+            if decoded:
+                self.latency = seconds if self.latency is None else 0.8 * self.latency + 0.2 * seconds
+            if candidate or found:
+                self._last_candidate = now
+                self._clear_streak = 0
+            else:
+                self._clear_streak += 1
+                if self._last_read is not None and self._clear_streak == self.clear_frames \
+                        and self.min_cooldown <= now - self._last_read < self.cooldown:
+                    self.early_releases += 1
+        self._decide(now)
+
+    def record_read(self, now: Optional[float] = None):
+        """Chave lida: inicia o cooldown (o cupom ainda está no quadro)"""
+        with self._lock:
+            self._last_read = self.clock() if now is None else now
+            self._clear_streak = 0
+            self.reads += 1
+
+    def _decide(self, now: float):
+        # Medidas fora da trava (sysfs pode demorar); a decisão dentro, como em due()
+        cpu_load = self.cpu.sample(now)
+        device = self.device.read(now)
+        with self._lock:
+            self._apply(now, cpu_load, device)
+
+    def _apply(self, now: float, cpu_load: float, device: DeviceState):
+        since_candidate = now - (self._last_candidate if self._last_candidate is not None else self.started)
+        if self._last_candidate is not None and since_candidate <= self.candidate_hold:
+            fps, reasons = self.max_fps, ['candidate']
+        elif since_candidate >= self.idle_after:
+            fps, reasons = self.idle_fps, ['idle']
+        else:
+            fps, reasons = self.base_fps, ['base']
+
+        if self.latency:
+            latency_cap = self.target_duty / self.latency
+            if latency_cap < fps:
+                fps = latency_cap
+                reasons.append('latency')
+
+        if cpu_load > self.max_cpu:
+            fps /= 2
+            reasons.append('cpu')
+
+        hot_c, critical_c = ((self.soc_hot_c, self.soc_critical_c) if device.temperature_source == 'soc'
+                             else (self.hot_c, self.critical_c))
+        if device.temperature_c is not None and device.temperature_c >= critical_c:
+            fps = min(fps, self.idle_fps)
+            reasons.append('critical_temperature')
+        elif device.temperature_c is not None and device.temperature_c >= hot_c:
+            fps /= 2
+            reasons.append('hot')
+        if device.on_battery:
+            if device.battery_percent is not None and device.battery_percent <= self.low_battery:
+                fps = min(fps, self.idle_fps)
+                reasons.append('low_battery')
+            elif fps > self.base_fps:
+                fps = self.base_fps
+                reasons.append('battery')
+
+        # Piso de 1 FPS (ou a taxa ociosa, se menor): a cena continua sendo observada
+        fps = max(min(fps, self.max_fps), min(self.idle_fps, 1.0))
+        reasons = tuple(reasons)
+        if abs(fps - self.fps) < 0.5 and reasons == self.reasons:
+            return
+
+        self.fps, self.reasons = fps, reasons
+        self.decisions.append(Decision(now, fps, reasons,
+                                       self.latency * 1000 if self.latency else None,
+                                       cpu_load, device.temperature_c, device.on_battery))
+        if self.metrics is not None:
+            self.metrics.set_gauge('decode_target_fps', fps)
+            self.metrics.inc('scheduler_decisions', reason=reasons[0])
+            if device.temperature_c is not None:
+                self.metrics.set_gauge('device_temperature_celsius', device.temperature_c)
+
+    def stats(self, now: Optional[float] = None) -> dict:
+        now = self.clock() if now is None else now
+        minutes = (now - self.started) / 60
+        device = self.device.read(now)
+        return {
+            'fps': self.fps,
+            'reasons': self.reasons,
+            'latency_ms': self.latency * 1000 if self.latency else None,
+            'cpu_load': self.cpu.load,
+            'temperature_c': device.temperature_c,
+            'temperature_source': device.temperature_source,
+            'on_battery': device.on_battery,
+            'battery_percent': device.battery_percent,
+            'submitted': self.submitted,
+            'processed': self.processed,
+            'reads': self.reads,
+            'reads_per_minute': self.reads / minutes if minutes > 0 else 0.0,
+            'early_releases': self.early_releases,
+            'decisions': len(self.decisions),
+        }
@@ -9,7 +9,6 @@ import os
 import sys
 import time
 import json
-import re
 import csv
 import threading
 from pathlib import Path
@@ -37,7 +36,6 @@ try:
     from kivy.uix.popup import Popup
     from kivy.uix.spinner import Spinner
     from kivy.uix.switch import Switch
-    from kivy.uix.scrollview import ScrollView
     from kivy.uix.image import Image as KivyImage
     from kivy.uix.filechooser import FileChooserListView
     from kivy.clock import Clock
@@ -48,8 +46,23 @@ except ImportError as e:
     print(f"❌ Kivy não disponível: {e}")
     sys.exit(1)
 
+from key_store import KeyJournal
+from bloom_filter import BloomFilter, DuplicatePrefilter
+from access_key import is_valid_key
+from qr_payload import parse_qr_payload
+from qr_detection import QRDetector
+from camera_replay import open_capture
+from pipeline_metrics import metrics_from_env
+from adaptive_scheduler import AdaptiveScheduler
+from frame_pipeline import FramePipeline
+from shm_decoders import SharedFramePool, processes_from_env
+from preview_renderer import PreviewRenderer
+from keys_view import KeysRecycleView
+
 # Classe para dados das chaves
 class SavedKey:
+    __slots__ = ('key', 'timestamp')
+    
     def __init__(self, key: str, timestamp: float):
         self.key = key
         self.timestamp = timestamp
@@ -61,6 +74,11 @@ class SavedKey:
     def from_dict(cls, data):
         return cls(data["key"], data["timestamp"])
 
+def format_key_row(key: str, timestamp: float) -> str:
+    """Texto de uma linha da lista (formatado só quando a linha aparece)"""
+    time_display = datetime.fromtimestamp(timestamp).strftime('%H:%M')
+    return f"🔑 {key[:12]}...{key[-8:]} • {time_display}"
+
 class AndroidQRReaderApp(App):
     """Simulador completo do app Android com câmera real"""
     
@@ -70,14 +88,21 @@ class AndroidQRReaderApp(App):
         # Configurações
         self.saved_keys = []
         self.config_file = Path.home() / "android_qr_reader" / "chaves.json"
+        self.key_store = KeyJournal(self.config_file)
+        self.bloom_file = self.config_file.with_name(self.config_file.stem + ".bloom")
+        self.metrics_file = self.config_file.with_name(self.config_file.stem + ".metrics.json")
+        self.duplicate_filter = None
         
         # Estado da câmera
         self.camera_active = False
         self.camera_capture = None
-        self.camera_thread = None
-        self.camera_running = False
         self.last_qr_time = 0
         self.processed_qrs = set()
+        self.result_lock = threading.Lock()
+        self.detection_overlay = ([], 0.0)  # (retângulos, instante) da última detecção
+        self.preview = PreviewRenderer(Texture.create)  # Uma texture por resolução
+        self.metrics = metrics_from_env()  # Endpoint HTTP com NFCE_METRICS_PORT
+        self.qr_detector = QRDetector(pyzbar.decode, debug_log=self.log_detection, metrics=self.metrics)
         
         # Estatísticas
         self.stats = {
@@ -96,6 +121,20 @@ class AndroidQRReaderApp(App):
             'auto_save': True
         }
         
+        # Taxa de decodificação adaptativa; a captura segue no ritmo da câmera
+        self.scheduler = AdaptiveScheduler(cooldown=self.qr_config['cooldown_time'], metrics=self.metrics)
+        
+        # Decodificação em N processos via memória compartilhada (NFCAM_DECODE_PROCESSES=N)
+        decode_processes = processes_from_env()
+        self.decode_pool = SharedFramePool(decode_processes, metrics=self.metrics) if decode_processes else None
+        
+        # Captura, decodificação (pool) e exibição ligadas por ring buffers
+        self.frame_pipeline = FramePipeline(
+            self.capture_frame, self.make_frame_decoder, self.on_frame_decoded,
+            decode_workers=decode_processes or 2, should_decode=self.scheduler.due,
+            frame_interval=1 / 30, metrics=self.metrics
+        )
+        
     def build(self):
         """Constrói interface Android completa"""
         Logger.info("AndroidQR: Iniciando simulador Android completo...")
@@ -125,6 +164,7 @@ class AndroidQRReaderApp(App):
         
         # Carrega dados salvos
         self.load_saved_keys()
+        self.setup_duplicate_filter()
         self.update_display()
         
         # Inicia atualização automática
@@ -260,7 +300,7 @@ class AndroidQRReaderApp(App):
         search_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height='40dp', spacing=10)
         search_label = Label(text='🔍', size_hint_x=0.1, font_size='16sp')
         self.search_input = TextInput(
-            hint_text='Buscar chaves...',
+            hint_text='Buscar (dígitos, uf:SP, cnpj:..., mes:AAMM)',
             multiline=False,
             size_hint_x=0.9
         )
@@ -317,15 +357,13 @@ class AndroidQRReaderApp(App):
         keys_header.add_widget(self.keys_counter)
         keys_header.add_widget(clear_btn)
         
-        # ScrollView para lista
-        scroll = ScrollView()
-        self.keys_list_layout = BoxLayout(orientation='vertical', size_hint_y=None, spacing=5)
-        self.keys_list_layout.bind(minimum_height=self.keys_list_layout.setter('height'))
-        
-        scroll.add_widget(self.keys_list_layout)
+        # Lista virtualizada (todas as chaves, só as linhas visíveis viram widgets)
+        self.keys_view = KeysRecycleView(row_height='50dp', font_size='12sp', formatter=format_key_row)
+        self.keys_view.bind(on_key_action=lambda view, key: self.copy_key(key))
+        self.keys_view.bind(matched=lambda view, value: self.update_keys_counter())
         
         keys_frame.add_widget(keys_header)
-        keys_frame.add_widget(scroll)
+        keys_frame.add_widget(self.keys_view)
         
         return keys_frame
     
@@ -343,8 +381,8 @@ class AndroidQRReaderApp(App):
         Logger.info("AndroidQR: Iniciando câmera...")
         
         try:
-            # Abre câmera
-            self.camera_capture = cv2.VideoCapture(0)
+            # Abre câmera (ou sessão gravada, ver camera_replay.open_capture)
+            self.camera_capture = open_capture(0)
             
             if not self.camera_capture.isOpened():
                 self.show_toast("❌ Erro: Câmera não disponível", "error")
@@ -357,7 +395,7 @@ class AndroidQRReaderApp(App):
             
             # Estado
             self.camera_active = True
-            self.camera_running = True
+            self.scheduler.reset()
             
             # UI
             self.camera_btn.text = '📷 Parar Câmera'
@@ -365,9 +403,11 @@ class AndroidQRReaderApp(App):
             self.camera_status.text = '📹 Câmera Ativa - Procurando QR codes...'
             self.camera_status.color = (0.2, 0.8, 0.2, 1)
             
-            # Inicia thread da câmera
-            self.camera_thread = threading.Thread(target=self.camera_loop, daemon=True)
-            self.camera_thread.start()
+            # Inicia os estágios; a exibição puxa o frame mais recente a 30 FPS
+            if self.decode_pool is not None:
+                self.decode_pool.start()
+            self.frame_pipeline.start()
+            self.display_event = Clock.schedule_interval(self.display_tick, 1 / 30)
             
             Logger.info("AndroidQR: ✅ Câmera iniciada com sucesso")
             
@@ -379,9 +419,13 @@ class AndroidQRReaderApp(App):
         """Para captura da câmera"""
         Logger.info("AndroidQR: Parando câmera...")
         
-        self.camera_running = False
         self.camera_active = False
         
+        # Para os estágios antes de liberar a câmera
+        self.frame_pipeline.stop()
+        if hasattr(self, 'display_event'):
+            self.display_event.cancel()
+        
         # UI
         self.camera_btn.text = '📷 Iniciar Câmera'
         self.camera_btn.background_color = (0.2, 0.7, 0.3, 1)
@@ -395,64 +439,81 @@ class AndroidQRReaderApp(App):
         
         # Limpa display
         self.camera_display.texture = None
+        self.preview.reset()
         
         Logger.info("AndroidQR: Câmera parada")
     
-    def camera_loop(self):
-        """Loop principal da câmera (thread separada)"""
-        Logger.info("AndroidQR: Iniciando loop da câmera...")
-        
-        while self.camera_running and self.camera_capture:
+    # === ESTÁGIOS DO PIPELINE ===
+    
+    def capture_frame(self):
+        """Estágio de captura (thread própria): lê e espelha o frame"""
+        capture = self.camera_capture
+        if capture is None:
+            return None
+        with self.metrics.timer('acquisition'):
+            ret, frame = capture.read()
+        if not ret:
+            return None
+        self.metrics.inc('frames')
+        
+        # Espelha frame (câmera frontal)
+        with self.metrics.timer('color_conversion', conversion='flip'):
+            return cv2.flip(frame, 1)
+    
+    def make_frame_decoder(self):
+        """Função de decodificação de um worker do pool (detector próprio ou processo)"""
+        if self.decode_pool is not None:
+            # A thread só copia o frame para a memória compartilhada e espera o processo
+            detect = self.decode_pool.decode
+        else:
+            detect = QRDetector(pyzbar.decode, debug_log=self.log_detection, metrics=self.metrics).detect
+        
+        def decode(frame):
+            started = time.perf_counter()
+            candidate = self.scheduler.is_candidate(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+            if self.scheduler.in_cooldown():
+                # Em cooldown só acompanha a cena
+                self.scheduler.record(time.perf_counter() - started, candidate, decoded=False)
+                return None
             try:
-                # Captura frame
-                ret, frame = self.camera_capture.read()
-                if not ret:
-                    continue
-                
-                # Espelha frame (câmera frontal)
-                frame = cv2.flip(frame, 1)
-                
-                # Detecta QR codes
-                current_time = time.time()
-                if current_time - self.last_qr_time > self.qr_config['cooldown_time']:
-                    qr_codes = self.detect_qr_codes(frame)
-                    
-                    if qr_codes:
-                        self.last_qr_time = current_time
-                        self.process_qr_codes(qr_codes, frame)
-                
-                # Atualiza display (thread-safe via Clock)
-                Clock.schedule_once(lambda dt: self.update_camera_display(frame), 0)
-                
-                # Controle de FPS
-                time.sleep(1/30)  # 30 FPS
-                
+                qr_codes = detect(frame, self.qr_config['detection_mode'])
             except Exception as e:
-                Logger.error(f"AndroidQR: Erro no loop da câmera: {e}")
-                break
-        
-        Logger.info("AndroidQR: Loop da câmera finalizado")
+                if self.qr_config['debug_mode']:
+                    Logger.error(f"AndroidQR: Erro na detecção: {e}")
+                qr_codes = []
+            self.scheduler.record(time.perf_counter() - started, candidate, found=bool(qr_codes))
+            return qr_codes or None
+        
+        return decode
+    
+    def on_frame_decoded(self, frame, qr_codes):
+        """Resultado de um worker: aplica o cooldown e processa os QR codes"""
+        with self.result_lock:
+            if self.scheduler.in_cooldown():
+                return  # Outro worker já leu este cupom
+            self.last_qr_time = time.time()
+            self.scheduler.record_read()
+            self.process_qr_codes(qr_codes, frame)
+    
+    def display_tick(self, dt):
+        """Estágio de exibição (thread principal): só o frame mais recente"""
+        if self.preview.should_render(dt, 1 / 30):
+            self.frame_pipeline.display(self.update_camera_display)
     
     def update_camera_display(self, frame):
         """Atualiza display da câmera (thread principal)"""
         try:
-            # Redimensiona frame
-            height, width = frame.shape[:2]
-            display_height = 240
-            display_width = int(width * display_height / height)
-            
-            resized_frame = cv2.resize(frame, (display_width, display_height))
-            
-            # Converte BGR para RGB
-            rgb_frame = cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
-            
-            # Cria texture
-            texture = Texture.create(size=(display_width, display_height))
-            texture.blit_buffer(rgb_frame.flatten(), colorfmt='rgb', bufferfmt='ubyte')
-            texture.flip_vertical()
+            # Destaca a última detecção por 1 s
+            rects, detected_at = self.detection_overlay
+            if time.time() - detected_at >= 1.0:
+                rects = ()
             
-            # Atualiza display
-            self.camera_display.texture = texture
+            # Mesma texture enquanto a resolução não muda (só a referência é trocada na 1ª vez)
+            texture = self.preview.render(frame, rects)
+            if self.camera_display.texture is not texture:
+                self.camera_display.texture = texture
+            else:
+                self.camera_display.canvas.ask_update()
             
         except Exception as e:
             Logger.error(f"AndroidQR: Erro ao atualizar display: {e}")
@@ -462,84 +523,21 @@ class AndroidQRReaderApp(App):
     def detect_qr_codes(self, frame):
         """Detecta QR codes no frame"""
         try:
-            mode = self.qr_config['detection_mode']
-            
-            if mode == 'simple':
-                return pyzbar.decode(frame)
-            elif mode == 'enhanced':
-                return self.enhanced_detection(frame)
-            elif mode == 'aggressive':
-                return self.aggressive_detection(frame)
-            else:
-                return pyzbar.decode(frame)
+            return self.qr_detector.detect(frame, self.qr_config['detection_mode'])
         
         except Exception as e:
             if self.qr_config['debug_mode']:
                 Logger.error(f"AndroidQR: Erro na detecção: {e}")
             return []
     
-    def enhanced_detection(self, frame):
-        """Detecção melhorada"""
-        qr_codes = []
-        
-        # Detecção direta
-        direct_codes = pyzbar.decode(frame)
-        qr_codes.extend(direct_codes)
-        
-        if qr_codes:
-            return qr_codes
-        
-        # Pré-processamento
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Técnicas de melhoria
-        techniques = [
-            cv2.equalizeHist(gray),
-            cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2),
-            cv2.bilateralFilter(gray, 9, 75, 75)
-        ]
-        
-        for processed in techniques:
-            codes = pyzbar.decode(processed)
-            if codes:
-                qr_codes.extend(codes)
-                break
-        
-        return qr_codes
-    
-    def aggressive_detection(self, frame):
-        """Detecção agressiva"""
-        qr_codes = self.enhanced_detection(frame)
-        if qr_codes:
-            return qr_codes
-        
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Múltiplas escalas
-        for scale in [0.8, 1.2, 1.5]:
-            height, width = gray.shape
-            new_size = (int(width * scale), int(height * scale))
-            scaled = cv2.resize(gray, new_size)
-            codes = pyzbar.decode(scaled)
-            if codes:
-                qr_codes.extend(codes)
-                break
-        
-        # Rotações
-        if not qr_codes:
-            center = (gray.shape[1] // 2, gray.shape[0] // 2)
-            for angle in [-10, 10, -15, 15]:
-                M = cv2.getRotationMatrix2D(center, angle, 1.0)
-                rotated = cv2.warpAffine(gray, M, (gray.shape[1], gray.shape[0]))
-                codes = pyzbar.decode(rotated)
-                if codes:
-                    qr_codes.extend(codes)
-                    break
-        
-        return qr_codes
+    def log_detection(self, message: str):
+        """Log das estratégias de detecção (somente em modo debug)"""
+        if self.qr_config['debug_mode']:
+            Logger.info(f"AndroidQR: {message}")
     
     def process_qr_codes(self, qr_codes, frame):
         """Processa QR codes detectados"""
+        rects = []
         for qr_code in qr_codes:
             try:
                 # Decodifica dados
@@ -554,59 +552,73 @@ class AndroidQRReaderApp(App):
                 
                 Logger.info(f"AndroidQR: QR detectado: {qr_data[:50]}...")
                 
-                # Desenha retângulo no frame
-                rect = qr_code.rect
-                cv2.rectangle(frame, 
-                            (rect.left, rect.top),
-                            (rect.left + rect.width, rect.top + rect.height),
-                            (0, 255, 0), 3)
-                
-                cv2.putText(frame, "QR DETECTADO", 
-                          (rect.left, rect.top - 10),
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                # Retângulo exibido sobre os próximos frames (o frame é compartilhado com a exibição)
+                rects.append(qr_code.rect)
                 
                 # Processa dados
-                Clock.schedule_once(lambda dt: self.handle_qr_result(qr_data), 0)
+                Clock.schedule_once(lambda dt, data=qr_data: self.handle_qr_result(data), 0)
                 
             except UnicodeDecodeError:
                 self.stats['invalid_qrs'] += 1
                 continue
+        
+        if rects:
+            self.detection_overlay = (rects, time.time())
     
     def handle_qr_result(self, qr_data):
         """Processa resultado do QR (thread principal)"""
         # Extrai chave fiscal
-        match = re.search(r'p=([0-9]{44})', qr_data)
+        with self.metrics.timer('key_extraction'):
+            payload = parse_qr_payload(qr_data)
         
-        if not match:
+        if not payload:
             self.stats['invalid_qrs'] += 1
+            self.metrics.inc('keys', result='no_key')
             self.show_toast("⚠️ QR detectado mas não é cupom fiscal", "warning")
             return
         
-        key = match.group(1)
+        key = payload.key
         
         # Valida chave
-        if not self.validate_fiscal_key(key):
+        with self.metrics.timer('validation'):
+            valid = self.validate_fiscal_key(key)
+        if not valid:
             self.stats['invalid_qrs'] += 1
+            self.metrics.inc('keys', result='invalid')
             self.show_toast("❌ Chave fiscal inválida", "error")
             return
         
-        # Verifica duplicata
-        if any(item.key == key for item in self.saved_keys):
+        # Verifica duplicata (Bloom; varredura exata só em possível repetição)
+        with self.metrics.timer('duplicate_check'):
+            is_duplicate = self.duplicate_filter.is_duplicate(key)
+        if self.qr_config['debug_mode']:
+            dup_stats = self.duplicate_filter.stats()
+            Logger.info(f"AndroidQR: Duplicatas - {dup_stats['avg_lookup_us']:.1f}µs médio, "
+                        f"FP observado {dup_stats['observed_fp_rate']:.2%} "
+                        f"(teórico {dup_stats['expected_fp_rate']:.2%})")
+        if is_duplicate:
             self.stats['duplicates'] += 1
+            self.metrics.inc('keys', result='duplicate')
             self.show_toast("⚠️ Este cupom já foi lido", "warning")
             return
         
         # Salva chave
         new_key = SavedKey(key, time.time())
         self.saved_keys.insert(0, new_key)
+        self.duplicate_filter.add(key)
+        if self.duplicate_filter.bloom.is_saturated:
+            self.setup_duplicate_filter()
         
         self.stats['valid_keys'] += 1
+        self.metrics.inc('keys', result='saved')
         
-        # Salva e atualiza
+        # Salva e atualiza (uma linha no journal)
         if self.qr_config['auto_save']:
-            self.save_keys_to_file()
+            with self.metrics.timer('persistence'):
+                self.record_key_added(new_key)
         
-        self.update_display()
+        self.update_keys_counter()
+        self.keys_view.add_key(new_key)
         
         # Feedback
         self.show_toast(f"✅ Cupom #{len(self.saved_keys)} salvo!", "success")
@@ -616,109 +628,75 @@ class AndroidQRReaderApp(App):
     
     def validate_fiscal_key(self, key: str) -> bool:
         """Valida chave fiscal usando algoritmo DV"""
-        if len(key) != 44 or not key.isdigit():
-            return False
-        
-        try:
-            weights = [2, 3, 4, 5, 6, 7, 8, 9] * 5 + [2, 3, 4]
-            total = sum(int(digit) * weight for digit, weight in zip(key[:43], weights))
-            
-            remainder = total % 11
-            expected_dv = 0 if remainder < 2 else 11 - remainder
-            
-            return int(key[43]) == expected_dv
-        
-        except Exception:
-            return False
+        return is_valid_key(key)
     
     # === DATA MANAGEMENT ===
     
     def load_saved_keys(self):
-        """Carrega chaves salvas"""
+        """Carrega chaves salvas (snapshot + journal)"""
         try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.saved_keys = [SavedKey.from_dict(item) for item in data]
-                    
+            data = self.key_store.load()
+            self.saved_keys = [SavedKey.from_dict(item) for item in data]
+            
+            if self.saved_keys:
                 Logger.info(f"AndroidQR: {len(self.saved_keys)} chaves carregadas")
-            else:
-                self.saved_keys = []
         
         except Exception as e:
             Logger.error(f"AndroidQR: Erro ao carregar: {e}")
             self.saved_keys = []
     
-    def save_keys_to_file(self):
-        """Salva chaves no arquivo"""
+    def setup_duplicate_filter(self):
+        """Carrega o filtro de Bloom salvo ou o reconstrói a partir das chaves"""
+        count = len(self.saved_keys)
+        bloom = BloomFilter.load(self.bloom_file)
+        if bloom is None or bloom.count != count or bloom.is_saturated:
+            bloom = BloomFilter.from_keys((item.key for item in self.saved_keys), count)
+            self.save_duplicate_filter(bloom)
+        
+        self.duplicate_filter = DuplicatePrefilter(
+            bloom, lambda key: any(item.key == key for item in self.saved_keys)
+        )
+    
+    def save_duplicate_filter(self, bloom=None):
+        """Persiste o filtro de Bloom ao lado do armazenamento"""
+        try:
+            self.bloom_file.parent.mkdir(parents=True, exist_ok=True)
+            (bloom or self.duplicate_filter.bloom).save(self.bloom_file)
+        except Exception as e:
+            Logger.error(f"AndroidQR: Erro ao salvar filtro: {e}")
+    
+    def record_key_added(self, key_obj: SavedKey):
+        """Grava a nova chave no journal e compacta em background quando necessário"""
         try:
-            self.config_file.parent.mkdir(parents=True, exist_ok=True)
+            self.key_store.append_add(key_obj.key, key_obj.timestamp)
             
-            data = [key.to_dict() for key in self.saved_keys]
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            if self.key_store.needs_compaction:
+                self.key_store.compact_async([key.to_dict() for key in self.saved_keys])
                 
         except Exception as e:
             Logger.error(f"AndroidQR: Erro ao salvar: {e}")
     
-    def update_display(self):
-        """Atualiza displays"""
-        # Contador de chaves
+    def save_keys_to_file(self):
+        """Grava snapshot completo (compactação síncrona)"""
+        try:
+            self.key_store.compact([key.to_dict() for key in self.saved_keys])
+                
+        except Exception as e:
+            Logger.error(f"AndroidQR: Erro ao salvar: {e}")
+    
+    def update_keys_counter(self):
+        """Atualiza contador de chaves"""
         count = len(self.saved_keys)
-        self.keys_counter.text = f'📋 {count} chaves'
-        
-        # Lista de chaves
-        self.keys_list_layout.clear_widgets()
-        
-        # Filtra por busca
-        search_text = ""
-        if hasattr(self, 'search_input'):
-            search_text = self.search_input.text.lower()
-        
-        filtered_keys = [
-            key for key in self.saved_keys
-            if search_text in key.key.lower()
-        ]
-        
-        # Mostra últimas 20
-        for key_obj in filtered_keys[:20]:
-            key_item = self.create_key_item(key_obj)
-            self.keys_list_layout.add_widget(key_item)
-    
-    def create_key_item(self, key_obj: SavedKey):
-        """Cria item da lista de chaves"""
-        item_layout = BoxLayout(
-            orientation='horizontal',
-            size_hint_y=None,
-            height='50dp',
-            spacing=10,
-            padding=[5, 0]
-        )
-        
-        # Info da chave
-        key_display = f"{key_obj.key[:12]}...{key_obj.key[-8:]}"
-        time_display = datetime.fromtimestamp(key_obj.timestamp).strftime('%H:%M')
-        
-        info_label = Label(
-            text=f"🔑 {key_display} • {time_display}",
-            font_size='12sp',
-            size_hint_x=0.8,
-            halign='left'
-        )
-        info_label.bind(size=info_label.setter('text_size'))
-        
-        # Botão copiar
-        copy_btn = Button(
-            text='📋',
-            size_hint_x=0.2,
-            font_size='16sp'
-        )
-        copy_btn.bind(on_press=lambda x: self.copy_key(key_obj.key))
-        
-        item_layout.add_widget(info_label)
-        item_layout.add_widget(copy_btn)
-        
-        return item_layout
+        if self.keys_view.query.strip():
+            self.keys_counter.text = f'📋 {self.keys_view.matched} de {count} chaves'
+        else:
+            self.keys_counter.text = f'📋 {count} chaves'
+    
+    def update_display(self):
+        """Recarrega contador e lista (carga, limpeza)"""
+        self.update_keys_counter()
+        search_text = self.search_input.text if hasattr(self, 'search_input') else ''
+        self.keys_view.set_keys(self.saved_keys, search_text)
     
     def update_stats(self, dt):
         """Atualiza estatísticas"""
@@ -731,6 +709,15 @@ class AndroidQRReaderApp(App):
         self.stats_labels['dupes'].text = f"⚠️ {self.stats['duplicates']}"
         self.stats_labels['errors'].text = f"❌ {self.stats['invalid_qrs']}"
         self.stats_labels['time'].text = f"⏱️ {minutes:02d}:{seconds:02d}"
+        
+        # Vazão e descartes por estágio do pipeline
+        if self.camera_active:
+            stages = self.frame_pipeline.stats()
+            self.camera_status.text = (
+                f"📹 Captura {stages['capture']['fps']:.0f} FPS | "
+                f"Decod. {stages['decode']['fps']:.0f} FPS ({stages['decode']['dropped']} desc.) | "
+                f"Tela {stages['display']['fps']:.0f} FPS ({stages['display']['dropped']} desc.)"
+            )
     
     # === CALLBACKS ===
     
@@ -749,8 +736,8 @@ class AndroidQRReaderApp(App):
         self.qr_config['debug_mode'] = value
     
     def on_search_change(self, instance, value):
-        """Mudança na busca"""
-        self.update_display()
+        """Mudança na busca (filtra quando a digitação para)"""
+        self.keys_view.filter_later(value)
     
     def simulate_gallery(self, instance):
         """Simula galeria Android"""
@@ -792,7 +779,9 @@ class AndroidQRReaderApp(App):
         
         # Confirmação rápida
         self.saved_keys.clear()
+        self.key_store.append_clear()
         self.save_keys_to_file()
+        self.setup_duplicate_filter()
         self.update_display()
         self.show_toast(f"🗑️ {len(self.saved_keys)} chaves removidas", "success")
     
@@ -826,6 +815,14 @@ class AndroidQRReaderApp(App):
         """Cleanup ao fechar"""
         if self.camera_active:
             self.stop_camera()
+        if self.decode_pool is not None:
+            self.decode_pool.close()
+        self.key_store.wait_compaction(timeout=5)
+        self.save_duplicate_filter()
+        try:
+            self.metrics.write_json(self.metrics_file)
+        except Exception as e:
+            Logger.error(f"AndroidQR: Erro ao gravar métricas: {e}")
 
 def main():
     """Função principal"""
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🌸 FILTRO DE BLOOM - Pré-filtro de duplicatas para o scan ao vivo
+
+Responde "com certeza nova" em O(k) sem percorrer as chaves salvas; só
+quando o filtro indica uma possível repetição a checagem exata é feita.
+O filtro é gravado ao lado do armazenamento (`<arquivo>.bloom`) e
+reconstruído na abertura se estiver desatualizado.
+"""
+
+import math
+import time
+import struct
+import hashlib
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+MAGIC = b'NFBF'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQQd')    # magic, versão, k, bits, itens, taxa alvo
+
+
+class BloomFilter:
+    """Filtro de Bloom com hashing duplo (blake2b de 128 bits)"""
+
+    def __init__(self, capacity: int = 10_000, fp_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[str], count: int, fp_rate: float = 0.001) -> 'BloomFilter':
+        """Constrói com folga de 2x para as próximas leituras"""
+        bloom = cls(capacity=max(count * 2, 10_000), fp_rate=fp_rate)
+        for key in keys:
+            bloom.add(key)
+        return bloom
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('ascii'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def is_saturated(self) -> bool:
+        """Mais itens que a capacidade: a taxa de falso positivo passa do alvo"""
+        return self.count > self.capacity
+
+    @property
+    def expected_fp_rate(self) -> float:
+        """Taxa teórica de falso positivo para a ocupação atual"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    # === PERSISTÊNCIA ===
+
+    def save(self, path):
+        path = Path(path)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.num_hashes, self.num_bits, self.count, self.fp_rate))
+            f.write(self.bits)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path) -> Optional['BloomFilter']:
+        path = Path(path)
+        if not path.exists():
+            return None
+
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                return None
+            magic, version, num_hashes, num_bits, count, fp_rate = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                return None
+            bits = bytearray(f.read())
+
+        if len(bits) != (num_bits + 7) // 8:
+            return None
+
+        bloom = cls.__new__(cls)
+        bloom.num_hashes = num_hashes
+        bloom.num_bits = num_bits
+        bloom.fp_rate = fp_rate
+        bloom.capacity = max(1, int(-num_bits * (math.log(2) ** 2) / math.log(fp_rate)))
+        bloom.bits = bits
+        bloom.count = count
+        return bloom
+
+
+class DuplicatePrefilter:
+    """
+    Bloom na frente de uma checagem exata de duplicatas, com estatísticas
+
+    `exact_check(key)` só é chamado quando o filtro indica possível repetição.
+    """
+
+    def __init__(self, bloom: BloomFilter, exact_check: Callable[[str], bool]):
+        self.bloom = bloom
+        self.exact_check = exact_check
+        self.lookups = 0
+        self.definitely_new = 0
+        self.possible_hits = 0
+        self.false_positives = 0
+        self.lookup_time = 0.0
+
+    def is_duplicate(self, key: str) -> bool:
+        started = time.perf_counter()
+        self.lookups += 1
+
+        if key not in self.bloom:
+            self.definitely_new += 1
+            self.lookup_time += time.perf_counter() - started
+            return False
+
+        self.possible_hits += 1
+        duplicate = self.exact_check(key)
+        if not duplicate:
+            self.false_positives += 1
+        self.lookup_time += time.perf_counter() - started
+        return duplicate
+
+    def add(self, key: str):
+        self.bloom.add(key)
+
+    def stats(self) -> dict:
+        """Taxa de falso positivo observada/teórica e latência média das consultas"""
+        negatives = self.definitely_new + self.false_positives
+        return {
+            'lookups': self.lookups,
+            'definitely_new': self.definitely_new,
+            'possible_hits': self.possible_hits,
+            'false_positives': self.false_positives,
+            'observed_fp_rate': self.false_positives / negatives if negatives else 0.0,
+            'expected_fp_rate': self.bloom.expected_fp_rate,
+            'avg_lookup_us': self.lookup_time / self.lookups * 1e6 if self.lookups else 0.0,
+            'items': self.bloom.count,
+            'size_kb': len(self.bloom.bits) / 1024,
+        }
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🎞️ GRAVAÇÃO E REPRODUÇÃO DE CÂMERA - Sessões reais para perfilar os caminhos ao vivo
+
+Formato `.nfcam` (um arquivo por sessão):
+    b'NFCAM' | versão (u8) | tamanho do cabeçalho JSON (u32) | cabeçalho JSON
+    registros: instante relativo em s (f64) | tamanho (u32) | frame codificado
+
+Os frames são gravados em JPEG (padrão), PNG (sem perdas) ou BGR cru. Na
+reprodução, as fontes falsas imitam o que cada app consome:
+    ReplayCapture     → cv2.VideoCapture (simulador, test_camera_real)
+    ReplayVideoFrame  → frame do streamlit-webrtc (QRReader.transform)
+    ReplayCamera      → kivy.uix.camera.Camera (.texture com .pixels RGBA)
+
+Variáveis de ambiente usadas por `open_capture`:
+    NFCAM_REPLAY=sessao.nfcam   reproduz a sessão no lugar da câmera
+    NFCAM_RECORD=sessao.nfcam   grava a sessão enquanto usa a câmera real
+    NFCAM_MAX_RATE=1            reproduz sem esperar os intervalos originais
+    NFCAM_HEADLESS=1            test_camera_real sem janela nem input() (CI)
+    NFCAM_DECODE_PROCESSES=4    simulador e test_camera_real decodificam em 4 processos
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+MAGIC = b'NFCAM'
+VERSION = 1
+PREFIX = struct.Struct('<5sBI')
+RECORD = struct.Struct('<dI')
+CODECS = ('jpg', 'png', 'raw')
+
+
+# === GRAVAÇÃO ===
+
+class SessionRecorder:
+    """Grava frames BGR em um arquivo .nfcam"""
+
+    def __init__(self, path, codec: str = 'jpg', quality: int = 90, source: str = ''):
+        if codec not in CODECS:
+            raise ValueError(f"Codec desconhecido: {codec}")
+        self.path = Path(path)
+        self.codec = codec
+        self.quality = quality
+        self.source = source
+        self.frame_count = 0
+        self._file = None
+        self._started = None
+
+    def _open(self, frame):
+        height, width = frame.shape[:2]
+        header = json.dumps({
+            'codec': self.codec,
+            'width': width,
+            'height': height,
+            'channels': frame.shape[2] if frame.ndim == 3 else 1,
+            'source': self.source,
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }).encode('utf-8')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._file.write(PREFIX.pack(MAGIC, VERSION, len(header)))
+        self._file.write(header)
+
+    def _encode(self, frame) -> bytes:
+        if self.codec == 'raw':
+            return np.ascontiguousarray(frame).tobytes()
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality] if self.codec == 'jpg' else []
+        ok, encoded = cv2.imencode('.' + self.codec, frame, params)
+        if not ok:
+            raise ValueError("Falha ao codificar frame")
+        return encoded.tobytes()
+
+    def write(self, frame, timestamp: Optional[float] = None):
+        """Grava um frame; `timestamp` relativo ao início (padrão: relógio atual)"""
+        now = time.perf_counter()
+        if self._file is None:
+            self._open(frame)
+            self._started = now
+        if timestamp is None:
+            timestamp = now - self._started
+
+        data = self._encode(frame)
+        self._file.write(RECORD.pack(timestamp, len(data)))
+        self._file.write(data)
+        self.frame_count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordingCapture:
+    """Envolve um cv2.VideoCapture gravando cada frame lido"""
+
+    def __init__(self, capture, path, **recorder_options):
+        self.capture = capture
+        self.recorder = SessionRecorder(path, **recorder_options)
+
+    def read(self):
+        ok, frame = self.capture.read()
+        if ok:
+            self.recorder.write(frame)
+        return ok, frame
+
+    def release(self):
+        self.recorder.close()
+        self.capture.release()
+
+    def __getattr__(self, name):
+        # isOpened, set, get... seguem para a câmera real
+        return getattr(self.capture, name)
+
+
+# === LEITURA ===
+
+class SessionReader:
+    """Lê o cabeçalho e os frames de um arquivo .nfcam"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            prefix = f.read(PREFIX.size)
+            if len(prefix) < PREFIX.size:
+                raise ValueError(f"Sessão de câmera inválida: {self.path}")
+            magic, version, header_size = PREFIX.unpack(prefix)
+            header = f.read(header_size)
+            if magic != MAGIC or version != VERSION or len(header) < header_size:
+                raise ValueError(f"Sessão de câmera inválida: {self.path}")
+            self.header = json.loads(header.decode('utf-8'))
+            self._data_offset = f.tell()
+
+        self.width = self.header['width']
+        self.height = self.header['height']
+        records = list(self._index())
+        self.timestamps = [timestamp for timestamp, _, _ in records]
+        self._records = [(offset, size) for _, offset, size in records]
+
+    def _index(self) -> Iterator[Tuple[float, int, int]]:
+        """(instante, posição, tamanho) de cada registro, sem decodificar"""
+        with open(self.path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            f.seek(self._data_offset)
+            while True:
+                raw = f.read(RECORD.size)
+                if len(raw) < RECORD.size:
+                    return
+                timestamp, size = RECORD.unpack(raw)
+                offset = f.tell()
+                if offset + size > file_size:
+                    return  # Registro cortado (gravação interrompida): fim da sessão
+                f.seek(size, os.SEEK_CUR)
+                yield timestamp, offset, size
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def duration(self) -> float:
+        return self.timestamps[-1] if self.timestamps else 0.0
+
+    @property
+    def fps(self) -> float:
+        return (len(self) - 1) / self.duration if self.duration else 0.0
+
+    def _decode(self, data: bytes):
+        if self.header['codec'] == 'raw':
+            shape = (self.height, self.width, self.header['channels'])
+            if len(data) != self.height * self.width * self.header['channels']:
+                return None
+            return np.frombuffer(data, dtype=np.uint8).reshape(shape).squeeze()
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+
+    def frame(self, index: int):
+        """Decodifica só o frame `index` (acesso direto, sem ler a sessão inteira)"""
+        offset, size = self._records[index]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return self._decode(f.read(size))
+
+    def frames(self) -> Iterator[Tuple[float, 'np.ndarray']]:
+        """(instante, frame BGR) em ordem; um registro ilegível encerra a sessão"""
+        with open(self.path, 'rb') as f:
+            for timestamp, offset, size in self._index():
+                f.seek(offset)
+                frame = self._decode(f.read(size))
+                if frame is None:
+                    return
+                yield timestamp, frame
+
+    def load(self):
+        """Todos os frames decodificados em memória (benchmarks sem custo de decodificação)"""
+        return [frame for _, frame in self.frames()]
+
+
+# === REPRODUÇÃO ===
+
+class ReplayCapture:
+    """
+    Substituto de cv2.VideoCapture que reproduz uma sessão gravada
+
+    `realtime=True` respeita os intervalos originais; `False` entrega os
+    frames o mais rápido possível (perfilamento).
+    """
+
+    def __init__(self, path, realtime: bool = True, loop: bool = False, preload: bool = False):
+        self.session = SessionReader(path)
+        self.realtime = realtime
+        self.loop = loop
+        self._frames = self.session.load() if preload else None
+        self._iterator = None
+        self._index = 0
+        self._started = None
+        self._opened = True
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def _next(self):
+        if self._frames is not None:
+            if self._index >= len(self._frames):
+                return None
+            frame = self._frames[self._index]
+            return self.session.timestamps[self._index], frame
+
+        if self._iterator is None:
+            self._iterator = self.session.frames()
+        return next(self._iterator, None)
+
+    def read(self):
+        if not self._opened:
+            return False, None
+
+        item = self._next()
+        if item is not None and item[1] is None:
+            item = None  # Frame que não decodifica: trata como fim da sessão
+        if item is None and self.loop and len(self.session):
+            self._iterator = None
+            self._index = 0
+            self._started = None
+            item = self._next()
+        if item is None:
+            return False, None
+
+        timestamp, frame = item
+        self._index += 1
+        if self.realtime:
+            if self._started is None:
+                self._started = time.perf_counter() - timestamp
+            delay = self._started + timestamp - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return True, frame.copy() if self._frames is not None else frame
+
+    def set(self, prop, value) -> bool:
+        # Resolução e FPS são os da gravação
+        return False
+
+    def get(self, prop) -> float:
+        values = {
+            cv2.CAP_PROP_FRAME_WIDTH: self.session.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: self.session.height,
+            cv2.CAP_PROP_FPS: self.session.fps,
+            cv2.CAP_PROP_FRAME_COUNT: len(self.session),
+            cv2.CAP_PROP_POS_FRAMES: self._index,
+        }
+        return float(values.get(prop, 0.0))
+
+    def release(self):
+        self._opened = False
+        self._iterator = None
+
+
+class ReplayVideoFrame:
+    """Imita o av.VideoFrame entregue pelo streamlit-webrtc ao transform()"""
+
+    def __init__(self, frame, timestamp: float = 0.0):
+        self._frame = frame
+        self.time = timestamp
+        self.height, self.width = frame.shape[:2]
+
+    def to_ndarray(self, format: str = 'bgr24'):
+        if format == 'bgr24':
+            return self._frame.copy()
+        if format == 'rgb24':
+            return cv2.cvtColor(self._frame, cv2.COLOR_BGR2RGB)
+        if format == 'gray':
+            return cv2.cvtColor(self._frame, cv2.COLOR_BGR2GRAY)
+        raise ValueError(f"Formato não suportado: {format}")
+
+
+def replay_webrtc_frames(path) -> Iterator[ReplayVideoFrame]:
+    """Frames da sessão no formato do streamlit-webrtc (taxa máxima)"""
+    for timestamp, frame in SessionReader(path).frames():
+        yield ReplayVideoFrame(frame, timestamp)
+
+
+class ReplayTexture:
+    """Imita a texture da câmera Kivy (.pixels RGBA e .size)"""
+
+    def __init__(self, frame):
+        self.size = (frame.shape[1], frame.shape[0])
+        self.pixels = cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA).tobytes()
+
+
+class ReplayCamera:
+    """
+    Substituto do kivy.uix.camera.Camera para o QRReaderApp
+
+    `.texture` devolve o frame correspondente ao tempo decorrido desde o
+    play, como a câmera real; em `realtime=False` avança um frame a cada
+    chamada de `advance()`. Os frames são decodificados sob demanda: só o
+    atual fica em memória.
+    """
+
+    def __init__(self, path, realtime: bool = True, loop: bool = True):
+        self.session = SessionReader(path)
+        self.realtime = realtime
+        self.loop = loop
+        self._play = False
+        self._started = None
+        self._index = 0
+        self._decoded = (None, None)    # (índice, frame BGR) do último decodificado
+        self._texture = (None, None)    # (índice, ReplayTexture) da última entregue
+
+    @property
+    def play(self) -> bool:
+        return self._play
+
+    @play.setter
+    def play(self, value: bool):
+        self._play = value
+        self._started = time.perf_counter() if value else None
+
+    def advance(self):
+        self._index += 1
+
+    def _current_index(self) -> Optional[int]:
+        count = len(self.session)
+        if not count:
+            return None
+        if self.realtime and self._started is not None:
+            elapsed = time.perf_counter() - self._started
+            if self.loop and self.session.duration:
+                elapsed %= self.session.duration
+            index = bisect_right(self.session.timestamps, elapsed) - 1
+        else:
+            index = self._index % count if self.loop else self._index
+        return index if 0 <= index < count else None
+
+    def frame(self, index: int):
+        """Frame BGR `index` (None se o registro não decodifica)"""
+        cached_index, frame = self._decoded
+        if cached_index != index:
+            frame = self.session.frame(index)
+            self._decoded = (index, frame)
+        return frame
+
+    @property
+    def texture(self) -> Optional[ReplayTexture]:
+        if not self._play:
+            return None
+        index = self._current_index()
+        if index is None:
+            return None
+        # A UI lê a texture a cada quadro da tela: converte uma vez por frame da sessão
+        cached_index, texture = self._texture
+        if cached_index != index:
+            frame = self.frame(index)
+            texture = ReplayTexture(frame) if frame is not None else None
+            self._texture = (index, texture)
+        return texture
+
+
+def open_capture(index: int = 0):
+    """
+    Câmera para os caminhos ao vivo, respeitando NFCAM_REPLAY / NFCAM_RECORD
+
+    Sem variáveis de ambiente é o mesmo que cv2.VideoCapture(index).
+    """
+    replay = os.environ.get('NFCAM_REPLAY')
+    if replay:
+        return ReplayCapture(replay, realtime=not os.environ.get('NFCAM_MAX_RATE'))
+
+    capture = cv2.VideoCapture(index)
+    record = os.environ.get('NFCAM_RECORD')
+    if record:
+        return RecordingCapture(capture, record, source=f'camera:{index}')
+    return capture
+
+
+# === LINHA DE COMANDO ===
+
+def record_from_camera(path, camera: int, seconds: float, codec: str, quality: int, width: int, height: int):
+    capture = cv2.VideoCapture(camera)
+    if not capture.isOpened():
+        raise RuntimeError(f"Câmera {camera} não disponível")
+    capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    started = time.perf_counter()
+    with SessionRecorder(path, codec, quality, source=f'camera:{camera}') as recorder:
+        try:
+            while time.perf_counter() - started < seconds:
+                ok, frame = capture.read()
+                if ok:
+                    recorder.write(frame)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            capture.release()
+    return recorder.frame_count
+
+
+def main():
+    """Grava sessões da câmera e mostra informações de sessões gravadas"""
+    parser = argparse.ArgumentParser(description='Gravação/reprodução de sessões de câmera (.nfcam)')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    gravar = sub.add_parser('gravar', help='Grava uma sessão da câmera')
+    gravar.add_argument('arquivo')
+    gravar.add_argument('--camera', type=int, default=0)
+    gravar.add_argument('--segundos', type=float, default=30)
+    gravar.add_argument('--codec', choices=CODECS, default='jpg')
+    gravar.add_argument('--qualidade', type=int, default=90)
+    gravar.add_argument('--largura', type=int, default=640)
+    gravar.add_argument('--altura', type=int, default=480)
+
+    info = sub.add_parser('info', help='Mostra resolução, duração e FPS de uma sessão')
+    info.add_argument('arquivo')
+    args = parser.parse_args()
+
+    if args.comando == 'gravar':
+        count = record_from_camera(args.arquivo, args.camera, args.segundos, args.codec,
+                                   args.qualidade, args.largura, args.altura)
+        print(f"✅ {count} frames gravados em {args.arquivo}")
+    else:
+        session = SessionReader(args.arquivo)
+        size_mb = session.path.stat().st_size / (1024 * 1024)
+        print(f"📹 {session.path.name}: {session.width}x{session.height}, {len(session)} frames, "
+              f"{session.duration:.1f} s, {session.fps:.1f} FPS, {session.header['codec']}, {size_mb:.1f} MB")
+        if session.header.get('source'):
+            print(f"   origem: {session.header['source']} ({session.header.get('created', '')})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧵 DECODIFICAÇÃO FORA DA THREAD DA UI - Worker alimentado só com o frame mais recente
+
+A thread da interface entrega os pixels crus com `submit()` e volta a
+desenhar; o worker converte e decodifica em segundo plano. Há um único slot
+pendente: se a decodificação estiver ocupada, o frame anterior ainda não
+processado é descartado (contado em `dropped`) e substituído pelo novo, de
+modo que a latência nunca acumula. O resultado volta pelo callback
+`on_result`, que no Kivy deve reagendar na thread principal
+(Clock.schedule_once).
+
+Thread e não processo: OpenCV e pyzbar liberam o GIL durante o trabalho
+pesado, e um processo exigiria copiar cada frame entre processos.
+
+`JankMeter` mede o intervalo entre frames da UI para verificar que a
+interface não trava durante as tentativas agressivas.
+"""
+
+import time
+import threading
+from typing import Any, Callable, Optional
+
+
+class LatestFrameWorker:
+    """Thread de decodificação com um único slot (sempre o frame mais recente)"""
+
+    def __init__(self, process: Callable[[Any], Any], on_result: Callable[[Any], None],
+                 name: str = 'decode-worker'):
+        self.process = process
+        self.on_result = on_result
+        self.name = name
+        self._condition = threading.Condition()
+        self._pending = None
+        self._has_pending = False
+        self._running = False
+        self._generation = 0
+        self._thread = None
+        self.busy = False
+
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._generation += 1
+            generation = self._generation
+        self._thread = threading.Thread(target=self._loop, args=(generation,), name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 2.0):
+        """
+        Para o worker; o frame pendente é descartado
+
+        Com `timeout=0` não espera a decodificação em andamento (a thread da
+        UI não bloqueia); o resultado dela é ignorado.
+        """
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._has_pending = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            if timeout != 0:
+                self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, item) -> bool:
+        """Entrega um frame; devolve False se substituiu um frame ainda não processado"""
+        with self._condition:
+            replaced = self._has_pending
+            if replaced:
+                self.dropped += 1
+            self._pending = item
+            self._has_pending = True
+            self.submitted += 1
+            self._condition.notify()
+        return not replaced
+
+    def _active(self, generation: int) -> bool:
+        return self._running and self._generation == generation
+
+    def _loop(self, generation: int):
+        while True:
+            with self._condition:
+                while self._active(generation) and not self._has_pending:
+                    self._condition.wait()
+                if not self._active(generation):
+                    return
+                item = self._pending
+                self._pending = None
+                self._has_pending = False
+                self.busy = True
+
+            started = time.perf_counter()
+            try:
+                result = self.process(item)
+            except Exception:
+                self.errors += 1
+                result = None
+            finally:
+                self.busy_seconds += time.perf_counter() - started
+                self.processed += 1
+                self.busy = False
+
+            if result is not None and self._active(generation):
+                self.on_result(result)
+
+    def stats(self) -> dict:
+        return {
+            'submitted': self.submitted,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'avg_decode_ms': self.busy_seconds / self.processed * 1000 if self.processed else 0.0,
+        }
+
+
+class JankMeter:
+    """
+    Intervalos entre frames da UI (chamar `tick()` a cada frame do Clock)
+
+    Um frame acima de `jank_factor` × o orçamento (1/target_fps) conta como
+    travamento; `worst_ms` guarda o maior intervalo desde o último reset.
+    """
+
+    def __init__(self, target_fps: float = 60.0, jank_factor: float = 2.0, metrics=None):
+        self.budget = 1.0 / target_fps
+        self.threshold = self.budget * jank_factor
+        self.metrics = metrics
+        self.reset()
+
+    def reset(self):
+        self._last = None
+        self.frames = 0
+        self.janks = 0
+        self.worst = 0.0
+        self.total = 0.0
+
+    def tick(self, *args):
+        now = time.perf_counter()
+        if self._last is not None:
+            interval = now - self._last
+            self.frames += 1
+            self.total += interval
+            self.worst = max(self.worst, interval)
+            if interval > self.threshold:
+                self.janks += 1
+            if self.metrics is not None:
+                self.metrics.observe('ui_frame', interval)
+        self._last = now
+
+    def stats(self) -> dict:
+        return {
+            'frames': self.frames,
+            'janks': self.janks,
+            'jank_rate': self.janks / self.frames if self.frames else 0.0,
+            'worst_ms': self.worst * 1000,
+            'avg_fps': self.frames / self.total if self.total else 0.0,
+        }
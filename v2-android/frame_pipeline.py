@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🛤️ PIPELINE DE FRAMES EM ESTÁGIOS - Captura, decodificação e exibição desacopladas
+
+    captura (thread)  ──ring decode──▶  decodificação (pool de N threads) ──▶ on_result
+                      ──ring display──▶ exibição (tick do Clock na thread da UI)
+
+Os estágios se ligam por `RingBuffer`s limitados que descartam o frame mais
+antigo quando cheios: uma decodificação lenta não reduz a taxa de captura
+(os frames pendentes mais velhos são descartados e contados), e a exibição
+puxa só o frame mais recente no próprio ritmo, em vez de um callback do
+Clock agendado por frame.
+
+Cada estágio mantém contadores (processados, descartados, pulados, erros),
+vazão na última janela e tempo médio, em `stats()` e, com `metrics`, no
+contador `pipeline_frames{stage,result}` e no gauge `pipeline_fps{stage}`.
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Any, Callable, List, Optional
+
+
+class RingBuffer:
+    """Fila limitada e thread-safe que descarta o item mais antigo quando cheia"""
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity deve ser >= 1")
+        self.capacity = capacity
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, item) -> bool:
+        """Insere; devolve False se um item antigo foi descartado para caber"""
+        with self._condition:
+            dropped = len(self._items) >= self.capacity
+            if dropped:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._condition.notify()
+        return not dropped
+
+    def get(self, timeout: Optional[float] = None):
+        """Item mais antigo; None se fechado ou sem item até o timeout"""
+        with self._condition:
+            if not self._items and not self._closed:
+                self._condition.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+    def latest(self):
+        """Item mais recente (os anteriores são descartados), sem bloquear"""
+        with self._condition:
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class StageStats:
+    """Contadores e vazão (janela de `window` segundos) de um estágio"""
+
+    def __init__(self, name: str, metrics=None, window: float = 1.0):
+        self.name = name
+        self.metrics = metrics
+        self.window = window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.processed = 0
+            self.dropped = 0
+            self.skipped = 0
+            self.errors = 0
+            self.busy_seconds = 0.0
+            self.fps = 0.0
+            self._window_start = time.monotonic()
+            self._window_count = 0
+
+    def _count(self, result: str, amount: int = 1):
+        if self.metrics is not None and amount:
+            self.metrics.inc('pipeline_frames', amount, stage=self.name, result=result)
+
+    def done(self, seconds: float):
+        now = time.monotonic()
+        with self._lock:
+            self.processed += 1
+            self.busy_seconds += seconds
+            self._window_count += 1
+            elapsed = now - self._window_start
+            if elapsed >= self.window:
+                self.fps = self._window_count / elapsed
+                self._window_start, self._window_count = now, 0
+                if self.metrics is not None:
+                    self.metrics.set_gauge('pipeline_fps', self.fps, stage=self.name)
+        self._count('processed')
+
+    def drop(self, amount: int = 1):
+        with self._lock:
+            self.dropped += amount
+        self._count('dropped', amount)
+
+    def skip(self):
+        with self._lock:
+            self.skipped += 1
+        self._count('skipped')
+
+    def error(self):
+        with self._lock:
+            self.errors += 1
+        self._count('error')
+
+    def snapshot(self) -> dict:
+        return {
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'fps': self.fps,
+            'avg_ms': self.busy_seconds / self.processed * 1000 if self.processed else 0.0,
+        }
+
+
+class FramePipeline:
+    """
+    Captura → pool de decodificação → exibição
+
+        pipeline = FramePipeline(read_frame, make_decoder, on_result, decode_workers=2)
+        pipeline.start()
+        pipeline.display(render)           # no tick do Clock (thread da UI)
+        pipeline.stop()
+
+    `capture()` devolve o próximo frame ou None (falha de leitura).
+    `decoder_factory()` é chamada uma vez por worker e devolve a função de
+    decodificação daquele worker (detectores com estado não são
+    compartilhados); resultados diferentes de None vão para
+    `on_result(frame, result)`, chamado na thread do worker.
+    `should_decode()`, consultada na captura, decide se o frame segue para a
+    decodificação (frames não enviados só são exibidos).
+    """
+
+    def __init__(self, capture: Callable[[], Any], decoder_factory: Callable[[], Callable[[Any], Any]],
+                 on_result: Callable[[Any, Any], None], decode_workers: int = 2,
+                 decode_capacity: int = 2, display_capacity: int = 2,
+                 should_decode: Optional[Callable[[], bool]] = None,
+                 frame_interval: float = 0.0, metrics=None):
+        self.capture = capture
+        self.decoder_factory = decoder_factory
+        self.on_result = on_result
+        self.decode_workers = decode_workers
+        self.should_decode = should_decode
+        self.frame_interval = frame_interval
+
+        self.decode_capacity = decode_capacity
+        self.display_capacity = display_capacity
+        self.decode_ring = RingBuffer(decode_capacity)
+        self.display_ring = RingBuffer(display_capacity)
+        self.capture_stats = StageStats('capture', metrics)
+        self.decode_stats = StageStats('decode', metrics)
+        self.display_stats = StageStats('display', metrics)
+
+        self._running = False
+        self._generation = 0
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._generation += 1
+        generation = self._generation
+        # Rings novos a cada geração: um worker da anterior ainda preso no
+        # get() só enxerga o ring antigo (fechado) e nunca consome frames novos
+        self.decode_ring = decode_ring = RingBuffer(self.decode_capacity)
+        self.display_ring = display_ring = RingBuffer(self.display_capacity)
+        for stats in (self.capture_stats, self.decode_stats, self.display_stats):
+            stats.reset()
+
+        self._threads = [threading.Thread(target=self._capture_loop, args=(generation, decode_ring, display_ring),
+                                          name='pipeline-capture', daemon=True)]
+        self._threads += [threading.Thread(target=self._decode_loop, args=(generation, decode_ring),
+                                           name=f'pipeline-decode-{i}', daemon=True)
+                          for i in range(self.decode_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = 2.0):
+        """Para os estágios; frames pendentes são descartados"""
+        self._running = False
+        self.decode_ring.close()
+        self.display_ring.close()
+        current = threading.current_thread()
+        for thread in self._threads:
+            if thread is not current and timeout != 0:
+                thread.join(timeout)
+        self._threads = []
+
+    # === ESTÁGIOS ===
+
+    def _active(self, generation: int) -> bool:
+        return self._running and self._generation == generation
+
+    def _capture_loop(self, generation: int, decode_ring: RingBuffer, display_ring: RingBuffer):
+        while self._active(generation):
+            started = time.perf_counter()
+            try:
+                frame = self.capture()
+            except Exception:
+                frame = None    # Contado uma vez, como leitura falha, logo abaixo
+            if frame is None:
+                if self._active(generation):
+                    self.capture_stats.error()
+                    time.sleep(0.005)
+                continue
+            self.capture_stats.done(time.perf_counter() - started)
+
+            if self.should_decode is None or self.should_decode():
+                if not decode_ring.put(frame):
+                    self.decode_stats.drop()
+            else:
+                self.decode_stats.skip()
+            if not display_ring.put(frame):
+                self.display_stats.drop()
+
+            # Ritmo da captura: dorme só o que falta do período do frame
+            remaining = self.frame_interval - (time.perf_counter() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def _decode_loop(self, generation: int, decode_ring: RingBuffer):
+        decode = self.decoder_factory()
+        while self._active(generation):
+            frame = decode_ring.get(timeout=0.5)
+            if frame is None:
+                continue
+            started = time.perf_counter()
+            try:
+                result = decode(frame)
+            except Exception:
+                self.decode_stats.error()
+                continue
+            self.decode_stats.done(time.perf_counter() - started)
+            if result is not None and self._active(generation):
+                self.on_result(frame, result)
+
+    def display(self, render: Callable[[Any], None]) -> bool:
+        """Exibe o frame mais recente com `render` (thread da UI); False se nada novo"""
+        pending = len(self.display_ring)
+        frame = self.display_ring.latest()
+        if frame is None:
+            return False
+        if pending > 1:
+            self.display_stats.drop(pending - 1)
+        started = time.perf_counter()
+        render(frame)
+        self.display_stats.done(time.perf_counter() - started)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            'capture': self.capture_stats.snapshot(),
+            'decode': {**self.decode_stats.snapshot(), 'queued': len(self.decode_ring),
+                       'workers': self.decode_workers},
+            'display': self.display_stats.snapshot(),
+        }
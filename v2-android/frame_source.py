@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🎚️ AQUISIÇÃO DE FRAMES EM LUMINÂNCIA - Só o canal que o decodificador usa
+
+O decodificador trabalha em tons de cinza, mas o caminho antigo lia o RGBA
+inteiro da texture, convertia para BGR e o detector voltava a converter
+para cinza. Aqui cada frame vira um único buffer de luminância (uint8, 1
+canal) já no tamanho de decodificação (`max_side`):
+
+    NV21 / NV12 / YUV420  o plano Y (primeiros largura×altura bytes) é a
+                          luminância: nenhuma conversão de cor, só redução
+    RGBA (texture)        RGBA→cinza e redução (INTER_AREA) sobre 1 canal
+
+A captura (`grab`, thread da UI) só copia os bytes do provedor; a conversão
+(`to_luma`) roda no worker de decodificação. O provedor Android do Kivy
+expõe o NV21 da câmera por `grab_frame()`; no desktop `SyntheticNV21Camera`
+gera NV21 a partir de frames BGR (sessão .nfcam ou imagens) com a mesma
+interface, para testar o caminho completo no Linux (no QRReaderApp:
+NFCAM_REPLAY=sessao.nfcam NFCAM_NV21=1).
+"""
+
+from typing import NamedTuple, Optional, Tuple
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+# Maior lado entregue ao decodificador (QR de cupom continua legível)
+DEFAULT_MAX_SIDE = 800
+
+FORMAT_NV21 = 'nv21'   # Y + VU intercalado (padrão da câmera Android)
+FORMAT_NV12 = 'nv12'   # Y + UV intercalado
+FORMAT_I420 = 'i420'   # Y + U + V planares
+FORMAT_RGBA = 'rgba'   # texture do Kivy
+YUV_FORMATS = (FORMAT_NV21, FORMAT_NV12, FORMAT_I420)
+
+
+class RawFrame(NamedTuple):
+    """Bytes copiados do provedor, ainda sem conversão"""
+    format: str
+    data: bytes
+    size: Tuple[int, int]          # (largura, altura)
+    row_stride: Optional[int] = None  # Bytes por linha do plano Y (None = largura)
+
+
+def decode_size(width: int, height: int, max_side: int = DEFAULT_MAX_SIDE) -> Tuple[int, int]:
+    """Tamanho de decodificação mantendo a proporção (nunca amplia)"""
+    scale = min(1.0, max_side / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _fit(gray, max_side: int):
+    height, width = gray.shape
+    target = decode_size(width, height, max_side)
+    if target == (width, height):
+        return gray
+    return cv2.resize(gray, target, interpolation=cv2.INTER_AREA)
+
+
+def y_plane_to_luma(data, width: int, height: int, max_side: int = DEFAULT_MAX_SIDE,
+                    row_stride: Optional[int] = None):
+    """Plano Y de um buffer YUV (NV21/NV12/I420) como luminância no tamanho de decodificação"""
+    stride = row_stride or width
+    plane = np.frombuffer(data, np.uint8, count=stride * height).reshape(height, stride)
+    if stride != width:
+        plane = plane[:, :width]
+    luma = _fit(plane, max_side)
+    # Sem redução o resultado ainda aponta para o buffer do provedor
+    return np.ascontiguousarray(luma) if luma is plane else luma
+
+
+def rgba_to_luma(data, width: int, height: int, max_side: int = DEFAULT_MAX_SIDE):
+    """Pixels RGBA como luminância no tamanho de decodificação (cinza antes de reduzir)"""
+    rgba = np.frombuffer(data, np.uint8, count=width * height * 4).reshape(height, width, 4)
+    return _fit(cv2.cvtColor(rgba, cv2.COLOR_RGBA2GRAY), max_side)
+
+
+def to_luma(frame: RawFrame, max_side: int = DEFAULT_MAX_SIDE):
+    """Converte um RawFrame (qualquer formato suportado) em luminância"""
+    width, height = frame.size
+    if frame.format in YUV_FORMATS:
+        return y_plane_to_luma(frame.data, width, height, max_side, frame.row_stride)
+    if frame.format == FORMAT_RGBA:
+        return rgba_to_luma(frame.data, width, height, max_side)
+    raise ValueError(f"Formato de frame não suportado: {frame.format}")
+
+
+def bgr_to_nv21(frame) -> bytes:
+    """BGR → NV21 (Y + VU intercalado), como entregue pela câmera Android"""
+    height, width = frame.shape[:2]
+    i420 = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420).reshape(-1)
+    y_size = width * height
+    quarter = y_size // 4
+    u = i420[y_size:y_size + quarter]
+    v = i420[y_size + quarter:y_size + 2 * quarter]
+    vu = np.empty(2 * quarter, np.uint8)
+    vu[0::2] = v
+    vu[1::2] = u
+    return i420[:y_size].tobytes() + vu.tobytes()
+
+
+class LumaSource:
+    """
+    Captura de frames para o decodificador a partir da câmera do app
+
+    Usa o NV21 do provedor (`camera._camera.grab_frame()`) quando disponível;
+    senão lê `camera.texture.pixels` (RGBA).
+    """
+
+    def __init__(self, camera, max_side: int = DEFAULT_MAX_SIDE):
+        self.camera = camera
+        self.max_side = max_side
+
+    @property
+    def provider(self):
+        provider = getattr(self.camera, '_camera', None)
+        return provider if callable(getattr(provider, 'grab_frame', None)) else None
+
+    @property
+    def format(self) -> str:
+        return FORMAT_NV21 if self.provider is not None else FORMAT_RGBA
+
+    def grab(self) -> Optional[RawFrame]:
+        """Cópia crua do frame atual (thread da UI), ou None se não houver"""
+        provider = self.provider
+        if provider is not None:
+            data = provider.grab_frame()
+            if data:
+                width, height = provider.resolution
+                return RawFrame(FORMAT_NV21, bytes(data), (width, height))
+            return None
+
+        texture = self.camera.texture
+        if not texture:
+            return None
+        width, height = texture.size
+        return RawFrame(FORMAT_RGBA, texture.pixels, (width, height))
+
+    def to_luma(self, frame: RawFrame):
+        """Luminância no tamanho de decodificação (thread do worker)"""
+        return to_luma(frame, self.max_side)
+
+
+class SyntheticNV21Camera:
+    """
+    Substituto desktop do provedor Android: entrega NV21 por `grab_frame()`
+
+    Envolve uma fonte de frames BGR com `.texture`/`.play` (ReplayCamera) ou
+    uma lista de frames; `_camera` aponta para si mesma, como no widget
+    Camera do Kivy, para que LumaSource escolha o caminho NV21.
+    """
+
+    def __init__(self, source, loop: bool = True):
+        if isinstance(source, (list, tuple)):
+            self.frames = list(source)
+            self.replay = None
+        else:
+            self.frames = None
+            self.replay = source
+        self.loop = loop
+        self._index = 0
+        self._cache = (None, None)
+        self._camera = self
+        self._play = False
+
+    @property
+    def play(self) -> bool:
+        return self.replay.play if self.replay is not None else self._play
+
+    @play.setter
+    def play(self, value: bool):
+        if self.replay is not None:
+            self.replay.play = value
+        self._play = value
+
+    @property
+    def texture(self):
+        return self.replay.texture if self.replay is not None else None
+
+    def _current_frame(self):
+        if self.replay is not None:
+            index = self.replay._current_index() if self.replay.play else None
+            return (index, self.replay.frame(index)) if index is not None else (None, None)
+        if not self.frames or not self._play:
+            return None, None
+        index = self._index % len(self.frames) if self.loop else self._index
+        if index >= len(self.frames):
+            return None, None
+        self._index += 1
+        return index, self.frames[index]
+
+    @property
+    def resolution(self) -> Tuple[int, int]:
+        if self.replay is not None:
+            return self.replay.session.width, self.replay.session.height
+        height, width = self.frames[0].shape[:2]
+        return width, height
+
+    def grab_frame(self) -> Optional[bytes]:
+        index, frame = self._current_frame()
+        if frame is None:
+            return None
+        cached_index, cached = self._cache
+        if cached_index != index or self.frames is not None:
+            cached = bgr_to_nv21(frame)
+            self._cache = (index, cached)
+        return cached
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗄️ ARQUIVO CENTRAL DE CHAVES - Arquivo ordenado de largura fixa + mmap
+
+Formato (somente leitura depois de gravado):
+    cabeçalho de 16 bytes: b'NFKA' | versão (u16) | tamanho do registro (u16) | quantidade (u64)
+    registros: chaves compactas de 19 bytes (access_key.pack_key), ordenadas
+
+A consulta de duplicatas faz busca binária direto no arquivo mapeado em
+memória, sem carregá-lo. Chaves novas entram em "runs" ordenados
+(`<arquivo>.run.N`, mesmo formato) que são mesclados no arquivo principal
+de forma incremental (merge em streaming).
+
+Só um processo grava por vez (trava em `.<arquivo>.lock`); quem apenas
+consulta nunca apaga nada e usa `refresh()` para enxergar runs e mesclagens
+feitos por outros processos.
+"""
+
+import os
+import csv
+import sys
+import mmap
+import json
+import heapq
+import struct
+import argparse
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from access_key import PACKED_SIZE, normalize_key, pack_key, unpack_key
+
+# Trava entre processos para os gravadores (POSIX / Windows)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+MAGIC = b'NFKA'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQ')
+RUN_BUFFER = 10_000             # Chaves em memória antes de gravar um run
+MAX_RUNS = 8                    # Runs pendentes antes de mesclar no arquivo principal
+
+
+class SortedKeyFile:
+    """Um arquivo ordenado mapeado em memória (principal ou run)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        magic, version, record_size, count = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or record_size != PACKED_SIZE:
+            self._file.close()
+            raise ValueError(f"Arquivo de chaves inválido: {self.path}")
+
+        self.count = count
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if count else None
+
+    def _record(self, index: int) -> bytes:
+        start = HEADER.size + index * PACKED_SIZE
+        return self._mmap[start:start + PACKED_SIZE]
+
+    def contains_packed(self, raw: bytes) -> bool:
+        """Busca binária sobre os registros mapeados"""
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            record = self._record(mid)
+            if record < raw:
+                low = mid + 1
+            elif record > raw:
+                high = mid
+            else:
+                return True
+        return False
+
+    def iter_packed(self) -> Iterator[bytes]:
+        for index in range(self.count):
+            yield self._record(index)
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+
+def write_sorted_keys(path, packed_keys: Iterable[bytes]) -> int:
+    """
+    Grava registros já ordenados e únicos em `path` (atômico via os.replace)
+
+    `packed_keys` pode ser um gerador: a gravação é em streaming.
+    """
+    path = Path(path)
+    tmp_path = _tmp_path(path)
+    count = _write_records(tmp_path, packed_keys)
+    os.replace(tmp_path, path)
+    return count
+
+
+def _tmp_path(path: Path) -> Path:
+    """Temporário oculto ('.<nome>.tmp'): o glob dos runs nunca o encontra"""
+    return path.with_name(f'.{path.name}.tmp')
+
+
+def _write_records(tmp_path: Path, packed_keys: Iterable[bytes]) -> int:
+    count = 0
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, PACKED_SIZE, 0))
+        for raw in packed_keys:
+            f.write(raw)
+            count += 1
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, PACKED_SIZE, count))
+        f.flush()
+        os.fsync(f.fileno())
+    return count
+
+
+def _unique(sorted_records: Iterable[bytes]) -> Iterator[bytes]:
+    last = None
+    for raw in sorted_records:
+        if raw != last:
+            yield raw
+            last = raw
+
+
+class KeyArchive:
+    """
+    Arquivo central de chaves: principal + runs pendentes + buffer em memória
+
+    Uso:
+        archive = KeyArchive('chaves_central.nfka')
+        if chave in archive: ...         # duplicata
+        archive.add(chave); archive.flush()
+    """
+
+    def __init__(self, path, run_buffer: int = RUN_BUFFER, max_runs: int = MAX_RUNS):
+        self.path = Path(path)
+        self.run_buffer = run_buffer
+        self.max_runs = max_runs
+        self._pending = set()
+        self._base = None
+        self._runs: List[SortedKeyFile] = []
+        self._version = None
+        self._lock = threading.Lock()    # Troca dos mapeamentos x consultas em andamento
+        self._open_files()
+
+    @classmethod
+    def build(cls, path, keys: Iterable[str]) -> 'KeyArchive':
+        """Cria o arquivo a partir de chaves em qualquer ordem (ordena em memória)"""
+        write_sorted_keys(path, _unique(sorted(pack_key(key) for key in keys)))
+        return cls(path)
+
+    def _run_paths(self) -> List[Path]:
+        # Só '<arquivo>.run.N': ignora sobras como '<arquivo>.run.N.tmp'
+        runs = [p for p in self.path.parent.glob(self.path.name + '.run.*')
+                if p.suffix[1:].isdigit() and p.suffix[1:].isascii()]
+        return sorted(runs, key=lambda p: int(p.suffix[1:]))
+
+    def _disk_version(self) -> Optional[Tuple]:
+        """(nome, mtime, tamanho) do principal e de cada run; None no meio de uma troca"""
+        paths = ([self.path] if self.path.exists() else []) + self._run_paths()
+        try:
+            stats = [(path.name, path.stat()) for path in paths]
+        except OSError:
+            return None
+        return tuple((name, stat.st_mtime_ns, stat.st_size) for name, stat in stats)
+
+    def _open_disk(self):
+        base = SortedKeyFile(self.path) if self.path.exists() else None
+        return base, [SortedKeyFile(path) for path in self._run_paths()]
+
+    def _open_files(self):
+        self.close()
+        self._version = self._disk_version()
+        self._base, self._runs = self._open_disk()
+
+    def refresh(self) -> bool:
+        """
+        Reabre principal e runs se outro processo importou ou mesclou
+
+        O buffer em memória é mantido. Os mapeamentos antigos não são fechados
+        aqui: uma consulta em andamento termina sobre eles e o coletor de lixo
+        os fecha depois.
+        """
+        version = self._disk_version()
+        if version is None or version == self._version:
+            return False
+        try:
+            base, runs = self._open_disk()
+        except (OSError, ValueError):
+            return False  # Troca em andamento em outro processo: tenta na próxima
+        with self._lock:
+            self._base, self._runs, self._version = base, runs, version
+        return True
+
+    # === GRAVAÇÃO (um processo por vez) ===
+
+    @contextmanager
+    def _writer_lock(self):
+        """Trava o arquivo para gravação e apaga temporários de gravações interrompidas"""
+        with open(self.path.with_name(f'.{self.path.name}.lock'), 'a+b') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                self._remove_stale_tmp()
+                self.refresh()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _remove_stale_tmp(self):
+        """Só com a trava de gravação: nenhum outro gravador está no meio da escrita"""
+        patterns = (f'.{self.path.name}.tmp', f'.{self.path.name}.run.*.tmp',
+                    f'{self.path.name}.tmp', f'{self.path.name}.run.*.tmp')
+        for pattern in patterns:
+            for stale in self.path.parent.glob(pattern):
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+    def __len__(self) -> int:
+        """Total aproximado (runs podem repetir chaves do principal até a mesclagem)"""
+        total = self._base.count if self._base else 0
+        return total + sum(run.count for run in self._runs) + len(self._pending)
+
+    def __contains__(self, key) -> bool:
+        try:
+            raw = pack_key(key)
+        except ValueError:
+            return False
+
+        if raw in self._pending:
+            return True
+        with self._lock:
+            base, runs = self._base, self._runs
+        if base is not None and base.contains_packed(raw):
+            return True
+        return any(run.contains_packed(raw) for run in runs)
+
+    def add(self, key: str) -> bool:
+        """Adiciona chave nova ao buffer; retorna False se já existia"""
+        if key in self:
+            return False
+        self._pending.add(pack_key(key))
+        if len(self._pending) >= self.run_buffer:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Grava o buffer como um run ordenado; mescla se houver runs demais"""
+        with self._writer_lock():
+            self._write_pending_run()
+            if len(self._runs) >= self.max_runs:
+                self._merge()
+
+    def _write_pending_run(self):
+        if not self._pending:
+            return
+        existing = self._run_paths()
+        number = int(existing[-1].suffix[1:]) + 1 if existing else 0
+        run_path = self.path.with_name(f'{self.path.name}.run.{number}')
+        write_sorted_keys(run_path, sorted(self._pending))
+        self._pending.clear()
+        with self._lock:
+            self._runs = self._runs + [SortedKeyFile(run_path)]
+            self._version = self._disk_version()
+
+    def merge(self):
+        """Mescla principal + runs em um novo principal (k-way merge em streaming)"""
+        with self._writer_lock():
+            self._merge()
+
+    def _merge(self):
+        self._write_pending_run()
+        if not self._runs:
+            return
+
+        sources = [run.iter_packed() for run in self._runs]
+        if self._base is not None:
+            sources.insert(0, self._base.iter_packed())
+
+        run_paths = [run.path for run in self._runs]
+        tmp_path = _tmp_path(self.path)
+        _write_records(tmp_path, _unique(heapq.merge(*sources)))
+
+        # Fecha os mapeamentos antes da troca (necessário no Windows)
+        self.close()
+        os.replace(tmp_path, self.path)
+        for path in run_paths:
+            path.unlink()
+        self._open_files()
+
+    def __iter__(self) -> Iterator[str]:
+        """Chaves textuais em ordem (principal, runs e buffer mesclados)"""
+        sources = [run.iter_packed() for run in self._runs]
+        if self._base is not None:
+            sources.insert(0, self._base.iter_packed())
+        sources.append(iter(sorted(self._pending)))
+        for raw in _unique(heapq.merge(*sources)):
+            yield unpack_key(raw)
+
+    def close(self):
+        if self._base is not None:
+            self._base.close()
+            self._base = None
+        for run in self._runs:
+            run.close()
+        self._runs = []
+
+
+# === ACESSO COMPARTILHADO ===
+
+_open_archives: Dict[str, KeyArchive] = {}
+_open_lock = threading.Lock()
+
+
+def open_archive(path) -> Optional[KeyArchive]:
+    """
+    Abre (uma vez por processo) o arquivo central para consultas
+
+    Retorna None se o arquivo não existir. Reaproveita o mapeamento entre
+    chamadas, o que importa para o Streamlit, que reexecuta o script a cada
+    interação; cada chamada confere (stat do principal e dos runs) se outro
+    processo importou ou mesclou e, nesse caso, reabre os arquivos.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    with _open_lock:
+        archive = _open_archives.get(str(path.resolve()))
+        if archive is None:
+            archive = KeyArchive(path)
+            _open_archives[str(path.resolve())] = archive
+        else:
+            archive.refresh()
+        return archive
+
+
+# === LINHA DE COMANDO ===
+
+def read_keys_from_file(path) -> Iterator[str]:
+    """Lê chaves de chaves.csv (coluna Chave), JSON dos apps Kivy ou texto (uma por linha)"""
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                if row.get('Chave'):
+                    yield normalize_key(row['Chave'])
+    elif path.suffix.lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            for item in json.load(f):
+                yield normalize_key(item['key'])
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield normalize_key(line)
+
+
+def main():
+    """Importa, mescla e consulta o arquivo central de chaves"""
+    parser = argparse.ArgumentParser(description='Arquivo central de chaves de acesso (ordenado, mmap)')
+    parser.add_argument('arquivo', help='Arquivo central (ex.: chaves_central.nfka)')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    importar = sub.add_parser('importar', help='Adiciona chaves de arquivos CSV/JSON/TXT')
+    importar.add_argument('origens', nargs='+')
+    sub.add_parser('mesclar', help='Mescla runs pendentes no arquivo principal')
+    consultar = sub.add_parser('consultar', help='Verifica se as chaves já existem')
+    consultar.add_argument('chaves', nargs='+')
+    args = parser.parse_args()
+
+    archive = KeyArchive(args.arquivo)
+    if args.comando == 'importar':
+        added = ignored = 0
+        for source in args.origens:
+            for key in read_keys_from_file(source):
+                try:
+                    if archive.add(key):
+                        added += 1
+                    else:
+                        ignored += 1
+                except ValueError:
+                    ignored += 1
+        archive.flush()
+        print(f"✅ {added} chaves adicionadas, {ignored} ignoradas (duplicadas/inválidas)")
+    elif args.comando == 'mesclar':
+        archive.merge()
+        print(f"✅ Arquivo mesclado: {len(archive)} chaves")
+    else:
+        found = 0
+        for key in args.chaves:
+            exists = key in archive
+            found += exists
+            print(f"{'⚠️ existe' if exists else '🆕 nova  '} {key}")
+        archive.close()
+        sys.exit(0 if found == len(args.chaves) else 1)
+    archive.close()
+
+
+if __name__ == '__main__':
+    main()
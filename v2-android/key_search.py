@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔎 BUSCA DE CHAVES - Índice incremental sobre as chaves salvas
+
+A busca antiga testava `texto in chave.lower()` em todas as chaves a cada
+tecla. Aqui:
+
+    texto livre   as chaves ficam em um único buffer (bytearray) separadas
+                  por '\\n'; `find` em C varre o buffer e cada ocorrência é
+                  mapeada para a linha por bisect sobre os inícios
+    campos        `uf:SP` (ou `uf:35`), `cnpj:<8 a 14 dígitos>` (prefixo =
+                  todas as filiais) e `mes:2401` (AAMM) usam índices
+                  campo → linhas montados na inserção
+    digitação     os últimos resultados ficam em cache; se a consulta nova
+                  só restringe uma anterior ("351" depois de "35"), filtra as
+                  linhas daquele resultado em vez de varrer tudo de novo
+
+    index = KeySearchIndex(chaves)       # mais antiga primeiro
+    rows = index.search('cnpj:12345678 mes:2401 987')
+    index.count('uf:SP')                 # só a contagem
+
+Linhas são inteiros na ordem de inserção (array 'I'); quem exibe decide a
+ordem e materializa só o que mostra. Benchmark de 10^5 a 10^6 chaves:
+benchmarks/bench_key_search.py.
+"""
+
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from access_key import KEY_FIELDS, KEY_LENGTH
+
+SEPARATOR = b'\n'
+CACHE_SIZE = 16
+BROAD_FRACTION = 8    # Trecho em mais de 1/8 das chaves: teste chave a chave
+SAMPLE_KEYS = 20000   # Amostra usada para estimar essa fração
+
+# Código IBGE por sigla da UF (primeiros 2 dígitos da chave)
+UF_CODES = {
+    'RO': '11', 'AC': '12', 'AM': '13', 'RR': '14', 'PA': '15', 'AP': '16', 'TO': '17',
+    'MA': '21', 'PI': '22', 'CE': '23', 'RN': '24', 'PB': '25', 'PE': '26', 'AL': '27',
+    'SE': '28', 'BA': '29', 'MG': '31', 'ES': '32', 'RJ': '33', 'SP': '35', 'PR': '41',
+    'SC': '42', 'RS': '43', 'MS': '50', 'MT': '51', 'GO': '52', 'DF': '53',
+}
+
+# Campos indexados: nome na consulta → fatia da chave
+_FIELD_SLICES = {name: (start, end) for name, start, end, _ in KEY_FIELDS}
+INDEXED_FIELDS = {
+    'uf': _FIELD_SLICES['cUF'],
+    'mes': _FIELD_SLICES['AAMM'],
+    'cnpj': _FIELD_SLICES['CNPJ'],
+}
+FIELD_ALIASES = {'uf': 'uf', 'cuf': 'uf', 'mes': 'mes', 'aamm': 'mes', 'cnpj': 'cnpj'}
+
+
+class KeyQuery(NamedTuple):
+    terms: Tuple[str, ...]                  # Trechos de dígitos (todos devem ocorrer)
+    fields: Tuple[Tuple[str, str], ...]     # (campo, valor) ordenados
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.terms and not self.fields
+
+    def narrows(self, other: 'KeyQuery') -> bool:
+        """True se todo resultado desta consulta também é resultado de `other`"""
+        return (self.fields == other.fields and
+                all(any(term in mine for mine in self.terms) for term in other.terms))
+
+
+def _digits(text: str) -> str:
+    # Só 0-9 ASCII: str.isdigit aceitaria '٣' e o encode('ascii') da busca falharia
+    return ''.join(ch for ch in text if '0' <= ch <= '9')
+
+
+def _is_key(key: str) -> bool:
+    return len(key) == KEY_LENGTH and key.isascii() and key.isdigit()
+
+
+def parse_query(text: str) -> KeyQuery:
+    """'uf:SP 2401 cnpj:12.345.678' → KeyQuery (pontuação é ignorada)"""
+    terms, fields = [], []
+    for token in text.split():
+        name, sep, value = token.partition(':')
+        field = FIELD_ALIASES.get(name.lower()) if sep else None
+        if field == 'uf' and value.upper() in UF_CODES:
+            fields.append((field, UF_CODES[value.upper()]))
+            continue
+        value = _digits(value if field else token)
+        if value:
+            if field:
+                fields.append((field, value))
+            else:
+                terms.append(value)
+    return KeyQuery(tuple(sorted(set(terms), key=len, reverse=True)), tuple(sorted(set(fields))))
+
+
+class KeySearchIndex:
+    """Índice de busca por trecho de dígitos e por campos da chave"""
+
+    def __init__(self, keys: Iterable[str] = (), cache_size: int = CACHE_SIZE):
+        self.cache_size = cache_size
+        self.clear()
+        self.extend(keys)
+
+    def clear(self):
+        self._keys = []
+        self._blob = bytearray()
+        self._starts = array('I')
+        self._fields: Dict[str, Dict[str, array]] = {field: {} for field in INDEXED_FIELDS}
+        self._cache: 'OrderedDict[KeyQuery, array]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def key(self, row: int) -> str:
+        return self._keys[row]
+
+    def add(self, key: str) -> int:
+        """Acrescenta uma chave e devolve a linha dela"""
+        self.extend((key,))
+        return len(self._keys) - 1
+
+    def extend(self, keys: Iterable[str]):
+        """Acrescenta muitas chaves (carga do histórico) com um único encode"""
+        keys = keys if isinstance(keys, list) else list(keys)
+        if not keys:
+            return
+        first = len(self._keys)
+        self._keys.extend(keys)
+
+        offset = len(self._blob)
+        starts = self._starts
+        for key in keys:
+            starts.append(offset)
+            offset += len(key) + 1
+        self._blob += SEPARATOR.join(key.encode('ascii', errors='replace') for key in keys) + SEPARATOR
+
+        for field, (start, end) in INDEXED_FIELDS.items():
+            index = self._fields[field]
+            for row, key in enumerate(keys, first):
+                if not _is_key(key):
+                    continue
+                rows = index.get(key[start:end])
+                if rows is None:
+                    rows = index[key[start:end]] = array('I')
+                rows.append(row)
+
+        # Resultados em cache não conhecem as linhas novas
+        self._cache.clear()
+
+    # === CONSULTA ===
+
+    def matches(self, key: str, query) -> bool:
+        """Testa uma única chave (ex.: chave recém-lida contra a busca ativa)"""
+        query = parse_query(query) if isinstance(query, str) else query
+        if _is_key(key):
+            for field, value in query.fields:
+                start, end = INDEXED_FIELDS[field]
+                if not key[start:end].startswith(value):
+                    return False
+        elif query.fields:
+            return False
+        return all(term in key for term in query.terms)
+
+    def count(self, query) -> int:
+        return len(self.search(query))
+
+    def search(self, query) -> array:
+        """Linhas (ordem de inserção) das chaves que atendem a consulta"""
+        query = parse_query(query) if isinstance(query, str) else query
+        if query.is_empty:
+            return array('I', range(len(self._keys)))
+
+        cached = self._cache.get(query)
+        if cached is not None:
+            self._cache.move_to_end(query)
+            return cached
+
+        base = self._narrowest_cached(query)
+        if base is None and query.fields:
+            base = self._field_rows(query.fields)
+
+        # Base grande custa tanto quanto varrer: só vale se já restringe bastante
+        if base is not None and (query.fields or len(base) <= len(self._keys) // BROAD_FRACTION):
+            rows = self._filter(base, query.terms)
+        else:
+            rows = self._scan(query.terms)
+
+        self._cache[query] = rows
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return rows
+
+    def _narrowest_cached(self, query: KeyQuery) -> Optional[array]:
+        """Menor resultado em cache do qual a consulta nova é uma restrição"""
+        best = None
+        for previous, rows in self._cache.items():
+            if query.narrows(previous) and (best is None or len(rows) < len(best)):
+                best = rows
+        return best
+
+    def _field_rows(self, fields) -> array:
+        """Interseção das linhas de cada campo (valor curto = prefixo)"""
+        result = None
+        for field, value in fields:
+            index = self._fields[field]
+            if value in index:
+                rows = array('I', index[value])     # Cópia: o índice cresce com add()
+            else:
+                rows = array('I', sorted(row for stored, stored_rows in index.items()
+                                         if stored.startswith(value) for row in stored_rows))
+            if result is None:
+                result = rows
+            else:
+                allowed = set(rows)
+                result = array('I', (row for row in result if row in allowed))
+            if not result:
+                break
+        return result
+
+    def _filter(self, rows, terms: Tuple[str, ...]) -> array:
+        keys = self._keys
+        if not terms:
+            return rows
+        if len(terms) == 1:
+            term = terms[0]
+            return array('I', [row for row in rows if term in keys[row]])
+        return array('I', [row for row in rows if all(term in keys[row] for term in terms)])
+
+    def _scan(self, terms: Tuple[str, ...]) -> array:
+        """Varre o buffer pelo trecho mais longo e confere os demais por linha"""
+        needle = terms[0].encode('ascii')
+        blob, starts, keys = self._blob, self._starts, self._keys
+        find, end = blob.find, len(blob)
+
+        # Trecho curto que aparece em boa parte das chaves (estimado numa
+        # amostra): mapear cada ocorrência para a linha sai mais caro que
+        # testar chave a chave
+        sample = min(len(keys), SAMPLE_KEYS)
+        sample_end = starts[sample] if sample < len(keys) else end
+        if blob.count(needle, 0, sample_end) > sample // BROAD_FRACTION:
+            return self._filter(range(len(keys)), terms)
+
+        others = terms[1:]
+        rows = array('I')
+
+        position = find(needle)
+        while position != -1:
+            row = bisect_right(starts, position) - 1
+            if not others or all(term in keys[row] for term in others):
+                rows.append(row)
+            # Próxima ocorrência a partir da chave seguinte (uma linha por chave)
+            position = find(needle, starts[row + 1] if row + 1 < len(starts) else end)
+        return rows
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💾 ARMAZENAMENTO DE CHAVES - Journal JSONL + Snapshot
+Persistência incremental das chaves salvas pelos apps Kivy
+
+Cada leitura grava apenas UMA linha no journal (append-only) em vez de
+reescrever o arquivo inteiro. O snapshot continua no formato original
+(lista JSON de {"key", "timestamp"}) e é reconstruído em segundo plano
+quando o journal fica longo (compactação).
+
+Junto com o snapshot é gravado um índice compacto (contagem, chaves mais
+recentes e todas as chaves em formato compacto de 19 bytes) que permite
+abrir o app sem desserializar o histórico inteiro.
+"""
+
+import os
+import json
+import base64
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from access_key import PackedKeySet
+
+# Operações registradas no journal
+OP_ADD = 'add'
+OP_DELETE = 'del'
+OP_CLEAR = 'clear'
+
+# Índice de inicialização rápida
+INDEX_VERSION = 2
+INDEX_RECENT = 200          # Chaves recentes guardadas no índice (lista visível)
+
+
+def _tmp_path(path: Path) -> Path:
+    """Temporário exclusivo do processo e da thread (gravações nunca colidem)"""
+    return path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+
+
+class KeyIndex:
+    """Visão mínima do armazenamento para a abertura do app"""
+
+    __slots__ = ('count', 'recent', 'keys')
+
+    def __init__(self, count: int, recent: List[dict], keys: PackedKeySet):
+        self.count = count      # Total de chaves no armazenamento
+        self.recent = recent    # Mais recentes primeiro (no máximo INDEX_RECENT)
+        self.keys = keys        # Conjunto completo para checagem de duplicatas
+
+    @classmethod
+    def from_entries(cls, entries: List[dict], recent_limit: int = INDEX_RECENT) -> 'KeyIndex':
+        return cls(len(entries), entries[:recent_limit], PackedKeySet.from_keys(entry['key'] for entry in entries))
+
+    def apply(self, events: Iterable[dict], recent_limit: int = INDEX_RECENT):
+        """Aplica eventos do journal sobre o índice"""
+        for event in events:
+            op = event.get('op')
+            if op == OP_ADD:
+                key = event['key']
+                self.recent = [e for e in self.recent if e['key'] != key]
+                self.recent.insert(0, {'key': key, 'timestamp': event['timestamp']})
+                del self.recent[recent_limit:]
+                self.keys.add(key)
+            elif op == OP_DELETE:
+                self.keys.discard(event['key'])
+                self.recent = [e for e in self.recent if e['key'] != event['key']]
+            elif op == OP_CLEAR:
+                self.keys.clear()
+                self.recent = []
+        self.count = len(self.keys)
+
+
+class KeyJournal:
+    """
+    Journal de eventos (add/del/clear) sobre um snapshot JSON
+
+    - snapshot: `chaves_salvas.json` (lista, mais recentes primeiro)
+    - journal:  `chaves_salvas.journal.jsonl` (um evento por linha)
+
+    A reaplicação do journal é idempotente: se o app cair entre a troca do
+    snapshot e o truncamento do journal, reaplicar os eventos sobre o novo
+    snapshot produz o mesmo conjunto de chaves.
+    """
+
+    def __init__(self, snapshot_path, compact_threshold: int = 500):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_name(self.snapshot_path.stem + '.journal.jsonl')
+        self.index_path = self.snapshot_path.with_name(self.snapshot_path.stem + '.index.json')
+        self.compact_threshold = compact_threshold
+
+        self.journal_entries = 0
+        self._lock = threading.Lock()
+        # Um snapshot por vez: da escrita do temporário ao truncamento do journal
+        self._snapshot_lock = threading.Lock()
+        self._compact_thread: Optional[threading.Thread] = None
+        self._reset_position(0)
+
+    def _reset_position(self, events: int):
+        """
+        Posições lógicas do journal (bytes e eventos desde a carga)
+
+        Não voltam a zero quando o arquivo é truncado: cada compactação sabe
+        exatamente quanto do journal atual incorporou, mesmo que outra tenha
+        terminado antes dela.
+        """
+        self.journal_entries = events
+        self._events_total = events         # Eventos gravados (ou lidos) desde a carga
+        self._journal_base = 0              # Bytes já removidos do início do arquivo
+        self._compacted = (0, 0)            # (bytes, eventos) no snapshot em disco
+
+    # === LEITURA ===
+
+    def load(self) -> List[dict]:
+        """Carrega snapshot e reaplica o journal; retorna lista (mais recentes primeiro)"""
+        entries = self._read_snapshot()
+        events = self._read_journal()
+        self._reset_position(len(events))
+        return self.replay(entries, events)
+
+    def load_history(self) -> List[dict]:
+        """Histórico completo sem alterar o estado do journal (seguro em thread de fundo)"""
+        with self._lock:
+            events = self._read_journal()
+        return self.replay(self._read_snapshot(), events)
+
+    def load_index(self) -> KeyIndex:
+        """
+        Carrega apenas o índice compacto (+ journal) para a abertura do app
+
+        Se o índice não existir ou estiver desatualizado em relação ao snapshot,
+        faz a carga completa uma vez e regrava o índice.
+        """
+        events = self._read_journal()
+        self._reset_position(len(events))
+
+        index = self._read_index()
+        if index is None:
+            entries = self.replay(self._read_snapshot(), [])
+            index = KeyIndex.from_entries(entries)
+            with self._snapshot_lock:
+                self._write_index(entries)
+        index.apply(events)
+        return index
+
+    def _read_index(self) -> Optional[KeyIndex]:
+        if not self.snapshot_path.exists():
+            return KeyIndex(0, [], PackedKeySet())
+        if not self.index_path.exists():
+            return None
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except ValueError:
+            return None
+
+        stat = self.snapshot_path.stat()
+        if (data.get('version') != INDEX_VERSION or
+                data.get('snapshot_size') != stat.st_size or
+                data.get('snapshot_mtime_ns') != stat.st_mtime_ns):
+            return None
+
+        keys = PackedKeySet(base64.b64decode(data['keys']))
+        return KeyIndex(data['count'], data['recent'], keys)
+
+    def _write_index(self, entries: List[dict]):
+        """Grava o índice correspondente ao snapshot atual"""
+        if not self.snapshot_path.exists():
+            return
+
+        try:
+            keys = PackedKeySet.from_keys(entry['key'] for entry in entries)
+        except ValueError:
+            # Formato compacto exige chaves de 44 dígitos
+            return
+
+        stat = self.snapshot_path.stat()
+        data = {
+            'version': INDEX_VERSION,
+            'snapshot_size': stat.st_size,
+            'snapshot_mtime_ns': stat.st_mtime_ns,
+            'count': len(entries),
+            'recent': entries[:INDEX_RECENT],
+            'keys': base64.b64encode(keys.to_bytes()).decode('ascii'),
+        }
+        tmp_path = _tmp_path(self.index_path)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def replay(entries: Iterable[dict], events: Iterable[dict]) -> List[dict]:
+        """Aplica eventos do journal sobre a lista do snapshot"""
+        # Dicionário em ordem cronológica (mais antigo primeiro) para inserções O(1)
+        state = {}
+        for entry in reversed(list(entries)):
+            state[entry['key']] = entry
+
+        for event in events:
+            op = event.get('op')
+            if op == OP_ADD:
+                state.pop(event['key'], None)
+                state[event['key']] = {'key': event['key'], 'timestamp': event['timestamp']}
+            elif op == OP_DELETE:
+                state.pop(event['key'], None)
+            elif op == OP_CLEAR:
+                state.clear()
+
+        return list(reversed(list(state.values())))
+
+    def _read_snapshot(self) -> List[dict]:
+        if not self.snapshot_path.exists():
+            return []
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _read_journal(self) -> List[dict]:
+        if not self.journal_path.exists():
+            return []
+
+        events = []
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    # Última linha truncada (queda durante a escrita): ignora
+                    continue
+        return events
+
+    # === ESCRITA ===
+
+    def append_add(self, key: str, timestamp: float):
+        """Registra nova chave (uma linha no journal)"""
+        self._append({'op': OP_ADD, 'key': key, 'timestamp': timestamp})
+
+    def append_delete(self, key: str):
+        """Registra remoção de uma chave"""
+        self._append({'op': OP_DELETE, 'key': key})
+
+    def append_clear(self):
+        """Registra limpeza total"""
+        self._append({'op': OP_CLEAR})
+
+    def _append(self, event: dict):
+        line = json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self.journal_entries += 1
+            self._events_total += 1
+
+    @property
+    def needs_compaction(self) -> bool:
+        """Journal passou do limite e não há compactação em andamento"""
+        running = self._compact_thread is not None and self._compact_thread.is_alive()
+        return self.journal_entries >= self.compact_threshold and not running
+
+    # === COMPACTAÇÃO ===
+
+    def compact(self, entries: List[dict]):
+        """
+        Grava `entries` como novo snapshot e descarta o journal já incorporado
+
+        `entries` deve refletir todos os eventos registrados até a chamada;
+        eventos gravados depois dela são preservados no journal. Espera a
+        compactação em segundo plano que estiver gravando; se ela terminar
+        depois, descarta o snapshot dela (mais antigo que este).
+        """
+        self._write_snapshot(entries, *self._journal_position())
+
+    def compact_async(self, entries: List[dict]):
+        """Compacta em thread de fundo (não bloqueia a UI)"""
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            return
+
+        # A posição do journal é capturada agora, junto com `entries`
+        position = self._journal_position()
+        self._compact_thread = threading.Thread(
+            target=self._write_snapshot, args=(entries, *position), daemon=True
+        )
+        self._compact_thread.start()
+
+    def _journal_position(self):
+        """(bytes, eventos) lógicos do journal neste instante"""
+        with self._lock:
+            size = self.journal_path.stat().st_size if self.journal_path.exists() else 0
+            return self._journal_base + size, self._events_total
+
+    def _write_snapshot(self, entries: List[dict], journal_offset: int, journal_count: int):
+        with self._snapshot_lock:
+            if journal_offset < self._compacted[0]:
+                return  # Um snapshot mais novo já foi gravado
+
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = _tmp_path(self.snapshot_path)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+
+            with self._lock:
+                os.replace(tmp_path, self.snapshot_path)
+                self._truncate_journal(journal_offset - self._journal_base)
+                self._journal_base = journal_offset
+                self.journal_entries -= journal_count - self._compacted[1]
+                self._compacted = (journal_offset, journal_count)
+
+            self._write_index(entries)
+
+    def wait_compaction(self, timeout: Optional[float] = None):
+        """Aguarda compactação em andamento (ex.: ao fechar o app)"""
+        if self._compact_thread is not None:
+            self._compact_thread.join(timeout)
+
+    def _truncate_journal(self, offset: int):
+        """Remove do journal os primeiros `offset` bytes (já no snapshot)"""
+        if not self.journal_path.exists():
+            return
+
+        with open(self.journal_path, 'rb') as f:
+            f.seek(offset)
+            remaining = f.read()
+
+        if not remaining:
+            self.journal_path.unlink()
+            return
+
+        tmp_path = _tmp_path(self.journal_path)
+        with open(tmp_path, 'wb') as f:
+            f.write(remaining)
+        os.replace(tmp_path, self.journal_path)
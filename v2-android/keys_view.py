@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📋 LISTA DE CHAVES VIRTUALIZADA - RecycleView sobre um modelo de dados
+
+A lista antiga recriava um BoxLayout/Label/Button por chave salva a cada
+leitura e a cada tecla da busca (por isso os apps limitavam a 10 ou 20
+itens). Aqui a lista é um RecycleView: `data` guarda só
+{'key', 'timestamp'} por chave (o histórico inteiro, sem limite) e apenas as
+linhas visíveis existem como widgets, reaproveitadas na rolagem. O texto de
+cada linha é formatado quando ela aparece na tela.
+
+    view = KeysRecycleView(row_height='60dp', formatter=formatar, action_text='📋')
+    view.bind(on_key_action=lambda view, key: copiar(key))
+    view.set_keys(saved_keys)          # carga / histórico / limpeza
+    view.add_key(new_key)              # leitura: insere uma linha no topo
+    view.filter_later(texto)           # busca com debounce
+
+Estável com 100 mil chaves: a busca usa o KeySearchIndex (key_search), só
+roda depois que a digitação para e nunca recria widgets; `matched` traz a
+contagem de resultados para o contador da tela.
+"""
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from kivy.clock import Clock
+from kivy.lang import Builder
+from kivy.properties import ListProperty, NumericProperty, ObjectProperty, StringProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+
+from key_search import KeySearchIndex
+
+Builder.load_string('''
+<KeyRow>:
+    orientation: 'horizontal'
+    size_hint_y: None
+    height: self.row_height
+    padding: 5, 0
+    spacing: 10
+    Label:
+        text: root.text
+        font_size: root.font_size
+        size_hint_x: 0.8
+        halign: 'left'
+        valign: 'middle'
+        text_size: self.size
+    Button:
+        text: root.action_text
+        size_hint_x: 0.2
+        background_color: root.action_color
+        font_size: '16sp'
+        on_press: root.trigger_action()
+
+<KeysRecycleView>:
+    viewclass: 'KeyRow'
+    RecycleBoxLayout:
+        default_size: None, root.row_height
+        default_size_hint: 1, None
+        size_hint_y: None
+        height: self.minimum_height
+        orientation: 'vertical'
+''')
+
+
+def default_formatter(key: str, timestamp: float) -> str:
+    date_str = datetime.fromtimestamp(timestamp).strftime('%d/%m/%Y %H:%M')
+    return f"🔑 {key[:15]}...{key[-10:]}\n📅 {date_str}"
+
+
+class KeyRow(RecycleDataViewBehavior, BoxLayout):
+    """Linha reaproveitável: recebe key/timestamp do `data` e formata o texto"""
+
+    key = StringProperty('')
+    timestamp = NumericProperty(0)
+    text = StringProperty('')
+    action_text = StringProperty('📋')
+    action_color = ListProperty([1, 1, 1, 1])
+    row_height = NumericProperty('60dp')
+    font_size = NumericProperty('14sp')
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.list_view = rv
+        self.action_text = rv.action_text
+        self.action_color = rv.action_color
+        self.row_height = rv.row_height
+        self.font_size = rv.font_size
+        self.text = rv.format_row(data['key'], data['timestamp'])
+        return super().refresh_view_attrs(rv, index, data)
+
+    def trigger_action(self):
+        self.list_view.dispatch('on_key_action', self.key)
+
+
+class KeysRecycleView(RecycleView):
+    """Lista de chaves (mais recente primeiro) com busca por substring"""
+
+    row_height = NumericProperty('60dp')
+    font_size = NumericProperty('14sp')
+    action_text = StringProperty('📋')
+    action_color = ListProperty([1, 1, 1, 1])
+    formatter = ObjectProperty(None, allownone=True)
+    query = StringProperty('')
+    matched = NumericProperty(0)    # Linhas que atendem a busca ativa
+
+    __events__ = ('on_key_action',)
+
+    def __init__(self, search_delay: float = 0.25, **kwargs):
+        super().__init__(**kwargs)
+        # Linhas em ordem de inserção (mais antiga primeiro), alinhadas ao índice
+        self._rows = []
+        self._index = KeySearchIndex()
+        self._pending_query = ''
+        self._filter_trigger = Clock.create_trigger(self._apply_pending_query, search_delay)
+
+    def on_key_action(self, key: str):
+        pass
+
+    def format_row(self, key: str, timestamp: float) -> str:
+        return (self.formatter or default_formatter)(key, timestamp)
+
+    @property
+    def total(self) -> int:
+        return len(self._rows)
+
+    def _refresh_data(self):
+        rows = self._rows
+        if not self.query.strip():
+            self.data = rows[::-1]
+        else:
+            self.data = [rows[row] for row in reversed(self._index.search(self.query))]
+        self.matched = len(self.data)
+
+    def set_keys(self, saved_keys: Iterable, query: Optional[str] = None):
+        """Recarrega a lista inteira (objetos com .key e .timestamp, mais recente primeiro)"""
+        self._rows = [{'key': item.key, 'timestamp': item.timestamp} for item in reversed(saved_keys)]
+        self._index = KeySearchIndex([row['key'] for row in self._rows])
+        if query is not None:
+            self.query = query
+        self._refresh_data()
+
+    def add_key(self, saved_key):
+        """Chave nova no topo: uma inserção no `data`, sem reconstruir a lista"""
+        row = {'key': saved_key.key, 'timestamp': saved_key.timestamp}
+        self._rows.append(row)
+        self._index.add(saved_key.key)
+        if not self.query.strip() or self._index.matches(saved_key.key, self.query):
+            self.data.insert(0, row)
+            self.matched += 1
+
+    def filter(self, query: str):
+        """Aplica a busca imediatamente (dígitos, uf:SP, cnpj:..., mes:AAMM)"""
+        if query != self.query:
+            self.query = query
+            self._refresh_data()
+
+    def filter_later(self, query: str):
+        """Busca com debounce: só filtra quando a digitação para"""
+        self._pending_query = query
+        self._filter_trigger()
+
+    def _apply_pending_query(self, *args):
+        self.filter(self._pending_query)
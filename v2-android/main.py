@@ -10,10 +10,10 @@ Convertida da versão desktop (Tkinter) para mobile (Kivy)
 """
 
 import os
-import re
 import time
 import json
 import csv
+import threading
 from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass, asdict
@@ -34,7 +34,6 @@ from kivy.uix.filechooser import FileChooserListView
 from kivy.uix.switch import Switch
 from kivy.uix.spinner import Spinner
 from kivy.uix.progressbar import ProgressBar
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.camera import Camera
 from kivy.clock import Clock
 from kivy.graphics.texture import Texture
@@ -73,6 +72,32 @@ except ImportError:
     PIL_AVAILABLE = False
     Logger.warning("PIL: Não disponível")
 
+# === PERSISTÊNCIA ===
+from key_store import KeyJournal
+from access_key import PackedKeySet
+from key_archive import open_archive
+from access_key import is_valid_key
+from qr_payload import parse_qr_payload
+from qr_detection import MODE_LABELS, QRDetector
+from bloom_filter import BloomFilter, DuplicatePrefilter
+from camera_replay import ReplayCamera
+from pipeline_metrics import metrics_from_env
+from decode_worker import JankMeter, LatestFrameWorker
+from frame_source import LumaSource, SyntheticNV21Camera
+from adaptive_scheduler import AdaptiveScheduler
+from keys_view import KeysRecycleView
+
+# Marca de início do processo (tempo até o primeiro frame)
+APP_START_TIME = time.perf_counter()
+
+def peak_memory_mb() -> Optional[float]:
+    """Pico de memória residente do processo em MB (Linux/Android)"""
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except Exception:
+        return None
+
 # === CLASSES DE DADOS ===
 @dataclass
 class SavedKey:
@@ -80,6 +105,8 @@ class SavedKey:
     Representa uma chave fiscal salva
     Mantém compatibilidade com a versão desktop
     """
+    __slots__ = ('key', 'timestamp')
+    
     key: str
     timestamp: float
     
@@ -108,8 +135,12 @@ class QRReaderApp(App):
         # === CONFIGURAÇÕES DO ALGORITMO ===
         self.qr_config = {
             'detection_mode': 'enhanced',    # simple, enhanced, aggressive
-            'processing_fps': 10,            # FPS para processamento mobile
-            'cooldown_time': 1.5,            # Cooldown entre leituras
+            'processing_fps': 10,            # FPS base de processamento (ajustado pelo agendador)
+            'max_processing_fps': 20,        # Com região de QR em quadro
+            'idle_processing_fps': 3,        # Cena vazia, aparelho quente ou bateria fraca
+            'decode_max_side': 800,          # Maior lado do frame entregue ao decodificador
+            'cooldown_time': 1.5,            # Cooldown máximo entre leituras
+            'min_cooldown_time': 0.4,        # Cooldown mínimo (cupom já saiu do quadro)
             'debug_mode': False,             # Modo debug
             'enhancement_level': 3,          # Nível de melhoria
             'multi_scale': True,             # Múltiplas escalas
@@ -118,10 +149,36 @@ class QRReaderApp(App):
         }
         
         # === DADOS ===
-        self.saved_keys: List[SavedKey] = []
+        self.saved_keys: List[SavedKey] = []     # Lista visível (histórico completo após carga)
+        self.saved_key_set = PackedKeySet()      # Todas as chaves, 19 bytes cada (duplicatas)
+        self.history_loaded = True
+        self._history_thread = None
+        self._history_data = None
         self.last_scan_time = 0
         self.is_scanning = False
         
+        # Métricas por etapa (endpoint HTTP com NFCE_METRICS_PORT)
+        self.metrics = metrics_from_env()
+        
+        # Estratégias de detecção (Simples / Melhorado / Agressivo)
+        self.qr_detector = QRDetector(debug_log=self.log_detection, metrics=self.metrics)
+        
+        # Frames da câmera: decodificação no worker (instância própria do detector),
+        # a thread da UI só copia os pixels e desenha
+        self.frame_detector = QRDetector(debug_log=self.log_detection, metrics=self.metrics)
+        self.decode_worker = LatestFrameWorker(self.decode_camera_frame, self.post_decoded_frame)
+        self.jank_meter = JankMeter(metrics=self.metrics)
+        
+        # Taxa de decodificação e cooldown adaptativos (cena, latência, CPU, temperatura, bateria)
+        self.scheduler = AdaptiveScheduler(
+            base_fps=self.qr_config['processing_fps'],
+            max_fps=self.qr_config['max_processing_fps'],
+            idle_fps=self.qr_config['idle_processing_fps'],
+            cooldown=self.qr_config['cooldown_time'],
+            min_cooldown=self.qr_config['min_cooldown_time'],
+            metrics=self.metrics
+        )
+        
         # === ARQUIVO DE CONFIGURAÇÃO ANDROID ===
         # Usa diretório específico do Android
         from kivy.utils import platform
@@ -135,12 +192,28 @@ class QRReaderApp(App):
             # Para testes em desktop
             self.config_file = Path("chaves_salvas_android.json")
         
+        # Journal append-only: uma linha por leitura, snapshot compactado em background
+        self.key_store = KeyJournal(self.config_file)
+        
+        # Arquivo central opcional (histórico de todas as estações, consultado via mmap)
+        self.archive_file = self.config_file.parent / "chaves_central.nfka"
+        self.key_archive = None
+        
+        # Pré-filtro de Bloom persistido ao lado do armazenamento
+        self.bloom_file = self.config_file.with_name(self.config_file.stem + ".bloom")
+        self.duplicate_filter = None
+        
+        # Snapshot JSON das métricas, gravado ao fechar
+        self.metrics_file = self.config_file.with_name(self.config_file.stem + ".metrics.json")
+        
         # === ESTATÍSTICAS ===
         self.performance_stats = {
             'total_frames': 0,
             'qr_detections': 0,
             'avg_process_time': 0,
-            'start_time': time.time()
+            'start_time': time.time(),
+            'first_frame_ms': None,
+            'history_load_ms': None
         }
     
     def build(self):
@@ -175,8 +248,13 @@ class QRReaderApp(App):
         
         # === CARREGA DADOS SALVOS ===
         self.load_saved_keys()
+        self.setup_duplicate_filter()
+        self.open_key_archive()
         self.update_keys_display()
         
+        # Executa no próximo frame, depois que a interface for desenhada
+        Clock.schedule_once(self.report_startup, 0)
+        
         Logger.info("QRReader: Interface construída com sucesso")
         return main_layout
     
@@ -224,6 +302,16 @@ class QRReaderApp(App):
             play=False
         )
         
+        # Fonte dos frames: a câmera ou uma sessão gravada (NFCAM_REPLAY=sessao.nfcam)
+        replay = os.environ.get('NFCAM_REPLAY')
+        self.camera_source = ReplayCamera(replay) if replay else self.camera
+        if replay and os.environ.get('NFCAM_NV21'):
+            # Simula o provedor Android (NV21) no desktop
+            self.camera_source = SyntheticNV21Camera(self.camera_source)
+        
+        # Luminância no tamanho de decodificação (plano Y do NV21 ou RGBA→cinza)
+        self.frame_source = LumaSource(self.camera_source, self.qr_config['decode_max_side'])
+        
         camera_layout.add_widget(camera_label)
         camera_layout.add_widget(self.camera)
         
@@ -300,7 +388,7 @@ class QRReaderApp(App):
         self.performance_label = Label(
             text='📊 Aguardando...',
             size_hint_y=None,
-            height='30dp',
+            height='60dp',
             font_size='12sp'
         )
         
@@ -326,7 +414,7 @@ class QRReaderApp(App):
         
         # Campo de busca
         self.search_input = TextInput(
-            hint_text='🔍 Buscar chaves...',
+            hint_text='🔍 Buscar (dígitos, uf:SP, cnpj:..., mes:AAMM)',
             multiline=False,
             size_hint_y=None,
             height='40dp',
@@ -334,15 +422,14 @@ class QRReaderApp(App):
         )
         self.search_input.bind(text=self.on_search_change)
         
-        # Lista de chaves (ScrollView)
-        scroll = ScrollView()
-        self.keys_list_layout = BoxLayout(orientation='vertical', size_hint_y=None)
-        self.keys_list_layout.bind(minimum_height=self.keys_list_layout.setter('height'))
-        scroll.add_widget(self.keys_list_layout)
+        # Lista de chaves (RecycleView: só as linhas visíveis viram widgets)
+        self.keys_view = KeysRecycleView(row_height='60dp', font_size='14sp')
+        self.keys_view.bind(on_key_action=lambda view, key: self.copy_key_to_clipboard(key))
+        self.keys_view.bind(matched=lambda view, value: self.update_keys_counter())
         
         keys_layout.add_widget(keys_label)
         keys_layout.add_widget(self.search_input)
-        keys_layout.add_widget(scroll)
+        keys_layout.add_widget(self.keys_view)
         
         return keys_layout
     
@@ -374,13 +461,18 @@ class QRReaderApp(App):
         Logger.info("QRReader: Iniciando câmera...")
         
         try:
-            self.camera.play = True
+            self.camera_source.play = True
             self.is_scanning = True
             self.camera_button.text = '⏹️ Parar Câmera'
             self.camera_button.background_color = (0.8, 0.2, 0.2, 1)
             
-            # Agenda processamento de frames
-            self.camera_event = Clock.schedule_interval(self.process_camera_frame, 1.0 / self.qr_config['processing_fps'])
+            # Agenda captura de frames (decodificação no worker) e medição de jank;
+            # o tick roda na taxa máxima e o agendador decide quais frames seguem
+            self.decode_worker.start()
+            self.jank_meter.reset()
+            self.scheduler.reset()
+            self.camera_event = Clock.schedule_interval(self.process_camera_frame, 1.0 / self.qr_config['max_processing_fps'])
+            self.jank_event = Clock.schedule_interval(self.jank_meter.tick, 0)
             
             Logger.info("QRReader: Câmera iniciada")
             
@@ -393,14 +485,17 @@ class QRReaderApp(App):
         Logger.info("QRReader: Parando câmera...")
         
         try:
-            self.camera.play = False
+            self.camera_source.play = False
             self.is_scanning = False
             self.camera_button.text = '📷 Iniciar Câmera'
             self.camera_button.background_color = (0.2, 0.7, 0.3, 1)
             
-            # Cancela processamento
+            # Cancela processamento (sem esperar a decodificação em andamento)
             if hasattr(self, 'camera_event'):
                 self.camera_event.cancel()
+            if hasattr(self, 'jank_event'):
+                self.jank_event.cancel()
+            self.decode_worker.stop(timeout=0)
             
             Logger.info("QRReader: Câmera parada")
             
@@ -408,31 +503,23 @@ class QRReaderApp(App):
             Logger.error(f"QRReader: Erro ao parar câmera: {e}")
     
     def process_camera_frame(self, dt):
-        """Processa frame da câmera para detecção de QR"""
-        if not self.is_scanning or not self.camera.texture:
+        """Copia os pixels da câmera e entrega ao worker (thread da UI)"""
+        if not self.is_scanning:
             return
         
         try:
-            # Converte texture do Kivy para OpenCV
-            frame = self.texture_to_opencv(self.camera.texture)
-            if frame is None:
+            # Taxa atual do agendador (em cooldown o worker só checa a região)
+            if not self.scheduler.due():
                 return
             
-            # Processa QR codes no frame
-            current_time = time.time()
-            if current_time - self.last_scan_time > self.qr_config['cooldown_time']:
-                qr_codes = self.detect_qr_codes(frame)
-                
-                if qr_codes:
-                    self.last_scan_time = current_time
-                    for qr_code in qr_codes:
-                        try:
-                            data = qr_code.data.decode('utf-8')
-                            Logger.info(f"QR detectado: {data[:50]}...")
-                            self.handle_qr_code_result(data)
-                            break  # Processa apenas o primeiro
-                        except UnicodeDecodeError:
-                            continue
+            with self.metrics.timer('acquisition'):
+                raw_frame = self.frame_source.grab()
+            if raw_frame is None:
+                return
+            
+            self.metrics.inc('frames')
+            mode = MODE_LABELS.get(self.mode_spinner.text.lower(), 'enhanced')
+            self.decode_worker.submit((raw_frame, mode))
             
             # Atualiza estatísticas
             self.update_performance_stats()
@@ -440,27 +527,47 @@ class QRReaderApp(App):
         except Exception as e:
             Logger.error(f"QRReader: Erro ao processar frame: {e}")
     
-    def texture_to_opencv(self, texture):
-        """Converte texture do Kivy para formato OpenCV"""
-        try:
-            # Obtém dados da texture
-            buffer = texture.pixels
-            size = texture.size
-            
-            # Converte para numpy array
-            if NUMPY_AVAILABLE:
-                arr = np.frombuffer(buffer, np.uint8)
-                arr = arr.reshape(size[1], size[0], 4)  # RGBA
-                
-                # Converte RGBA para BGR (OpenCV)
-                frame = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
-                return frame
-            
+    def decode_camera_frame(self, item):
+        """Worker: converte para luminância e detecta QR codes (fora da thread da UI)"""
+        raw_frame, mode = item
+        if not PYZBAR_AVAILABLE or not NUMPY_AVAILABLE:
             return None
-            
-        except Exception as e:
-            Logger.error(f"QRReader: Erro na conversão de texture: {e}")
+        
+        with self.metrics.timer('color_conversion', conversion=f'{raw_frame.format}2luma'):
+            frame = self.frame_source.to_luma(raw_frame)
+        
+        started = time.perf_counter()
+        candidate = self.scheduler.is_candidate(frame)
+        if self.scheduler.in_cooldown():
+            # Só acompanha a cena: o cooldown acaba quando o cupom sai do quadro
+            self.scheduler.record(time.perf_counter() - started, candidate, decoded=False)
             return None
+        
+        data = None
+        for qr_code in self.frame_detector.detect(frame, mode):
+            try:
+                data = qr_code.data.decode('utf-8')  # Processa apenas o primeiro
+                break
+            except UnicodeDecodeError:
+                continue
+        self.scheduler.record(time.perf_counter() - started, candidate, found=data is not None)
+        return data
+    
+    def post_decoded_frame(self, data: str):
+        """Worker → thread principal: o resultado é tratado no próximo frame do Clock"""
+        Clock.schedule_once(lambda dt: self.on_frame_decoded(data), 0)
+    
+    def on_frame_decoded(self, data: str):
+        """Resultado do worker (thread principal)"""
+        if not self.is_scanning:
+            return
+        if self.scheduler.in_cooldown():
+            return  # Frame antigo que terminou depois de outra leitura
+        
+        self.last_scan_time = time.time()
+        self.scheduler.record_read()
+        Logger.info(f"QR detectado: {data[:50]}...")
+        self.handle_qr_code_result(data)
     
     def upload_image(self, instance):
         """Abre seletor de arquivo para upload"""
@@ -552,287 +659,223 @@ class QRReaderApp(App):
         if not PYZBAR_AVAILABLE:
             return []
         
-        mode = self.mode_spinner.text.lower()
-        
-        if mode == 'simples':
-            return self.simple_qr_detection(frame)
-        elif mode == 'melhorado':
-            return self.enhanced_qr_detection(frame)
-        elif mode == 'agressivo':
-            return self.aggressive_qr_detection(frame)
-        else:
-            return self.enhanced_qr_detection(frame)
-
-    def simple_qr_detection(self, frame):
-        """Detecção simples e rápida"""
+        mode = MODE_LABELS.get(self.mode_spinner.text.lower(), 'enhanced')
         try:
-            qr_codes = pyzbar.decode(frame)
-            if hasattr(self, 'debug_switch') and self.debug_switch.active and qr_codes:
-                Logger.info(f"QRReader: Detecção simples: {len(qr_codes)} QR(s)")
-            return qr_codes
+            return self.qr_detector.detect(frame, mode)
         except Exception as e:
             if hasattr(self, 'debug_switch') and self.debug_switch.active:
-                Logger.error(f"QRReader: Erro detecção simples: {e}")
+                Logger.error(f"QRReader: Erro na detecção ({mode}): {e}")
             return []
 
-    def enhanced_qr_detection(self, frame):
-        """Detecção melhorada com pré-processamento"""
-        qr_codes = []
-        
-        try:
-            direct_codes = pyzbar.decode(frame)
-            qr_codes.extend(direct_codes)
-            
-            if qr_codes:
-                if hasattr(self, 'debug_switch') and self.debug_switch.active:
-                    Logger.info(f"QRReader: Detecção direta: {len(qr_codes)} QR(s)")
-                return qr_codes
-            
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            techniques = []
-            equalized = cv2.equalizeHist(gray)
-            techniques.append(("Equalizado", equalized))
-            
-            adaptive_thresh = cv2.adaptiveThreshold(
-                gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-            )
-            techniques.append(("Adaptativo", adaptive_thresh))
-            
-            bilateral = cv2.bilateralFilter(gray, 5, 50, 50)
-            techniques.append(("Bilateral", bilateral))
-            
-            for name, processed_frame in techniques:
-                try:
-                    codes = pyzbar.decode(processed_frame)
-                    if codes:
-                        if hasattr(self, 'debug_switch') and self.debug_switch.active:
-                            Logger.info(f"QRReader: Detecção {name}: {len(codes)} QR(s)")
-                        qr_codes.extend(codes)
-                        break
-                except:
-                    continue
-            
-            return self.remove_duplicate_qrs(qr_codes)
-            
-        except Exception as e:
-            if hasattr(self, 'debug_switch') and self.debug_switch.active:
-                Logger.error(f"QRReader: Erro detecção melhorada: {e}")
-        
-        return qr_codes
-
-    def aggressive_qr_detection(self, frame):
-        """Detecção agressiva para casos difíceis"""
-        qr_codes = []
-        
-        try:
-            qr_codes = self.enhanced_qr_detection(frame)
-            if qr_codes:
-                return qr_codes
-            
-            if hasattr(self, 'debug_switch') and self.debug_switch.active:
-                Logger.info("QRReader: Iniciando detecção agressiva...")
-            
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            scales = [0.8, 1.2, 1.5]
-            for scale in scales:
-                try:
-                    height, width = gray.shape
-                    new_width = int(width * scale)
-                    new_height = int(height * scale)
-                    
-                    scaled = cv2.resize(gray, (new_width, new_height))
-                    codes = pyzbar.decode(scaled)
-                    
-                    if codes:
-                        if hasattr(self, 'debug_switch') and self.debug_switch.active:
-                            Logger.info(f"QRReader: Detecção escala {scale}: {len(codes)} QR(s)")
-                        qr_codes.extend(codes)
-                        break
-                except:
-                    continue
-            
-            if not qr_codes:
-                angles = [-10, 10, -15, 15]
-                center = (gray.shape[1] // 2, gray.shape[0] // 2)
-                
-                for angle in angles:
-                    try:
-                        rotation_matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
-                        rotated = cv2.warpAffine(gray, rotation_matrix, (gray.shape[1], gray.shape[0]))
-                        codes = pyzbar.decode(rotated)
-                        
-                        if codes:
-                            if hasattr(self, 'debug_switch') and self.debug_switch.active:
-                                Logger.info(f"QRReader: Detecção rotação {angle}°: {len(codes)} QR(s)")
-                            qr_codes.extend(codes)
-                            break
-                    except:
-                        continue
-            
-            return self.remove_duplicate_qrs(qr_codes)
-            
-        except Exception as e:
-            if hasattr(self, 'debug_switch') and self.debug_switch.active:
-                Logger.error(f"QRReader: Erro detecção agressiva: {e}")
-        
-        return qr_codes
-
-    def remove_duplicate_qrs(self, qr_codes):
-        """Remove QR codes duplicados"""
-        unique_codes = []
-        for code in qr_codes:
-            is_duplicate = False
-            for existing in unique_codes:
-                if (abs(code.rect.left - existing.rect.left) < 20 and 
-                    abs(code.rect.top - existing.rect.top) < 20):
-                    is_duplicate = True
-                    break
-            if not is_duplicate:
-                unique_codes.append(code)
-        
-        return unique_codes
+    def log_detection(self, message: str):
+        """Log das estratégias de detecção (somente em modo debug)"""
+        if hasattr(self, 'debug_switch') and self.debug_switch.active:
+            Logger.info(f"QRReader: {message}")
 
     def handle_qr_code_result(self, data: str):
         """Processa resultado da leitura QR"""
-        match = re.search(r'p=([0-9]{44})', data)
-        key = match.group(1) if match else None
-        
-        if not key or not self.validate_access_key(key):
+        with self.metrics.timer('key_extraction'):
+            payload = parse_qr_payload(data)
+        key = payload.key if payload else None
+        
+        if payload and hasattr(self, 'debug_switch') and self.debug_switch.active:
+            Logger.info(f"QRReader: Payload v{payload.version or '1'} tpAmb={payload.environment} "
+                        f"offline={payload.offline}")
+        
+        with self.metrics.timer('validation'):
+            valid = bool(key) and self.validate_access_key(key)
+        if not valid:
+            self.metrics.inc('keys', result='invalid' if key else 'no_key')
             self.show_toast("QR Code inválido ou não é cupom fiscal", "warning")
             return
         
-        if any(item.key == key for item in self.saved_keys):
+        with self.metrics.timer('duplicate_check'):
+            duplicate = self.is_duplicate_key(key)
+        if duplicate:
+            self.metrics.inc('keys', result='duplicate')
             self.show_toast("Este cupom já foi lido", "warning")
             return
         
         new_key = SavedKey(key, time.time())
         self.saved_keys.insert(0, new_key)
-        
-        self.save_keys_to_file()
-        self.update_keys_display()
+        self.saved_key_set.add(key)
+        self.duplicate_filter.add(key)
+        if self.duplicate_filter.bloom.is_saturated:
+            self.setup_duplicate_filter()
+        
+        with self.metrics.timer('persistence'):
+            self.record_key_added(new_key)
+        self.metrics.inc('keys', result='saved')
+        self.update_keys_counter()
+        if hasattr(self, 'keys_view'):
+            self.keys_view.add_key(new_key)
         
         self.show_toast("✅ Cupom salvo com sucesso!", "success")
         Logger.info(f"QRReader: Chave salva: {key[:20]}...")
 
-    def validate_access_key(self, key: str) -> bool:
-        """Valida chave de acesso fiscal (algoritmo DV)"""
-        if len(key) != 44 or not key.isdigit():
-            return False
+    def open_key_archive(self):
+        """Abre o arquivo central de chaves, se existir"""
+        try:
+            self.key_archive = open_archive(self.archive_file)
+            if self.key_archive is not None:
+                Logger.info(f"QRReader: Arquivo central com {len(self.key_archive)} chaves")
+        except Exception as e:
+            Logger.error(f"QRReader: Erro ao abrir arquivo central: {e}")
+            self.key_archive = None
+
+    def setup_duplicate_filter(self):
+        """Carrega o filtro de Bloom salvo ou o reconstrói a partir das chaves"""
+        count = len(self.saved_key_set)
+        bloom = None
+        try:
+            bloom = BloomFilter.load(self.bloom_file)
+        except Exception as e:
+            Logger.error(f"QRReader: Erro ao ler filtro de duplicatas: {e}")
+        
+        if bloom is None or bloom.count != count or bloom.is_saturated:
+            started = time.perf_counter()
+            bloom = BloomFilter.from_keys(self.saved_key_set, count)
+            self.save_duplicate_filter(bloom)
+            Logger.info(f"QRReader: Filtro de duplicatas reconstruído ({count} chaves) "
+                        f"em {(time.perf_counter() - started) * 1000:.0f} ms")
         
+        self.duplicate_filter = DuplicatePrefilter(bloom, lambda key: key in self.saved_key_set)
+
+    def save_duplicate_filter(self, bloom=None):
+        """Persiste o filtro de Bloom ao lado do armazenamento"""
         try:
-            weights = [2, 3, 4, 5, 6, 7, 8, 9] * 5 + [2, 3, 4]
-            total = sum(int(digit) * weight for digit, weight in zip(key[:43], weights))
-            
-            remainder = total % 11
-            expected_dv = 0 if remainder < 2 else 11 - remainder
-            
-            return int(key[43]) == expected_dv
-            
-        except Exception:
-            return False
+            (bloom or self.duplicate_filter.bloom).save(self.bloom_file)
+        except Exception as e:
+            Logger.error(f"QRReader: Erro ao salvar filtro de duplicatas: {e}")
+
+    def is_duplicate_key(self, key: str) -> bool:
+        """Chave já lida neste aparelho ou presente no arquivo central"""
+        if self.duplicate_filter.is_duplicate(key):
+            return True
+        try:
+            # Reabre principal/runs se o arquivo foi importado ou mesclado depois da abertura
+            self.key_archive = open_archive(self.archive_file)
+        except Exception as e:
+            Logger.error(f"QRReader: Erro ao atualizar arquivo central: {e}")
+        return self.key_archive is not None and key in self.key_archive
+
+    def validate_access_key(self, key: str) -> bool:
+        """Valida chave de acesso fiscal (algoritmo DV)"""
+        return is_valid_key(key)
 
     def load_saved_keys(self):
-        """Carrega chaves salvas do arquivo"""
+        """
+        Abertura rápida: carrega só o índice compacto (contagem, chaves recentes
+        e conjunto para duplicatas); o histórico completo vem em background
+        """
         try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.saved_keys = [SavedKey.from_dict(item) for item in data]
-                    
-                Logger.info(f"QRReader: {len(self.saved_keys)} chaves carregadas")
+            index = self.key_store.load_index()
+            self.saved_key_set = index.keys
+            self.saved_keys = [SavedKey.from_dict(item) for item in index.recent]
+            self.history_loaded = len(self.saved_keys) >= index.count
+            
+            if index.count:
+                Logger.info(f"QRReader: {index.count} chaves no índice "
+                            f"({len(self.saved_keys)} recentes, {self.key_store.journal_entries} eventos no journal)")
             else:
-                self.saved_keys = []
                 Logger.info("QRReader: Nenhum arquivo de chaves encontrado")
+            
+            if not self.history_loaded:
+                self._history_thread = threading.Thread(target=self._load_history_worker, daemon=True)
+                self._history_thread.start()
                 
         except Exception as e:
             Logger.error(f"QRReader: Erro ao carregar chaves: {e}")
             self.saved_keys = []
+            self.saved_key_set = PackedKeySet()
+            self.history_loaded = True
 
-    def save_keys_to_file(self):
-        """Salva chaves no arquivo"""
+    def _load_history_worker(self):
+        """Lê o histórico completo fora da thread da UI"""
+        started = time.perf_counter()
         try:
-            self.config_file.parent.mkdir(parents=True, exist_ok=True)
+            self._history_data = self.key_store.load_history()
+        except Exception as e:
+            Logger.error(f"QRReader: Erro ao carregar histórico: {e}")
+            self._history_data = None
+        self.performance_stats['history_load_ms'] = (time.perf_counter() - started) * 1000
+        Clock.schedule_once(lambda dt: self.merge_loaded_history(), 0)
+
+    def merge_loaded_history(self):
+        """Incorpora o histórico completo (thread principal)"""
+        if self.history_loaded or self._history_data is None:
+            return
+        
+        data, self._history_data = self._history_data, None
+        
+        # Ignora chaves removidas durante a carga e preserva as lidas nesse meio tempo
+        history = [SavedKey.from_dict(item) for item in data if item['key'] in self.saved_key_set]
+        loaded = {item.key for item in history}
+        self.saved_keys = [item for item in self.saved_keys if item.key not in loaded] + history
+        self.history_loaded = True
+        
+        Logger.info(f"QRReader: Histórico completo carregado - {len(self.saved_keys)} chaves "
+                    f"em {self.performance_stats['history_load_ms']:.0f} ms")
+        self.update_keys_display()
+
+    def ensure_history_loaded(self) -> bool:
+        """Garante histórico completo em memória (aguarda a carga em background)"""
+        if not self.history_loaded and self._history_thread is not None:
+            self._history_thread.join()
+            self.merge_loaded_history()
+        return self.history_loaded
+
+    def report_startup(self, dt):
+        """Registra tempo até o primeiro frame e memória na abertura"""
+        elapsed_ms = (time.perf_counter() - APP_START_TIME) * 1000
+        memory_mb = peak_memory_mb()
+        self.performance_stats['first_frame_ms'] = elapsed_ms
+        
+        memory_text = f"{memory_mb:.1f} MB" if memory_mb is not None else "n/d"
+        Logger.info(f"QRReader: Primeiro frame em {elapsed_ms:.0f} ms | "
+                    f"{len(self.saved_key_set)} chaves | memória {memory_text}")
+        if hasattr(self, 'performance_label'):
+            self.performance_label.text = f"📊 Pronto em {elapsed_ms:.0f} ms | {memory_text}"
+
+    def record_key_added(self, key_obj: SavedKey):
+        """Grava uma única linha no journal; compacta em background se necessário"""
+        try:
+            self.key_store.append_add(key_obj.key, key_obj.timestamp)
             
-            data = [key.to_dict() for key in self.saved_keys]
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # Compactar exige o histórico completo em memória
+            if self.history_loaded and self.key_store.needs_compaction:
+                Logger.info("QRReader: Compactando journal de chaves...")
+                self.key_store.compact_async([key.to_dict() for key in self.saved_keys])
                 
+        except Exception as e:
+            Logger.error(f"QRReader: Erro ao salvar chave: {e}")
+
+    def save_keys_to_file(self):
+        """Grava snapshot completo (compactação síncrona do journal)"""
+        try:
+            self.key_store.compact([key.to_dict() for key in self.saved_keys])
             Logger.info(f"QRReader: {len(self.saved_keys)} chaves salvas")
             
         except Exception as e:
             Logger.error(f"QRReader: Erro ao salvar chaves: {e}")
 
-    def update_keys_display(self):
-        """Atualiza display da lista de chaves"""
-        count = len(self.saved_keys)
+    def update_keys_counter(self):
+        """Atualiza contador de chaves"""
         if hasattr(self, 'keys_counter'):
-            self.keys_counter.text = f'📊 {count} chaves'
-        
-        if hasattr(self, 'keys_list_layout'):
-            self.keys_list_layout.clear_widgets()
-        
-        search_text = ""
-        if hasattr(self, 'search_input'):
-            search_text = self.search_input.text.lower()
-            
-        filtered_keys = [
-            key for key in self.saved_keys
-            if search_text in key.key.lower()
-        ]
-        
-        if hasattr(self, 'keys_list_layout'):
-            for key_obj in filtered_keys:
-                key_item = self.create_key_item(key_obj)
-                self.keys_list_layout.add_widget(key_item)
-        
-        Logger.info(f"QRReader: Lista atualizada - {len(filtered_keys)} de {count} chaves")
+            count = len(self.saved_key_set)
+            if hasattr(self, 'keys_view') and self.keys_view.query.strip():
+                self.keys_counter.text = f'📊 {self.keys_view.matched} de {count} chaves'
+            else:
+                self.keys_counter.text = f'📊 {count} chaves'
 
-    def create_key_item(self, key_obj: SavedKey):
-        """Cria widget para item da chave"""
-        item_layout = BoxLayout(
-            orientation='horizontal',
-            size_hint_y=None,
-            height='60dp',
-            padding=5,
-            spacing=10
-        )
-        
-        info_layout = BoxLayout(orientation='vertical', size_hint_x=0.8)
-        
-        key_display = f"{key_obj.key[:15]}...{key_obj.key[-10:]}"
-        key_label = Label(
-            text=f"🔑 {key_display}",
-            font_size='14sp',
-            halign='left',
-            size_hint_y=0.6
-        )
-        key_label.bind(size=key_label.setter('text_size'))
-        
-        date_str = datetime.fromtimestamp(key_obj.timestamp).strftime('%d/%m/%Y %H:%M')
-        date_label = Label(
-            text=f"📅 {date_str}",
-            font_size='12sp',
-            halign='left',
-            size_hint_y=0.4
-        )
-        date_label.bind(size=date_label.setter('text_size'))
-        
-        info_layout.add_widget(key_label)
-        info_layout.add_widget(date_label)
-        
-        copy_btn = Button(
-            text='📋',
-            size_hint_x=0.2,
-            font_size='16sp'
-        )
-        copy_btn.bind(on_press=lambda x: self.copy_key_to_clipboard(key_obj.key))
-        
-        item_layout.add_widget(info_layout)
-        item_layout.add_widget(copy_btn)
-        
-        return item_layout
+    def update_keys_display(self):
+        """Recarrega a lista de chaves (carga, histórico, limpeza)"""
+        self.update_keys_counter()
+        if hasattr(self, 'keys_view'):
+            search_text = self.search_input.text if hasattr(self, 'search_input') else ''
+            self.keys_view.set_keys(self.saved_keys, search_text)
+            Logger.info(f"QRReader: Lista atualizada - {len(self.keys_view.data)} de "
+                        f"{len(self.saved_key_set)} chaves")
 
     def copy_key_to_clipboard(self, key):
         """Copia chave para clipboard (Android)"""
@@ -901,8 +944,19 @@ class QRReaderApp(App):
                 elapsed = time.time() - self.performance_stats['start_time']
                 fps = self.performance_stats['total_frames'] / elapsed if elapsed > 0 else 0
                 
+                dup_stats = self.duplicate_filter.stats()
+                jank = self.jank_meter.stats()
+                worker = self.decode_worker.stats()
+                schedule = self.scheduler.stats()
                 if hasattr(self, 'performance_label'):
-                    self.performance_label.text = f"📊 FPS: {fps:.1f} | Frames: {self.performance_stats['total_frames']}"
+                    self.performance_label.text = (
+                        f"📊 FPS: {fps:.1f} | Frames: {self.performance_stats['total_frames']} | "
+                        f"Dup: {dup_stats['avg_lookup_us']:.1f}µs FP {dup_stats['observed_fp_rate']:.2%}\n"
+                        f"UI: pior {jank['worst_ms']:.0f} ms, jank {jank['jank_rate']:.1%} | "
+                        f"Decod.: {worker['avg_decode_ms']:.0f} ms, descartados {worker['dropped']}\n"
+                        f"Taxa: {schedule['fps']:.1f} FPS ({'+'.join(schedule['reasons'])}) | "
+                        f"{schedule['reads_per_minute']:.1f} cupons/min"
+                    )
                 
         except Exception as e:
             Logger.error(f"QRReader: Erro nas estatísticas: {e}")
@@ -925,8 +979,9 @@ class QRReaderApp(App):
         Logger.info(f"QRReader: Debug {'ativado' if value else 'desativado'}")
     
     def on_search_change(self, instance, value):
-        """Callback mudança na busca"""
-        self.update_keys_display()
+        """Callback mudança na busca (filtra quando a digitação para)"""
+        if hasattr(self, 'keys_view'):
+            self.keys_view.filter_later(value)
 
     # === MÉTODOS DE AÇÃO ===
     
@@ -936,6 +991,10 @@ class QRReaderApp(App):
             self.show_toast("Nenhuma chave para exportar", "warning")
             return
         
+        if not self.ensure_history_loaded():
+            self.show_toast("Histórico ainda não carregado", "warning")
+            return
+        
         try:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"chaves_fiscais_{timestamp}.csv"
@@ -977,7 +1036,7 @@ class QRReaderApp(App):
         content = BoxLayout(orientation='vertical', spacing=20, padding=20)
         
         message = Label(
-            text=f'⚠️ Tem certeza que deseja limpar\ntodas as {len(self.saved_keys)} chaves salvas?\n\nEsta ação não pode ser desfeita!',
+            text=f'⚠️ Tem certeza que deseja limpar\ntodas as {len(self.saved_key_set)} chaves salvas?\n\nEsta ação não pode ser desfeita!',
             font_size='16sp',
             halign='center'
         )
@@ -1002,7 +1061,10 @@ class QRReaderApp(App):
         
         def confirm_clear(btn):
             self.saved_keys.clear()
+            self.saved_key_set.clear()
+            self.key_store.append_clear()
             self.save_keys_to_file()
+            self.setup_duplicate_filter()
             self.update_keys_display()
             popup.dismiss()
             self.show_toast("🗑️ Todas as chaves foram removidas", "success")
@@ -1015,6 +1077,18 @@ class QRReaderApp(App):
         
         popup.open()
 
+    def on_stop(self):
+        """Finaliza compactação pendente ao fechar"""
+        if self.is_scanning:
+            self.stop_camera()
+        self.decode_worker.stop()
+        self.key_store.wait_compaction(timeout=5)
+        self.save_duplicate_filter()
+        try:
+            self.metrics.write_json(self.metrics_file)
+        except Exception as e:
+            Logger.error(f"QRReader: Erro ao gravar métricas: {e}")
+
 
 # === INICIALIZAÇÃO DA APLICAÇÃO ===
 
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📈 MÉTRICAS DO PIPELINE - Tempo por etapa, contadores e exportação
+
+Histogramas de buckets fixos (uma busca binária e três somas por observação)
+para cada etapa da leitura: aquisição do frame, conversão de cor, cada
+técnica de pré-processamento, cada chamada do decodificador, extração da
+chave, validação, checagem de duplicatas e gravação. Contadores registram
+sucessos e a técnica vencedora; gauges guardam o último valor de grandezas
+instantâneas (taxa de decodificação escolhida pelo agendador, temperatura).
+
+Exportação em texto Prometheus (/metrics) e em JSON (/metrics.json ou
+snapshot em arquivo). O servidor HTTP só sobe com NFCE_METRICS_PORT.
+"""
+
+import os
+import json
+import time
+import threading
+from bisect import bisect_left
+from typing import Dict, Optional, Tuple
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Etapas do pipeline (rótulo `stage`)
+STAGES = (
+    'acquisition', 'color_conversion', 'preprocess', 'decode',
+    'key_extraction', 'validation', 'duplicate_check', 'persistence',
+    'ui_frame',
+)
+
+# Limites superiores dos buckets, em segundos (100 µs a 2,5 s)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+METRICS_PORT_ENV = 'NFCE_METRICS_PORT'
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ''
+    body = ','.join(f'{name}="{value}"' for name, value in pairs)
+    return '{' + body + '}'
+
+
+class Histogram:
+    """Histograma de buckets fixos (contagens não cumulativas; o último é +Inf)"""
+
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimativa por interpolação linear dentro do bucket (como histogram_quantile)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if index == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.bounds[-1]
+
+
+class _StageTimer:
+    """Context manager que mede uma etapa com perf_counter"""
+
+    __slots__ = ('metrics', 'stage', 'labels', 'started')
+
+    def __init__(self, metrics, stage, labels):
+        self.metrics = metrics
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class PipelineMetrics:
+    """
+    Registro de métricas thread-safe do pipeline de leitura
+
+        with metrics.timer('decode', technique='Equalizado'):
+            codes = decoder(image)
+        metrics.inc('keys', result='saved')
+    """
+
+    def __init__(self, prefix: str = 'nfce', buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._gauges: Dict[Tuple[str, LabelKey], float] = {}
+
+    def timer(self, stage: str, **labels) -> _StageTimer:
+        return _StageTimer(self, stage, labels)
+
+    def observe(self, stage: str, seconds: float, **labels):
+        key = (stage, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def counter(self, name: str, **labels) -> float:
+        return self._counters.get((name, _label_key(labels)), 0)
+
+    def set_gauge(self, name: str, value: float, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = value
+
+    def gauge(self, name: str, **labels) -> Optional[float]:
+        return self._gauges.get((name, _label_key(labels)))
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+            self.started = time.time()
+
+    # === EXPORTAÇÃO ===
+
+    def snapshot(self) -> dict:
+        """Estado atual em estrutura serializável (tempos em ms)"""
+        with self._lock:
+            histograms = [(stage, labels, list(h.counts), h.total, h.count, h.quantile(0.5), h.quantile(0.95))
+                          for (stage, labels), h in self._histograms.items()]
+            counters = list(self._counters.items())
+            gauges = list(self._gauges.items())
+
+        stages = []
+        for stage, labels, counts, total, count, p50, p95 in sorted(histograms):
+            stages.append({
+                'stage': stage,
+                'labels': dict(labels),
+                'count': count,
+                'mean_ms': total / count * 1000 if count else None,
+                'p50_ms': p50 * 1000 if p50 is not None else None,
+                'p95_ms': p95 * 1000 if p95 is not None else None,
+                'total_ms': total * 1000,
+                'buckets_ms': [bound * 1000 for bound in self.buckets],
+                'counts': counts,
+            })
+        return {
+            'timestamp': time.time(),
+            'uptime_s': time.time() - self.started,
+            'stages': stages,
+            'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                         for (name, labels), value in sorted(counters)],
+            'gauges': [{'name': name, 'labels': dict(labels), 'value': value}
+                       for (name, labels), value in sorted(gauges)],
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, **kwargs)
+
+    def write_json(self, path):
+        """Snapshot em arquivo, com troca atômica (lido por coletores externos)"""
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.to_json(indent=2))
+        os.replace(tmp, path)
+
+    def to_prometheus(self) -> str:
+        """Formato de exposição em texto do Prometheus (0.0.4)"""
+        with self._lock:
+            histograms = [(stage, labels, list(h.counts), h.total, h.count)
+                          for (stage, labels), h in self._histograms.items()]
+            counters = list(self._counters.items())
+            gauges = list(self._gauges.items())
+
+        name = f'{self.prefix}_stage_duration_seconds'
+        lines = [f'# HELP {name} Tempo por etapa do pipeline de leitura',
+                 f'# TYPE {name} histogram']
+        for stage, labels, counts, total, count in sorted(histograms):
+            key = (('stage', stage),) + labels
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_format_labels(key, (("le", repr(bound)),))} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(key, (("le", "+Inf"),))} {count}')
+            lines.append(f'{name}_sum{_format_labels(key)} {total!r}')
+            lines.append(f'{name}_count{_format_labels(key)} {count}')
+
+        declared = set()
+        for (counter, labels), value in sorted(counters):
+            full_name = f'{self.prefix}_{counter}_total'
+            if full_name not in declared:
+                declared.add(full_name)
+                lines.append(f'# TYPE {full_name} counter')
+            lines.append(f'{full_name}{_format_labels(labels)} {value:g}')
+
+        for (gauge, labels), value in sorted(gauges):
+            full_name = f'{self.prefix}_{gauge}'
+            if full_name not in declared:
+                declared.add(full_name)
+                lines.append(f'# TYPE {full_name} gauge')
+            lines.append(f'{full_name}{_format_labels(labels)} {value:g}')
+
+        lines.append(f'# TYPE {self.prefix}_uptime_seconds gauge')
+        lines.append(f'{self.prefix}_uptime_seconds {time.time() - self.started:.3f}')
+        return '\n'.join(lines) + '\n'
+
+
+class NullMetrics:
+    """Mesma interface sem custo, para quem não quer instrumentação"""
+
+    class _NullTimer:
+        __slots__ = ()
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    _TIMER = _NullTimer()
+
+    def timer(self, stage: str, **labels):
+        return self._TIMER
+
+    def observe(self, stage: str, seconds: float, **labels):
+        pass
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        pass
+
+    def set_gauge(self, name: str, value: float, **labels):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+_default_metrics = None
+_servers = {}
+
+
+def default_metrics() -> PipelineMetrics:
+    """Registro do processo (sobrevive aos reruns do Streamlit)"""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = PipelineMetrics()
+    return _default_metrics
+
+
+# === ENDPOINT HTTP ===
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics: PipelineMetrics = None
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            body = self.metrics.to_prometheus().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        elif path == '/metrics.json':
+            body = self.metrics.to_json().encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Sem log por requisição (o coletor consulta a cada poucos segundos)
+        pass
+
+
+def start_metrics_server(metrics: PipelineMetrics, port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+    """Sobe /metrics e /metrics.json em thread daemon (uma vez por porta)"""
+    if port in _servers:
+        return _servers[port]
+    handler = type('MetricsHandler', (_MetricsHandler,), {'metrics': metrics})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name=f'metrics:{port}').start()
+    _servers[port] = server
+    return server
+
+
+def metrics_from_env() -> PipelineMetrics:
+    """Registro do processo, com o endpoint HTTP se NFCE_METRICS_PORT estiver definido"""
+    metrics = default_metrics()
+    port = os.environ.get(METRICS_PORT_ENV)
+    if port:
+        start_metrics_server(metrics, int(port))
+    return metrics
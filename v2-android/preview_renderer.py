@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🖼️ PRÉ-VISUALIZAÇÃO DA CÂMERA - Uma texture por resolução, atualizada no lugar
+
+O caminho antigo, a 30 FPS, criava uma Texture nova por frame, convertia
+BGR→RGB e fazia `flatten()` (mais uma cópia). Aqui:
+
+    texture    criada uma vez por resolução e reaproveitada (o flip vertical
+               é aplicado só na criação; repeti-lo a cada frame o desfaria)
+    buffer     o frame é reduzido direto para um buffer pré-alocado e enviado
+               como 'bgr' (o OpenGL do desktop recebe BGR), sem cvtColor nem
+               cópia extra
+    sobreposição  os retângulos de detecção só forçam uma cópia quando ativos
+    atraso     se a UI está atrasada (intervalo do tick > `lag_factor` × o
+               esperado) o frame é pulado, garantindo ao menos um a cada
+               `max_skip_interval` segundos
+
+A fábrica de textures é injetável (Kivy no app, falsa no benchmark), e o
+módulo não importa o Kivy.
+"""
+
+import time
+from typing import Callable, Optional, Sequence, Tuple
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+
+class PreviewRenderer:
+    """Renderiza frames BGR em uma texture reaproveitada"""
+
+    def __init__(self, texture_factory: Callable[..., object], height: int = 240,
+                 lag_factor: float = 2.0, max_skip_interval: float = 0.25):
+        self.texture_factory = texture_factory
+        self.height = height
+        self.lag_factor = lag_factor
+        self.max_skip_interval = max_skip_interval
+
+        self.texture = None
+        self._size: Optional[Tuple[int, int]] = None
+        self._buffer = None
+        self._last_render = 0.0
+
+        self.rendered = 0
+        self.skipped = 0
+        self.textures_created = 0
+
+    def should_render(self, dt: float, interval: float, now: Optional[float] = None) -> bool:
+        """False para pular o frame quando a UI está atrasada"""
+        now = time.perf_counter() if now is None else now
+        if dt > self.lag_factor * interval and now - self._last_render < self.max_skip_interval:
+            self.skipped += 1
+            return False
+        return True
+
+    def _target_size(self, frame) -> Tuple[int, int]:
+        height, width = frame.shape[:2]
+        if height <= self.height:
+            return width, height
+        return max(1, round(width * self.height / height)), self.height
+
+    def _ensure_texture(self, size: Tuple[int, int]):
+        if self._size == size:
+            return
+        width, height = size
+        self.texture = self.texture_factory(size=size, colorfmt='rgb')
+        self.texture.flip_vertical()
+        self._buffer = np.empty((height, width, 3), np.uint8)
+        self._size = size
+        self.textures_created += 1
+
+    def prepare(self, frame, rects: Sequence = ()):
+        """Frame no tamanho da texture em um buffer contíguo (com retângulos, se houver)"""
+        size = self._target_size(frame)
+        self._ensure_texture(size)
+
+        if size == (frame.shape[1], frame.shape[0]):
+            image = np.ascontiguousarray(frame) if not rects else frame.copy()
+        else:
+            image = cv2.resize(frame, size, dst=self._buffer, interpolation=cv2.INTER_LINEAR)
+
+        if rects:
+            # O frame é compartilhado com a decodificação: desenha só no buffer próprio
+            scale = size[1] / frame.shape[0]
+            for rect in rects:
+                top_left = (int(rect.left * scale), int(rect.top * scale))
+                bottom_right = (int((rect.left + rect.width) * scale), int((rect.top + rect.height) * scale))
+                cv2.rectangle(image, top_left, bottom_right, (0, 255, 0), 2)
+                cv2.putText(image, "QR DETECTADO", (top_left[0], top_left[1] - 5),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 1)
+        return image
+
+    def render(self, frame, rects: Sequence = ()):
+        """Atualiza a texture no lugar e a devolve"""
+        image = self.prepare(frame, rects)
+        self.texture.blit_buffer(image.reshape(-1), colorfmt='bgr', bufferfmt='ubyte')
+        self._last_render = time.perf_counter()
+        self.rendered += 1
+        return self.texture
+
+    def reset(self):
+        """Descarta a texture (câmera parada ou resolução nova)"""
+        self.texture = None
+        self._size = None
+        self._buffer = None
+
+    def stats(self) -> dict:
+        return {
+            'rendered': self.rendered,
+            'skipped': self.skipped,
+            'textures_created': self.textures_created,
+        }
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔍 DETECÇÃO DE QR - Estratégias Simples / Melhorado / Agressivo
+
+Extraídas do QRReaderApp para serem compartilhadas com o simulador e com os
+benchmarks, sem depender do Kivy. O decodificador é injetável: pyzbar por
+padrão, ou o detector do OpenCV onde a libzbar não está instalada.
+
+Com `metrics` (pipeline_metrics.PipelineMetrics), cada conversão de cor,
+técnica de pré-processamento e chamada do decodificador é cronometrada.
+"""
+
+from typing import Callable, List, NamedTuple, Optional
+
+from pipeline_metrics import NULL_METRICS
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+try:
+    from pyzbar import pyzbar
+    PYZBAR_AVAILABLE = True
+except ImportError:
+    PYZBAR_AVAILABLE = False
+
+# Rótulos do seletor de modo → modo interno
+MODE_LABELS = {
+    'simples': 'simple',
+    'melhorado': 'enhanced',
+    'agressivo': 'aggressive',
+}
+MODES = tuple(MODE_LABELS.values())
+
+
+class Rect(NamedTuple):
+    left: int
+    top: int
+    width: int
+    height: int
+
+
+class DecodedQR(NamedTuple):
+    """Resultado no mesmo formato do pyzbar (.data em bytes, .rect)"""
+    data: bytes
+    rect: Rect
+    type: str = 'QRCODE'
+
+
+_opencv_detector = None
+
+
+def opencv_decode(image) -> List[DecodedQR]:
+    """Decodifica com cv2.QRCodeDetector, devolvendo resultados no formato do pyzbar"""
+    global _opencv_detector
+    if _opencv_detector is None:
+        _opencv_detector = cv2.QRCodeDetector()
+
+    text, points, _ = _opencv_detector.detectAndDecode(np.asarray(image))
+    if not text or points is None:
+        return []
+    left, top, width, height = cv2.boundingRect(points.astype(np.int32).reshape(-1, 1, 2))
+    return [DecodedQR(text.encode('utf-8'), Rect(left, top, width, height))]
+
+
+def default_decoder() -> Optional[Callable]:
+    """pyzbar quando disponível; senão o detector do OpenCV"""
+    if PYZBAR_AVAILABLE:
+        return pyzbar.decode
+    if CV2_AVAILABLE:
+        return opencv_decode
+    return None
+
+
+class QRDetector:
+    """
+    Estratégias de detecção com contagem de tentativas
+
+    Após cada chamada, `last_technique` indica a técnica que decodificou e
+    `last_attempts` quantas decodificações foram tentadas até lá.
+    """
+
+    def __init__(self, decoder: Optional[Callable] = None, debug_log: Optional[Callable[[str], None]] = None,
+                 metrics=None):
+        self.decoder = decoder or default_decoder()
+        self.debug_log = debug_log
+        self.metrics = metrics or NULL_METRICS
+        self.last_technique = None
+        self.last_attempts = 0
+
+    def detect(self, frame, mode: str = 'enhanced') -> list:
+        """Detecta QR codes no frame com o modo escolhido"""
+        self.last_technique = None
+        self.last_attempts = 0
+
+        if mode == 'simple':
+            return self.simple(frame)
+        if mode == 'aggressive':
+            return self.aggressive(frame)
+        return self.enhanced(frame)
+
+    def _log(self, message: str):
+        if self.debug_log is not None:
+            self.debug_log(message)
+
+    def _decode(self, image, technique: str) -> list:
+        self.last_attempts += 1
+        try:
+            with self.metrics.timer('decode', technique=technique):
+                codes = self.decoder(image)
+        except Exception:
+            self.metrics.inc('decode_calls', technique=technique, result='error')
+            return []
+        self.metrics.inc('decode_calls', technique=technique, result='hit' if codes else 'miss')
+        if codes:
+            self.last_technique = technique
+            self.metrics.inc('detections', technique=technique)
+            self._log(f"Detecção {technique}: {len(codes)} QR(s)")
+        return codes
+
+    def _preprocess(self, technique: str, process: Callable):
+        with self.metrics.timer('preprocess', technique=technique):
+            return process()
+
+    def _gray(self, frame):
+        if frame.ndim != 3:
+            return frame
+        with self.metrics.timer('color_conversion', conversion='bgr2gray'):
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def simple(self, frame) -> list:
+        """Detecção simples e rápida"""
+        return self._decode(frame, 'direta')
+
+    def enhanced(self, frame) -> list:
+        """Detecção melhorada com pré-processamento"""
+        codes = self._decode(frame, 'direta')
+        if codes:
+            return codes
+
+        gray = self._gray(frame)
+        techniques = (
+            ('Equalizado', lambda: cv2.equalizeHist(gray)),
+            ('Adaptativo', lambda: cv2.adaptiveThreshold(
+                gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)),
+            ('Bilateral', lambda: cv2.bilateralFilter(gray, 5, 50, 50)),
+        )
+        for name, process in techniques:
+            codes = self._decode(self._preprocess(name, process), name)
+            if codes:
+                return self.remove_duplicates(codes)
+        return []
+
+    def aggressive(self, frame) -> list:
+        """Detecção agressiva para casos difíceis (escalas e rotações)"""
+        codes = self.enhanced(frame)
+        if codes:
+            return codes
+
+        self._log("Iniciando detecção agressiva...")
+        gray = self._gray(frame)
+        height, width = gray.shape
+
+        for scale in (0.8, 1.2, 1.5):
+            technique = f'escala {scale}'
+            scaled = self._preprocess(technique, lambda: cv2.resize(gray, (int(width * scale), int(height * scale))))
+            codes = self._decode(scaled, technique)
+            if codes:
+                return self.remove_duplicates(codes)
+
+        center = (width // 2, height // 2)
+        for angle in (-10, 10, -15, 15):
+            technique = f'rotação {angle}°'
+            rotation = cv2.getRotationMatrix2D(center, angle, 1.0)
+            rotated = self._preprocess(technique, lambda: cv2.warpAffine(gray, rotation, (width, height)))
+            codes = self._decode(rotated, technique)
+            if codes:
+                return self.remove_duplicates(codes)
+        return []
+
+    @staticmethod
+    def remove_duplicates(codes) -> list:
+        """Remove QR codes duplicados (mesma posição aproximada)"""
+        unique = []
+        for code in codes:
+            if not any(abs(code.rect.left - other.rect.left) < 20 and
+                       abs(code.rect.top - other.rect.top) < 20 for other in unique):
+                unique.append(code)
+        return unique
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔗 PAYLOAD DO QR CODE - Extração da chave e dos campos do parâmetro p=
+
+Os portais das 27 SEFAZ usam URLs diferentes, mas a chave aparece sempre
+como uma sequência isolada de 44 dígitos:
+    v1:  ...?chNFe=<chave>&nVersao=100&tpAmb=1&...
+    v2:  ...?p=<chave>|2|<tpAmb>|<cIdToken>|<hash>                      (online)
+         ...?p=<chave>|2|<tpAmb>|<dia>|<vNF>|<digVal>|<cIdToken>|<hash> (offline)
+    v3:  ...?p=<chave>|3|<tpAmb>                                        (online)
+         ...?p=<chave>|3|<tpAmb>|<dhEmi>|<vNF>|<tpIdDest>|<idDest>|<assinatura>
+O separador pode vir codificado na URL (%7C), e os campos também (a
+assinatura v3 em base64 traz %2B, %2F, %3D). Uma única busca com a
+expressão compilada encontra a chave e captura os campos que a seguem;
+só esse trecho final é dividido e decodificado depois.
+"""
+
+import re
+from typing import NamedTuple, Optional, Tuple
+from urllib.parse import unquote
+
+# Chave isolada (sem dígitos colados) seguida dos campos separados por | ou %7C;
+# dentro de um campo vale qualquer escape %XX que não seja o próprio separador.
+# [0-9] e não \d: \d aceitaria dígitos Unicode de outros alfabetos.
+_KEY_PATTERN = r'(?<![0-9])([0-9]{44})(?![0-9])'
+_KEY_RE = re.compile(_KEY_PATTERN)
+_FIELD_PATTERN = r'(?:[^|&#%\s]|%(?!7[Cc])[0-9A-Fa-f]{2})*'
+_PAYLOAD_RE = re.compile(_KEY_PATTERN + r'((?:(?:\||%7[Cc])' + _FIELD_PATTERN + r')*)')
+_SEPARATOR_RE = re.compile(r'\||%7[Cc]')
+
+
+class QRPayload(NamedTuple):
+    """Chave de acesso e campos do parâmetro p= (quando presentes)"""
+    key: str
+    version: Optional[str] = None       # '2', '3' (None no formato v1 / chave pura)
+    environment: Optional[str] = None   # tpAmb: '1' produção, '2' homologação
+    token_id: Optional[str] = None      # cIdToken (v2)
+    qr_hash: Optional[str] = None       # cHashQRCode (v2) ou assinatura (v3 offline)
+    fields: Tuple[str, ...] = ()        # Todos os campos após a chave, sem tratamento
+
+    @property
+    def offline(self) -> bool:
+        """Emissão em contingência offline (QR com os campos extras)"""
+        return (self.version == '2' and len(self.fields) == 7) or (self.version == '3' and len(self.fields) > 2)
+
+
+def parse_qr_payload(text: str) -> Optional[QRPayload]:
+    """Extrai a chave e os campos do p= em uma única passada; None se não houver chave"""
+    match = _PAYLOAD_RE.search(text)
+    if match is None:
+        return None
+
+    key, tail = match.groups()
+    if not tail:
+        return QRPayload(key)
+
+    if '%' in tail:
+        # Divide pelo separador antes de decodificar: um %7C é separador, não valor
+        fields = tuple(unquote(field) for field in _SEPARATOR_RE.split(tail)[1:])
+    else:
+        fields = tuple(tail[1:].split('|'))
+    version = fields[0] or None
+    environment = fields[1] if len(fields) > 1 else None
+    token_id = qr_hash = None
+    if version == '2':
+        if len(fields) == 4:
+            token_id, qr_hash = fields[2], fields[3]
+        elif len(fields) == 7:
+            token_id, qr_hash = fields[5], fields[6]
+    elif version == '3' and len(fields) == 7:
+        qr_hash = fields[6]
+
+    return QRPayload(key, version, environment, token_id, qr_hash, fields)
+
+
+def extract_key(text: str) -> Optional[str]:
+    """Apenas a chave de acesso do payload (ou None)"""
+    match = _KEY_RE.search(text)
+    return match.group(1) if match else None
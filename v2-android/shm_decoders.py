@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧮 DECODIFICAÇÃO MULTIPROCESSO - Frames em memória compartilhada, sem pickle de pixels
+
+No desktop o GIL limita as partes em Python do pipeline pyzbar/OpenCV a
+cerca de um núcleo. Aqui cada frame capturado é copiado uma vez para um
+slot de um bloco `multiprocessing.shared_memory`, e N processos decodificam
+direto desse slot (np.ndarray sobre o buffer compartilhado). Pelas filas só
+passam tuplas pequenas: (seq, slot, formato, modo) na ida e os QR codes
+encontrados (bytes + retângulo) na volta.
+
+    with SharedFramePool(workers=4) as pool:
+        future = pool.submit(frame)        # None se todos os slots ocupados
+        result = future.result()           # DecodeResult(seq, codes, seconds, worker)
+
+Um slot só volta a ser usado depois que o resultado dele chega, então o
+processo nunca lê um frame sobrescrito. Processos são iniciados com 'spawn'
+(seguro com as threads do Kivy e do pipeline de frames).
+
+Usado pelo android_simulator e pelo test_camera_real com
+NFCAM_DECODE_PROCESSES=N; escalabilidade de 1 a N processos:
+benchmarks/bench_shm_decoders.py.
+"""
+
+import os
+import time
+import threading
+import multiprocessing as mp
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from multiprocessing import shared_memory
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from qr_detection import DecodedQR, QRDetector, Rect, default_decoder, opencv_decode
+
+DECODE_PROCESSES_ENV = 'NFCAM_DECODE_PROCESSES'
+
+# 1920×1080 BGR por slot
+DEFAULT_SLOT_BYTES = 1920 * 1080 * 3
+
+
+class DecodeResult(NamedTuple):
+    seq: int
+    codes: List[DecodedQR]
+    seconds: float
+    worker: int                 # pid do processo que decodificou
+    error: Optional[str] = None
+
+
+def processes_from_env() -> int:
+    """Número de processos pedido em NFCAM_DECODE_PROCESSES (0 = desligado)"""
+    try:
+        return max(0, int(os.environ.get(DECODE_PROCESSES_ENV, '0')))
+    except ValueError:
+        return 0
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # O dono do bloco é o processo principal: os workers não o registram
+    # no resource_tracker (Python 3.13+), senão ele seria removido na saída
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(shm_name: str, slot_bytes: int, tasks, results, backend: str):
+    """Processo decodificador: lê frames dos slots até receber None"""
+    shm = _attach(shm_name)
+    if backend == 'opencv':
+        decoder = opencv_decode
+    else:
+        decoder = default_decoder()
+    detector = QRDetector(decoder)
+    pid = os.getpid()
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot, shape, mode = task
+            started = time.perf_counter()
+            frame = np.ndarray(shape, np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            try:
+                codes = [(code.data, tuple(code.rect)) for code in detector.detect(frame, mode)]
+                error = None
+            except Exception as e:
+                codes, error = [], f'{type(e).__name__}: {e}'
+            del frame  # Libera a view antes de fechar o bloco
+            results.put((seq, slot, codes, time.perf_counter() - started, pid, error))
+    finally:
+        shm.close()
+
+
+class SharedFramePool:
+    """
+    Pool de processos decodificadores alimentado por slots de memória compartilhada
+
+    `slots` (padrão 2 × workers) limita os frames em voo; sem slot livre,
+    `submit` descarta o frame (contado em `dropped`) ou espera com
+    `block=True`.
+    """
+
+    def __init__(self, workers: Optional[int] = None, slots: Optional[int] = None,
+                 slot_bytes: int = DEFAULT_SLOT_BYTES, backend: str = 'auto',
+                 start_method: str = 'spawn', metrics=None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.slots = slots or 2 * self.workers
+        self.slot_bytes = slot_bytes
+        self.backend = backend
+        self.metrics = metrics
+        self._context = mp.get_context(start_method)
+
+        self._shm = None
+        self._processes = []
+        self._tasks = None
+        self._results = None
+        self._collector = None
+        self._free_slots = []
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._seq = 0
+
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._shm is not None
+
+    @property
+    def alive(self) -> int:
+        """Processos decodificadores vivos"""
+        return sum(process.is_alive() for process in self._processes)
+
+    def start(self):
+        if self.running:
+            return self
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+        self._tasks = self._context.SimpleQueue()
+        self._results = self._context.SimpleQueue()
+        self._free_slots = list(range(self.slots))
+        self._processes = [
+            self._context.Process(target=_worker_main, name=f'shm-decoder-{i}', daemon=True,
+                                  args=(self._shm.name, self.slot_bytes, self._tasks, self._results, self.backend))
+            for i in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+        self._collector = threading.Thread(target=self._collect, name='shm-decoder-results', daemon=True)
+        self._collector.start()
+        return self
+
+    def close(self, timeout: float = 5.0):
+        """Encerra os processos e libera a memória compartilhada"""
+        if not self.running:
+            return
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._results.put(None)
+        self._collector.join(timeout)
+
+        with self._condition:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            self._condition.notify_all()
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+        self._processes = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # === ENVIO E RESULTADOS ===
+
+    def submit(self, frame, mode: str = 'enhanced', block: bool = False,
+               timeout: Optional[float] = None) -> Optional[Future]:
+        """Copia o frame para um slot livre e o entrega a um processo"""
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame de {frame.nbytes} bytes excede o slot ({self.slot_bytes})")
+
+        with self._condition:
+            if not self._free_slots and block:
+                self._condition.wait_for(lambda: self._free_slots or not self.running, timeout)
+            if not self._free_slots or not self.running:
+                self.dropped += 1
+                return None
+            slot = self._free_slots.pop()
+            self._seq += 1
+            seq = self._seq
+            future = Future()
+            self._pending[seq] = future
+            self.submitted += 1
+
+        view = np.ndarray(frame.shape, np.uint8, buffer=self._shm.buf, offset=slot * self.slot_bytes)
+        view[...] = frame
+        del view
+        self._tasks.put((seq, slot, frame.shape, mode))
+        return future
+
+    def decode(self, frame, mode: str = 'enhanced', timeout: Optional[float] = None) -> List[DecodedQR]:
+        """Envio bloqueante: espera um slot e o resultado"""
+        future = self.submit(frame, mode, block=True, timeout=timeout)
+        if future is None:
+            return []
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return future.result(0.5).codes
+            except FutureTimeout:
+                # Um processo que morreu (ex.: falha no import) nunca responde
+                if not self.alive:
+                    raise RuntimeError("Nenhum processo decodificador ativo")
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+
+    def _collect(self):
+        while True:
+            message = self._results.get()
+            if message is None:
+                return
+            seq, slot, codes, seconds, pid, error = message
+            result = DecodeResult(seq, [DecodedQR(data, Rect(*rect)) for data, rect in codes], seconds, pid, error)
+            with self._condition:
+                self._free_slots.append(slot)
+                future = self._pending.pop(seq, None)
+                self.completed += 1
+                self.busy_seconds += seconds
+                self._condition.notify()
+            if self.metrics is not None:
+                self.metrics.observe('decode', seconds, technique='process_pool')
+            if future is not None:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'slots': self.slots,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'in_flight': len(self._pending),
+            'dropped': self.dropped,
+            'avg_decode_ms': self.busy_seconds / self.completed * 1000 if self.completed else 0.0,
+        }
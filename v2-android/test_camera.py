@@ -9,10 +9,12 @@ import os
 import sys
 import time
 import json
-import re
 from pathlib import Path
 from datetime import datetime
 
+from access_key import compute_check_digit
+from qr_payload import extract_key
+
 # Kivy imports
 try:
     from kivy.app import App
@@ -331,13 +333,11 @@ class CameraTestApp(App):
         Logger.info(f"CameraTest: Processando QR: {qr_data[:50]}...")
         
         # Extrai chave fiscal
-        match = re.search(r'p=([0-9]{44})', qr_data)
-        if not match:
+        key = extract_key(qr_data)
+        if not key:
             self.camera_display.text = '📹 CÂMERA ATIVA\n\n⚠️ QR inválido\n\n🔍 Procurando QR fiscal...'
             return
         
-        key = match.group(1)
-        
         # Valida chave
         if not self.validate_access_key(key):
             self.camera_display.text = '📹 CÂMERA ATIVA\n\n❌ Chave inválida\n\n🔍 Procurando QR válido...'
@@ -461,13 +461,7 @@ class CameraTestApp(App):
             return False
         
         try:
-            weights = [2, 3, 4, 5, 6, 7, 8, 9] * 5 + [2, 3, 4]
-            total = sum(int(digit) * weight for digit, weight in zip(key[:43], weights))
-            
-            remainder = total % 11
-            expected_dv = 0 if remainder < 2 else 11 - remainder
-            
-            is_valid = int(key[43]) == expected_dv
+            is_valid = int(key[43]) == compute_check_digit(key[:43])
             
             if self.debug_switch.active:
                 Logger.info(f"CameraTest: Validação DV - Válido: {is_valid}")
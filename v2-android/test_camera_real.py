@@ -5,35 +5,34 @@ TESTE CÂMERA REAL - OpenCV + pyzbar
 Leitura direta de QR codes via câmera
 """
 
+import os
 import cv2
 import time
-import re
 from pyzbar import pyzbar
 
+from access_key import decode_key_fields, is_valid_key
+from qr_payload import extract_key
+from camera_replay import open_capture
+from shm_decoders import SharedFramePool, processes_from_env
+
 def validate_fiscal_key(key: str) -> bool:
     """Valida chave fiscal de 44 dígitos"""
-    if len(key) != 44 or not key.isdigit():
-        return False
-    
-    try:
-        # Algoritmo DV fiscal
-        weights = [2, 3, 4, 5, 6, 7, 8, 9] * 5 + [2, 3, 4]
-        total = sum(int(digit) * weight for digit, weight in zip(key[:43], weights))
-        
-        remainder = total % 11
-        expected_dv = 0 if remainder < 2 else 11 - remainder
-        
-        return int(key[43]) == expected_dv
-    except:
-        return False
+    return is_valid_key(key)
 
-def test_camera_qr():
-    """Teste direto da câmera para leitura de QR"""
+def test_camera_qr(show_window: bool = True, processes: int = 0):
+    """
+    Teste direto da câmera para leitura de QR
+    
+    Com NFCAM_REPLAY=sessao.nfcam reproduz uma sessão gravada no lugar da
+    câmera; `show_window=False` dispensa a janela (máquinas sem display).
+    Com `processes` > 0 os frames vão para N processos decodificadores
+    (shm_decoders) e a captura não espera a decodificação.
+    """
     print("🚀 TESTE CÂMERA + QR CODES")
     print("📷 Abrindo câmera...")
     
-    # Abre câmera padrão
-    cap = cv2.VideoCapture(0)
+    # Abre câmera padrão (ou sessão gravada)
+    cap = open_capture(0)
     
     if not cap.isOpened():
         print("❌ Erro: Não foi possível abrir a câmera")
@@ -57,19 +56,34 @@ def test_camera_qr():
     last_qr_time = 0
     processed_qrs = set()
     
+    # Decodificação multiprocesso: frames em voo e resultados prontos a cada volta
+    pool = SharedFramePool(processes).start() if processes else None
+    pending = []
+    if pool is not None:
+        print(f"🧮 Decodificando em {pool.workers} processos (memória compartilhada)")
+    
     try:
         while True:
             # Captura frame
             ret, frame = cap.read()
             if not ret:
-                print("❌ Erro ao capturar frame")
+                print("⏹️ Fim da sessão gravada" if os.environ.get('NFCAM_REPLAY') else "❌ Erro ao capturar frame")
                 break
             
             # Espelha imagem (câmera frontal)
             frame = cv2.flip(frame, 1)
             
             # Detecta QR codes
-            qr_codes = pyzbar.decode(frame)
+            if pool is None:
+                qr_codes = pyzbar.decode(frame)
+            else:
+                # Envia sem esperar (descarta se todos os slots estão ocupados)
+                future = pool.submit(frame, 'simple')
+                if future is not None:
+                    pending.append(future)
+                done = [f for f in pending if f.done()]
+                pending = [f for f in pending if f not in done]
+                qr_codes = [code for f in done if not f.cancelled() for code in f.result().codes]
             
             # Processa QR codes encontrados
             current_time = time.time()
@@ -91,21 +105,21 @@ def test_camera_qr():
                         print(f"📄 Dados: {qr_data[:80]}...")
                         
                         # Tenta extrair chave fiscal
-                        match = re.search(r'p=([0-9]{44})', qr_data)
+                        fiscal_key = extract_key(qr_data)
                         
-                        if match:
-                            fiscal_key = match.group(1)
+                        if fiscal_key:
                             print(f"🔑 Chave fiscal: {fiscal_key}")
                             
                             # Valida chave
                             if validate_fiscal_key(fiscal_key):
+                                fields = decode_key_fields([fiscal_key])[0]
                                 print("✅ CHAVE FISCAL VÁLIDA!")
-                                print(f"   🏢 UF: {fiscal_key[0:2]}")
-                                print(f"   📅 Ano/Mês: {fiscal_key[2:6]}")
-                                print(f"   🏪 CNPJ: {fiscal_key[6:20]}")
-                                print(f"   📊 Modelo: {fiscal_key[20:22]}")
-                                print(f"   📋 Série: {fiscal_key[22:25]}")
-                                print(f"   📄 Número: {fiscal_key[25:34]}")
+                                print(f"   🏢 UF: {fields['cUF']:02d}")
+                                print(f"   📅 Ano/Mês: {fields['AAMM']:04d}")
+                                print(f"   🏪 CNPJ: {fields['CNPJ'].decode('ascii')}")
+                                print(f"   📊 Modelo: {fields['mod']:02d}")
+                                print(f"   📋 Série: {fields['serie']:03d}")
+                                print(f"   📄 Número: {fields['nNF']:09d}")
                             else:
                                 print("❌ Chave fiscal inválida (DV incorreto)")
                         else:
@@ -129,6 +143,9 @@ def test_camera_qr():
                         print("⚠️  QR com encoding inválido")
                         continue
             
+            if not show_window:
+                continue
+            
             # Adiciona informações na tela
             info_text = f"QR encontrados: {qr_found_count} | Pressione 'q' para sair"
             cv2.putText(frame, info_text, (10, 30), 
@@ -156,7 +173,10 @@ def test_camera_qr():
     finally:
         # Libera recursos
         cap.release()
-        cv2.destroyAllWindows()
+        if pool is not None:
+            pool.close()
+        if show_window:
+            cv2.destroyAllWindows()
         
         print(f"\n📊 RESUMO DO TESTE:")
         print(f"   📷 Câmera: Funcionou corretamente")
@@ -171,15 +191,18 @@ def main():
     print("🎯 Objetivo: Testar leitura de cupons fiscais")
     print("=" * 50)
     
+    headless = bool(os.environ.get('NFCAM_HEADLESS'))
+    
     try:
-        test_camera_qr()
+        test_camera_qr(show_window=not headless, processes=processes_from_env())
     except Exception as e:
         print(f"❌ Erro fatal: {e}")
         import traceback
         traceback.print_exc()
     
     print("\n🎉 Teste concluído!")
-    input("Pressione Enter para sair...")
+    if not headless:
+        input("Pressione Enter para sair...")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
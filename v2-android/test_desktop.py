@@ -9,10 +9,12 @@ import os
 import sys
 import time
 import json
-import re
 from pathlib import Path
 from datetime import datetime
 
+from access_key import compute_check_digit
+from qr_payload import parse_qr_payload
+
 # Kivy imports
 try:
     from kivy.app import App
@@ -193,18 +195,14 @@ class QRReaderTestApp(App):
         Logger.info(f"QRTest: Testando QR: {qr_text[:50]}...")
         
         # Tenta extrair chave fiscal
-        match = re.search(r'p=([0-9]{44})', qr_text)
-        if match:
-            key = match.group(1)
-            Logger.info(f"QRTest: Chave extraída: {key}")
+        # (URL de qualquer SEFAZ, v1/v2/v3, ou chave direta)
+        payload = parse_qr_payload(qr_text)
+        if payload:
+            key = payload.key
+            Logger.info(f"QRTest: Chave extraída: {key} (versão QR: {payload.version or '1/direta'})")
         else:
-            # Testa se é chave direta
-            if len(qr_text) == 44 and qr_text.isdigit():
-                key = qr_text
-                Logger.info(f"QRTest: Usando chave direta: {key}")
-            else:
-                self.show_toast("❌ QR inválido - deve conter chave de 44 dígitos", "error")
-                return
+            self.show_toast("❌ QR inválido - deve conter chave de 44 dígitos", "error")
+            return
         
         # Valida chave
         if self.validate_access_key(key):
@@ -240,16 +238,11 @@ class QRReaderTestApp(App):
         
         try:
             # Algoritmo de validação do dígito verificador
-            weights = [2, 3, 4, 5, 6, 7, 8, 9] * 5 + [2, 3, 4]
-            total = sum(int(digit) * weight for digit, weight in zip(key[:43], weights))
-            
-            remainder = total % 11
-            expected_dv = 0 if remainder < 2 else 11 - remainder
-            
+            expected_dv = compute_check_digit(key[:43])
             is_valid = int(key[43]) == expected_dv
             
             if self.debug_switch.active:
-                Logger.info(f"QRTest: Validação DV - Total: {total}, Resto: {remainder}, DV esperado: {expected_dv}, DV real: {key[43]}, Válido: {is_valid}")
+                Logger.info(f"QRTest: Validação DV - DV esperado: {expected_dv}, DV real: {key[43]}, Válido: {is_valid}")
             
             return is_valid
             